@@ -1,14 +1,42 @@
-from dataclasses import dataclass, asdict
-from typing import List, Any
-from datetime import date
+from dataclasses import dataclass, asdict, replace
+from typing import List, Any, Callable, Iterable, Iterator, NewType
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from operator import attrgetter
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from array import array
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import atexit
+import bisect
+import cProfile
 import csv
-import random
+import json
+import math
+import mmap
 import os
+import re
 import sys
+import gc
 import getpass
+import sqlite3
+import struct
+import threading
+import time
+import unicodedata
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # batch interest accrual falls back to a plain loop
+    np = None
 
 # ========================== DATA CLASSES ==========================
-@dataclass
+Cents = NewType("Cents", int)  # money is always a whole number of cents
+
+@dataclass(slots=True)
 class Operator:
     operator_id: str    # 5 digits
     operator_password: str
@@ -16,21 +44,22 @@ class Operator:
     access_level: int  # 0 to 5
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     transaction_type: str  # "Deposit", "Withdraw", "Loan" , "Paid Loan"
     transaction_name: str   # so the client understand what transaction it is
     transaction_date: date
     interest_rate: float
-    interest: float
-    amount: float
+    interest: Cents
+    amount: Cents
     operator_id: str        
     client_acc_number: str
     Transaction_id: str
-    original_amount: float
+    original_amount: Cents
+    loan_id: str = ""  # Loan Payment: the Transaction_id of the loan it paid (empty in older records)
 
 
-@dataclass
+@dataclass(slots=True)
 class Client:
     client_id: str # 12 digits numbers only
     client_name: str
@@ -38,8 +67,8 @@ class Client:
     agency_number: str # 4 digits numbers only
     creation_date: date
     client_password: str
-    balance: float
-    debt: float
+    balance: Cents
+    debt: Cents
 
 # ====== UTILITY FUNCTIONS ======
 def get_int(prompt: str) -> int:
@@ -56,17 +85,89 @@ def get_float(prompt: str) -> float:
         user_input = user_input.replace(",", ".")  # Replace comma with dot
         try:
             value = float(user_input)
+        except ValueError:
+            value = math.nan
+        if math.isfinite(value):  # float() also takes "nan" and "inf"
             return value
+        print("Invalid input. Please enter a valid number (use , or . for decimals).")
+
+def get_money(prompt: str) -> Cents:
+    while True:
+        try:
+            return to_cents(input(prompt))
         except ValueError:
-            print("Invalid input. Please enter a valid number (use , or . for decimals).")
+            print("Invalid input. Please enter a valid amount (use , or . for decimals).")
 
-def clear_terminal():
-    os.system('cls' if os.name == 'nt' else 'clear')
+def get_date(prompt: str) -> date:
+    while True:
+        try:
+            return date.fromisoformat(input(prompt).strip())
+        except ValueError:
+            print("Invalid date. Please use the format YYYY-MM-DD:")
+
+def to_cents(value) -> Cents:
+    """Dollars as text or a number ("12.5", "12,50", 12.5) to whole cents, half cents rounding up."""
+    try:
+        dollars = Decimal(str(value).strip().replace(",", "."))
+        return Cents(int(dollars.quantize(Decimal("0.01"), ROUND_HALF_UP) * 100))
+    except ArithmeticError:
+        raise ValueError(f"Invalid amount of money: {value!r}")
+
+def money_text(cents: Cents) -> str:
+    """Cents as plain dollar text for files and replies ("-1234.50")."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+def format_money(cents: Cents) -> str:
+    """Cents for the screen ("$1,234.50")."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}${abs(cents) // 100:,}.{abs(cents) % 100:02d}"
+
+def round_cents(value: float) -> Cents:
+    """Nearest whole cent, halves rounding up (the bank's rounding rule for interest)."""
+    return Cents(math.floor(value + 0.5))
+
+# A float debt this close (relative) to a half cent may round to the wrong
+# side: pow() is off by up to about months ulps, and NumPy's power and
+# Python's ** differ in the last bits. Far wider than that error.
+HALF_CENT_GUARD = 1e-9
+
+@lru_cache(maxsize=None)
+def _monthly_factor(interest_rate: float) -> tuple[int, int]:
+    """1 + interest_rate / 12 as an exact fraction, reading the rate as the decimal it was typed as."""
+    numerator, denominator = Decimal(str(float(interest_rate))).as_integer_ratio()
+    return 12 * denominator + numerator, 12 * denominator
+
+def compound_cents(principal: int, interest_rate: float, months: int) -> Cents:
+    """principal * (1 + interest_rate / 12) ** months in exact integer arithmetic, rounded half up."""
+    if months <= 0:
+        return Cents(int(principal))
+    grown, base = _monthly_factor(interest_rate)
+    numerator = int(principal) * grown ** int(months)  # Python ints: NumPy scalars would overflow
+    denominator = base ** int(months)
+    return Cents((2 * numerator + denominator) // (2 * denominator))
+
+def loan_debt_cents(principal: int, interest_rate: float, months: int) -> Cents:
+    """
+    compound_cents(), in floats whenever that cannot change the result. Every
+    interest path (calculate_loan_debt, accrue_columns and so the batch and
+    parallel accruals) rounds through this rule, so they agree to the cent.
+    """
+    if months <= 0:
+        return Cents(principal)
+    value = principal * (1 + interest_rate / 12) ** months
+    rounded = math.floor(value + 0.5)
+    if 0.5 - abs(value - rounded) > HALF_CENT_GUARD * max(value, 1.0):  # clear of a half cent
+        return rounded
+    return compound_cents(principal, interest_rate, months)
 
-def generate_random_number(digits: int) -> str:
-    return str(random.randint(0, 10**digits - 1)).zfill(digits)
+def clear_terminal():
+    # ANSI clear screen + cursor home, instead of spawning cls/clear on every redraw
+    print("\033[2J\033[H", end="", flush=True)
 
 def search_index(data_list: List[Any], field_name: str, value: str) -> int:
+    if isinstance(data_list, IndexedList) and field_name in data_list.indexes:
+        return data_list.position(field_name, value)
     for i, item in enumerate(data_list):
         if getattr(item, field_name) == value:
             return i
@@ -76,15 +177,20 @@ def search_index(data_list: List[Any], field_name: str, value: str) -> int:
 def months_between(start_date: date, end_date: date) -> int:
     return abs((end_date.year - start_date.year) * 12 + (end_date.month - start_date.month))
 
-def calculate_loan_debt(transaction: Transaction) -> float:
+def calculate_loan_debt(transaction: Transaction, today: date | None = None) -> Cents:
     """
     Calculate the current debt for a loan transaction using compound interest.
+
+    Interest compounds monthly on the principal in cents and the exact result
+    is rounded once to the nearest cent, halves up (see loan_debt_cents):
+    debt = principal * (1 + rate / 12) ** months
     
     :param transaction: A Transaction object (must be of type "Loan")
-    :return: Current debt value
+    :param today: Date to calculate the debt at (defaults to today)
+    :return: Current debt in cents
     """
     if transaction.transaction_type.lower() != "loan":
-        return 0.0  # Not a loan, no debt to calculate
+        return Cents(0)  # Not a loan, no debt to calculate
     
     # Principal (loan amount)
     principal = transaction.amount
@@ -93,21 +199,614 @@ def calculate_loan_debt(transaction: Transaction) -> float:
     rate = transaction.interest_rate
     
     # Time in months since loan date
-    today = date.today()
+    today = today or date.today()
     months_passed = (today.year - transaction.transaction_date.year) * 12 + (today.month - transaction.transaction_date.month)
     
     if months_passed <= 0:
         return principal  # No time has passed
     
-    # Compound interest monthly
-    compounds_per_year = 12
-    time_years = months_passed / 12
-    
-    # Final debt
-    debt = principal * (1 + rate / compounds_per_year) ** (compounds_per_year * time_years)
-    
-    return round(debt, 2)
+    # Compound interest monthly, final debt
+    return loan_debt_cents(principal, rate, months_passed)
+
+def accrue_columns(principal, rate, start_month, current_month: int) -> List[Cents]:
+    """
+    Compound many loans given as columns of principal cents, annual rate and
+    start month (year * 12 + month), to the same cents as calculate_loan_debt.
+    With NumPy installed the floats are computed in one vectorized pass and
+    only the debts near a half cent are redone exactly with compound_cents.
+    """
+    if np is not None and len(principal):
+        months_passed = current_month - np.asarray(start_month, dtype=np.int64)
+        principal = np.asarray(principal, dtype=np.int64)
+        rate = np.asarray(rate, dtype=np.float64)
+        compounded = principal * (1 + rate / 12) ** np.maximum(months_passed, 0)
+        debts = np.where(months_passed > 0, np.floor(compounded + 0.5).astype(np.int64), principal).tolist()
+        halves = np.abs(compounded - np.floor(compounded) - 0.5) <= HALF_CENT_GUARD * np.maximum(compounded, 1.0)
+        for i in np.flatnonzero(halves & (months_passed > 0)).tolist():
+            debts[i] = compound_cents(principal[i], rate[i], months_passed[i])
+        return debts
+    return [loan_debt_cents(amount, interest_rate, current_month - start)
+            for amount, interest_rate, start in zip(principal, rate, start_month)]
+
+def accrue_loans_batch(loans: List[Transaction], today: date | None = None) -> List[Cents]:
+    """
+    Calculate the current debt of many loans in one pass and write their interest back.
 
+    With NumPy installed principals, rates and loan ages are packed into arrays
+    and compounded in a single vectorized expression, otherwise it loops in
+    Python. Either way each debt is the cent calculate_loan_debt gives.
+
+    :param loans: Transaction objects of type "Loan"
+    :param today: Date to calculate the debt at (defaults to today)
+    :return: Current debt of each loan, in the same order
+    """
+    today = today or date.today()
+    debts = accrue_columns(
+        [loan.amount for loan in loans],
+        [loan.interest_rate for loan in loans],
+        [loan.transaction_date.year * 12 + loan.transaction_date.month for loan in loans],
+        today.year * 12 + today.month
+    )
+    for loan, debt in zip(loans, debts):
+        loan.interest = debt - loan.amount
+    return debts
+
+
+
+# ====== METRICS ======
+# Latency histograms, call counts and row and byte counters for the hot
+# paths. Off unless BANK_METRICS is set (or one of the outputs below is):
+# while off, an instrumented call costs one flag check, and METRICS.enabled
+# switches it at any time. BANK_METRICS_FILE is rewritten every
+# BANK_METRICS_INTERVAL seconds in the Prometheus text format (e.g. for
+# node_exporter's textfile collector), BANK_METRICS_PORT serves the same text
+# at http://127.0.0.1:PORT/metrics, and BANK_PROFILE names a file collecting
+# cProfile stats of the instrumented calls (read it with pstats).
+METRICS_FILE = os.environ.get("BANK_METRICS_FILE") or None
+METRICS_PORT = int(os.environ["BANK_METRICS_PORT"]) if os.environ.get("BANK_METRICS_PORT") else None
+METRICS_INTERVAL = float(os.environ.get("BANK_METRICS_INTERVAL", "15"))
+PROFILE_FILE = os.environ.get("BANK_PROFILE") or None
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+COUNTERS = {
+    "rows_read": "Rows read from files.",
+    "rows_written": "Rows written to files.",
+    "bytes_flushed": "Bytes written to files.",
+    "errors": "Instrumented calls that raised.",
+}
+
+class Histogram:
+    """Latencies counted into LATENCY_BUCKETS (the last slot is for anything slower), with their sum."""
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+class Metrics:
+    """
+    The process' measurements: a latency Histogram per operation and
+    counters per (counter, operation). Safe to update from several threads.
+    With a profiler set, instrumented calls are also profiled, one at a time:
+    calls that start while another is being profiled are only timed.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.latency: dict[str, Histogram] = {}
+        self.counters: dict[tuple[str, str], float] = {}
+        self.profiler: cProfile.Profile | None = None
+        self._profiling = threading.Lock()
+
+    def call(self, operation: str, function, args, kwargs):
+        profiler = self.profiler
+        profiled = profiler is not None and self._profiling.acquire(blocking=False)
+        failed = True
+        start = time.perf_counter()
+        try:
+            if profiled:
+                profiler.enable()
+            result = function(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            if profiled:
+                profiler.disable()
+                self._profiling.release()
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                histogram = self.latency.get(operation)
+                if histogram is None:
+                    histogram = self.latency[operation] = Histogram()
+                histogram.observe(elapsed)
+                if failed:
+                    self.counters[("errors", operation)] = self.counters.get(("errors", operation), 0) + 1
+
+    def count(self, counter: str, operation: str, value: float) -> None:
+        if self.enabled:
+            with self.lock:
+                self.counters[(counter, operation)] = self.counters.get((counter, operation), 0) + value
+
+    def reset(self) -> None:
+        with self.lock:
+            self.latency.clear()
+            self.counters.clear()
+
+    def prometheus_text(self) -> str:
+        with self.lock:
+            latency = {operation: (list(histogram.counts), histogram.total, histogram.count)
+                       for operation, histogram in self.latency.items()}
+            counters = dict(self.counters)
+        lines = ["# HELP bank_call_seconds Time spent in instrumented calls.", "# TYPE bank_call_seconds histogram"]
+        for operation, (counts, total, count) in sorted(latency.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*LATENCY_BUCKETS, "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(f'bank_call_seconds_bucket{{op="{operation}",le="{bound}"}} {cumulative}')
+            lines.append(f'bank_call_seconds_sum{{op="{operation}"}} {total}')
+            lines.append(f'bank_call_seconds_count{{op="{operation}"}} {count}')
+        for counter, description in COUNTERS.items():
+            lines += [f"# HELP bank_{counter}_total {description}", f"# TYPE bank_{counter}_total counter"]
+            for (name, operation), value in sorted(counters.items()):
+                if name == counter:
+                    lines.append(f'bank_{counter}_total{{op="{operation}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str) -> None:
+        temp_path = file_path + ".tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.prometheus_text())
+        os.replace(temp_path, file_path)  # scrapers never see half a file
+
+    def dump_profile(self, file_path: str) -> None:
+        if self.profiler is not None:
+            with self._profiling:
+                self.profiler.dump_stats(file_path)
+
+METRICS = Metrics(enabled=bool(os.environ.get("BANK_METRICS") or METRICS_FILE or METRICS_PORT or PROFILE_FILE))
+
+def instrumented(operation: str, rows_read: Callable[[Any], int] | None = None):
+    """
+    Time every call of the decorated function under operation's name.
+    rows_read, given the result, says how many rows the call read.
+    """
+    def decorate(function):
+        @wraps(function)
+        def instrumented_function(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            result = METRICS.call(operation, function, args, kwargs)
+            if rows_read is not None:
+                METRICS.count("rows_read", operation, rows_read(result))
+            return result
+        return instrumented_function
+    return decorate
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.metrics.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would flood the teller's terminal
+
+def start_metrics(metrics: Metrics = METRICS, file_path: str | None = METRICS_FILE, port: int | None = METRICS_PORT,
+                  interval: float = METRICS_INTERVAL, profile_path: str | None = PROFILE_FILE):
+    """
+    Start the configured outputs: a thread rewriting file_path and
+    profile_path every interval seconds (and once more at exit), and an HTTP
+    server on 127.0.0.1:port. Returns the HTTP server, if one was started.
+    """
+    if profile_path and metrics.profiler is None:
+        metrics.profiler = cProfile.Profile()
+
+    def dump():
+        try:
+            if file_path:
+                metrics.write(file_path)
+            if profile_path:
+                metrics.dump_profile(profile_path)
+        except OSError as error:
+            print(f"Could not write metrics: {error}", file=sys.stderr)
+
+    if file_path or profile_path:
+        def keep_dumping():
+            while True:
+                time.sleep(interval)
+                dump()
+        threading.Thread(target=keep_dumping, name="metrics-dump", daemon=True).start()
+        atexit.register(dump)
+    if port is None:
+        return None
+    handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# ====== REPOSITORY ======
+def _locked(method):
+    @wraps(method)
+    def locked_method(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked_method
+
+class IndexedList(list):
+    """
+    A list that keeps dict indexes from field values to positions.
+
+    Appends and set_field() update the indexes in O(1). Anything that shifts
+    positions (pop, remove, insert, sort...) rebuilds them, which costs no more
+    than the list operation itself. When several items share a value the
+    first one wins, same as a linear scan would.
+
+    group_fields adds secondary indexes from a value to every item holding
+    it, kept sorted by order_by (e.g. all transactions of one account by date).
+
+    Objects in listeners get on_append(item), on_change(item, field_name,
+    old_value) and on_remove(item) calls, so derived state can follow the list.
+
+    Every mutation (listeners included) runs under self.lock, so worker
+    threads can append and update items concurrently.
+
+    groups can hand in group indexes that were already built (e.g. by a
+    snapshot); they must match what _rebuild_groups() would produce.
+    """
+    def __init__(self, items=(), index_fields=(), group_fields=(), order_by: str | None = None,
+                 groups: dict[str, dict] | None = None):
+        super().__init__(items)
+        self.index_fields = tuple(index_fields)
+        self.group_fields = tuple(group_fields)
+        self.order_by = order_by
+        self.listeners: list = []
+        self.lock = threading.RLock()
+        self._rebuild_indexes()
+        if groups is None:
+            self._rebuild_groups()
+        else:
+            self.groups = groups
+
+    def _rebuild(self) -> None:
+        self._rebuild_indexes()
+        self._rebuild_groups()
+
+    def _rebuild_indexes(self) -> None:
+        self.indexes: dict[str, dict] = {}
+        positions = range(len(self) - 1, -1, -1)
+        for field_name in self.index_fields:
+            values = list(map(attrgetter(field_name), reversed(self)))
+            self.indexes[field_name] = dict(zip(values, positions))  # back to front, so the first one wins
+
+    def _rebuild_groups(self) -> None:
+        self.groups: dict[str, dict] = {field_name: {} for field_name in self.group_fields}
+        for item in self:
+            for field_name, groups in self.groups.items():
+                groups.setdefault(getattr(item, field_name), []).append(item)
+        if self.order_by:
+            order_key = self._order_key
+            for groups in self.groups.values():
+                for members in groups.values():
+                    members.sort(key=order_key)
+
+    def _order_key(self, item):
+        return getattr(item, self.order_by)
+
+    def _index_item(self, i: int, item) -> None:
+        for field_name, index in self.indexes.items():
+            index.setdefault(getattr(item, field_name), i)
+
+    def _group_item(self, item) -> None:
+        for field_name, groups in self.groups.items():
+            members = groups.setdefault(getattr(item, field_name), [])
+            if self.order_by and members and self._order_key(item) < self._order_key(members[-1]):
+                bisect.insort_right(members, item, key=self._order_key)
+            else:
+                members.append(item)  # the usual case: new records are the most recent
+
+    def position(self, field_name: str, value) -> int:
+        return self.indexes[field_name].get(value, -1)
+
+    def group(self, field_name: str, value) -> list:
+        """Items whose field equals value, in order_by order. Do not modify the result."""
+        return self.groups[field_name].get(value, [])
+
+    @_locked
+    def set_field(self, i: int, field_name: str, value) -> None:
+        """Change a field of the item at position i, keeping the indexes valid."""
+        item = self[i]
+        old_value = getattr(item, field_name)
+        setattr(item, field_name, value)
+        if old_value != value and (field_name in self.groups or field_name == self.order_by):
+            self._rebuild_groups()
+        if field_name in self.indexes and old_value != value:
+            index = self.indexes[field_name]
+            if index.get(old_value) == i:
+                del index[old_value]
+                for j, other in enumerate(self):  # only reached for duplicated keys
+                    if getattr(other, field_name) == old_value:
+                        index[old_value] = j
+                        break
+            if index.get(value, len(self)) > i:
+                index[value] = i
+        for listener in self.listeners:
+            listener.on_change(item, field_name, old_value)
+
+    @_locked
+    def append(self, item) -> None:
+        super().append(item)
+        self._index_item(len(self) - 1, item)
+        self._group_item(item)
+        for listener in self.listeners:
+            listener.on_append(item)
+
+    @_locked
+    def extend(self, items) -> None:
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def _removed(self, items) -> None:
+        self._rebuild()
+        for item in items:
+            for listener in self.listeners:
+                listener.on_remove(item)
+
+    @_locked
+    def pop(self, i: int = -1):
+        item = super().pop(i)
+        self._removed([item])
+        return item
+
+    @_locked
+    def remove(self, item) -> None:
+        super().remove(item)
+        self._removed([item])
+
+    @_locked
+    def remove_many(self, items) -> None:
+        """Remove every one of items (compared by identity) with a single rebuild of the indexes."""
+        gone = {id(item) for item in items}
+        removed = [item for item in self if id(item) in gone]
+        super().__setitem__(slice(None), [item for item in self if id(item) not in gone])
+        self._removed(removed)
+
+    @_locked
+    def insert(self, i: int, item) -> None:
+        super().insert(i, item)
+        self._rebuild()
+
+    @_locked
+    def clear(self) -> None:
+        items = list(self)
+        super().clear()
+        self._removed(items)
+
+    @_locked
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._rebuild()
+
+    @_locked
+    def reverse(self) -> None:
+        super().reverse()
+        self._rebuild()
+
+    @_locked
+    def __setitem__(self, i, item) -> None:
+        old_items = self[i] if isinstance(i, slice) else [self[i]]
+        super().__setitem__(i, item)
+        self._removed(old_items)
+        for new_item in (item if isinstance(i, slice) else [item]):
+            for listener in self.listeners:
+                listener.on_append(new_item)
+
+    @_locked
+    def __delitem__(self, i) -> None:
+        old_items = self[i] if isinstance(i, slice) else [self[i]]
+        super().__delitem__(i)
+        self._removed(old_items)
+
+
+LOCK_STRIPES = 64
+
+class AccountLocks:
+    """
+    Striped locks for account operations: each account number maps to one of
+    a fixed set of locks, so memory stays constant however many accounts
+    there are while operations on different stripes run in parallel.
+    """
+    def __init__(self, stripes: int = LOCK_STRIPES):
+        self.stripes = [threading.Lock() for _ in range(stripes)]
+
+    def stripe(self, acc_number: str) -> int:
+        return hash(acc_number) % len(self.stripes)
+
+    @contextmanager
+    def hold(self, *acc_numbers: str):
+        """Hold the locks of every given account, taken in stripe order so callers can't deadlock."""
+        locks = [self.stripes[i] for i in sorted({self.stripe(acc_number) for acc_number in acc_numbers})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+class Repository:
+    """
+    Owns the in-memory operators, clients and transactions, indexed by their ids.
+
+    debt_month is the month (see month_key) the client debts and loan interest
+    were accrued for when they come from a snapshot, so the debt pass can be skipped.
+    """
+    def __init__(self, operators: List[Operator], clients: List[Client], transactions: List[Transaction],
+                 transaction_groups: dict[str, dict] | None = None, debt_month: int | None = None):
+        self.operators = IndexedList(operators, ("operator_id",))
+        self.clients = IndexedList(clients, ("acc_number", "client_id"))
+        self.transactions = IndexedList(
+            transactions, ("Transaction_id",),
+            group_fields=("client_acc_number",), order_by="transaction_date", groups=transaction_groups
+        )
+        self.account_locks = AccountLocks()
+        self.debt_month = debt_month
+
+
+# ====== COLUMNAR TRANSACTIONS ======
+class _IdColumn:
+    """Fixed-width digit ids packed into an int64 array; empty is -2, any other value is kept aside as a str."""
+    def __init__(self, width: int):
+        self.width = width
+        self.values = array("q")
+        self.other: dict[int, str] = {}
+
+    def _pack(self, row: int, value: str) -> int:
+        self.other.pop(row, None)
+        if len(value) == self.width and value.isdigit():
+            return int(value)
+        if not value:
+            return -2
+        self.other[row] = sys.intern(value)
+        return -1
+
+    def append(self, value: str) -> None:
+        self.values.append(self._pack(len(self.values), value))
+
+    def __getitem__(self, row: int) -> str:
+        number = self.values[row]
+        if number < 0:
+            return "" if number == -2 else self.other[row]
+        return str(number).zfill(self.width)
+
+    def __setitem__(self, row: int, value: str) -> None:
+        self.values[row] = self._pack(row, value)
+
+
+class TransactionTable:
+    """
+    Struct-of-arrays storage for transactions.
+
+    Amounts live in int64 arrays of cents, rates in float64, dates as day
+    ordinals, types as one-byte codes and ids as packed integers, so a row
+    costs a few dozen bytes instead of a full object. Indexing returns a TransactionRow view
+    that code written against Transaction can use unchanged.
+    """
+    FLOAT_FIELDS = ("interest_rate",)
+    CENTS_FIELDS = ("interest", "amount", "original_amount")
+    ID_WIDTHS = {"operator_id": 5, "client_acc_number": 8, "Transaction_id": 12, "loan_id": 12}
+
+    def __init__(self, transactions=()):
+        self.types: list[str] = []
+        self.type_codes: dict[str, int] = {}
+        self.columns: dict[str, Any] = {
+            "transaction_type": array("B"),
+            "transaction_name": [],
+            "transaction_date": array("i"),
+        }
+        for field_name in self.FLOAT_FIELDS:
+            self.columns[field_name] = array("d")
+        for field_name in self.CENTS_FIELDS:
+            self.columns[field_name] = array("q")
+        for field_name, width in self.ID_WIDTHS.items():
+            self.columns[field_name] = _IdColumn(width)
+        for transaction in transactions:
+            self.append(transaction)
+
+    def _encode(self, field_name: str, value):
+        if field_name == "transaction_type":
+            if value not in self.type_codes:
+                self.type_codes[value] = len(self.types)
+                self.types.append(value)
+            return self.type_codes[value]
+        if field_name == "transaction_date":
+            return value.toordinal()
+        if field_name == "transaction_name":
+            return sys.intern(value)
+        return value
+
+    def append(self, transaction) -> None:
+        for field_name, column in self.columns.items():
+            column.append(self._encode(field_name, getattr(transaction, field_name)))
+
+    def extend(self, transactions) -> None:
+        for transaction in transactions:
+            self.append(transaction)
+
+    def get(self, row: int, field_name: str):
+        value = self.columns[field_name][row]
+        if field_name == "transaction_type":
+            return self.types[value]
+        if field_name == "transaction_date":
+            return date.fromordinal(value)
+        return value
+
+    def set(self, row: int, field_name: str, value) -> None:
+        self.columns[field_name][row] = self._encode(field_name, value)
+
+    def to_transaction(self, row: int) -> Transaction:
+        return Transaction(**{field_name: self.get(row, field_name) for field_name in self.columns})
+
+    def numpy_column(self, field_name: str):
+        """Zero-copy NumPy view of a numeric column (amounts, rates, date ordinals)."""
+        return np.frombuffer(self.columns[field_name], dtype=self.columns[field_name].typecode)
+
+    def __len__(self) -> int:
+        return len(self.columns["transaction_date"])
+
+    def __getitem__(self, row: int) -> "TransactionRow":
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("transaction table index out of range")
+        return TransactionRow(self, row)
+
+    def __iter__(self) -> Iterator["TransactionRow"]:
+        for row in range(len(self)):
+            yield TransactionRow(self, row)
+
+
+class TransactionRow:
+    """Lightweight view of one TransactionTable row that reads and writes like a Transaction."""
+    __slots__ = ("_table", "_row")
+    # lets asdict(), save_to_csv and the journal treat a row like the dataclass
+    __dataclass_fields__ = Transaction.__dataclass_fields__
+
+    def __init__(self, table: TransactionTable, row: int):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_row", row)
+
+    def __getattr__(self, name: str):
+        if name not in Transaction.__dataclass_fields__:
+            raise AttributeError(name)
+        return self._table.get(self._row, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name not in Transaction.__dataclass_fields__:
+            raise AttributeError(name)
+        self._table.set(self._row, name, value)
+
+    def __repr__(self) -> str:
+        return f"TransactionRow({self._table.to_transaction(self._row)!r})"
 
 
 # ====== CSV HANDLING ======
@@ -118,114 +817,1164 @@ def ensure_csv_exists(file_path: str, headers: list[str]) -> None:
             writer = csv.DictWriter(csvfile, fieldnames=headers)
             writer.writeheader()
 
+def to_row(item) -> dict:
+    """A dataclass as a file row, with money as dollar text ("12.50") rather than cents."""
+    row = asdict(item)
+    for field_name, field in item.__dataclass_fields__.items():
+        if field.type is Cents:
+            row[field_name] = money_text(row[field_name])
+    return row
+
+@instrumented("save_to_csv")
 def save_to_csv(file_path: str, data_list: list) -> None:
     if not data_list:
         print("No data to save.")
         return
     fieldnames = data_list[0].__dataclass_fields__.keys()
-    with open(file_path, mode="w", newline='', encoding="utf-8") as csvfile:
+    temp_path = file_path + ".tmp"
+    with open(temp_path, mode="w", newline='', encoding="utf-8") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         for item in data_list:
-            writer.writerow(asdict(item))
+            writer.writerow(to_row(item))
+        written = csvfile.tell()
+    os.replace(temp_path, file_path)  # never leave a half-written CSV behind
+    METRICS.count("rows_written", "save_to_csv", len(data_list))
+    METRICS.count("bytes_flushed", "save_to_csv", written)
 
 
 # ====== LOADERS ======
+def operator_from_row(row: dict) -> Operator:
+    return Operator(
+        operator_id=row["operator_id"],
+        operator_password=row["operator_password"],
+        operator_name=row["operator_name"],
+        access_level=int(row["access_level"])
+    )
+
+def client_from_row(row: dict, money: Callable[[Any], Cents] = to_cents) -> Client:
+    return Client(
+        client_id=row["client_id"],
+        client_name=row["client_name"],
+        acc_number=row["acc_number"],
+        agency_number=row["agency_number"],
+        creation_date=date.fromisoformat(row["creation_date"]),
+        client_password=row["client_password"],
+        balance=money(row["balance"]),
+        debt=money(row["debt"])
+    )
+
+def transaction_from_row(row: dict, money: Callable[[Any], Cents] = to_cents) -> Transaction:
+    """
+    Build a Transaction from a CSV row, a journal entry or a database row.
+    Files hold money as dollar text; the database passes money=int for its cents columns.
+    """
+    # the repeating strings are interned so each distinct value is stored once
+    return Transaction(
+        transaction_type=sys.intern(row["transaction_type"]),
+        transaction_name=sys.intern(row["transaction_name"]),
+        transaction_date=date.fromisoformat(row["transaction_date"]),
+        interest_rate=float(row["interest_rate"]),
+        interest=money(row["interest"]),
+        amount=money(row["amount"]),
+        operator_id=sys.intern(row["operator_id"]),
+        client_acc_number=sys.intern(row["client_acc_number"]),
+        Transaction_id=row["Transaction_id"],
+        original_amount=money(row["original_amount"]),
+        loan_id=(row["loan_id"] or "") if "loan_id" in row.keys() else ""  # files from before the column
+    )
+
+@instrumented("load_operators", rows_read=len)
 def load_operators(file_path: str) -> List[Operator]:
     operators = []
     with open(file_path, newline='', encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            operators.append(
-                Operator(
-                    operator_id=row["operator_id"],
-                    operator_password=row["operator_password"],
-                    operator_name=row["operator_name"],
-                    access_level=int(row["access_level"])
-                )
-            )
+            operators.append(operator_from_row(row))
     return operators
 
+@instrumented("load_clients", rows_read=len)
 def load_clients(file_path: str) -> List[Client]:
     clients = []
     with open(file_path, newline='', encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            clients.append(
-                Client(
-                    client_id=row["client_id"],
-                    client_name=row["client_name"],
-                    acc_number=row["acc_number"],
-                    agency_number=row["agency_number"],
-                    creation_date=date.fromisoformat(row["creation_date"]),
-                    client_password=row["client_password"],
-                    balance=float(row["balance"]),
-                    debt=float(row["debt"])
-                )
-            )
+            clients.append(client_from_row(row))
     return clients
 
-def load_transactions(file_path: str) -> List[Transaction]:
-    transactions = []
-
+def iter_transactions(file_path: str) -> Iterator[Transaction]:
+    """Stream transactions from a CSV file one row at a time."""
     with open(file_path, newline='', encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            transactions.append(
-                Transaction(
-                    transaction_type=row["transaction_type"],
-                    transaction_name=row["transaction_name"],
-                    transaction_date=date.fromisoformat(row["transaction_date"]),
-                    interest_rate=float(row["interest_rate"]),
-                    interest=float(row["interest"]),
-                    amount=float(row["amount"]),
-                    operator_id=row["operator_id"],
-                    client_acc_number=row["client_acc_number"],
-                    Transaction_id=row["Transaction_id"],
-                    original_amount=float(row["original_amount"])
+            yield transaction_from_row(row)
+
+@instrumented("load_transactions", rows_read=len)
+def load_transactions(file_path: str, keep: Callable[[Transaction], bool] | None = None) -> List[Transaction]:
+    """Load the transactions for which keep() is true (all of them by default)."""
+    if keep is None:
+        return list(iter_transactions(file_path))
+    return [transaction for transaction in iter_transactions(file_path) if keep(transaction)]
+
+
+# ====== WORKING SET ======
+# With BANK_WORKING_SET_DAYS set only open loans and the last N days of
+# transactions are kept in memory; older history is paged in from storage
+# when it is actually needed (e.g. printing a full statement).
+WORKING_SET_DAYS: int | None = int(os.environ["BANK_WORKING_SET_DAYS"]) if os.environ.get("BANK_WORKING_SET_DAYS") else None
+
+def working_set_filter(days: int | None) -> Callable[[Transaction], bool] | None:
+    if days is None:
+        return None
+    cutoff = date.today() - timedelta(days=days)
+    return lambda t: t.transaction_type.lower() == "loan" or t.transaction_date >= cutoff
+
+
+# ====== TRANSACTION FILE INDEX ======
+# A sidecar next to transactions.csv maps transaction ids and account
+# numbers to the byte offsets of their rows, so a single lookup decodes one
+# row of the mapped file instead of loading all of it. The index is built
+# once per file, extended when rows were only appended, and rebuilt when
+# the file was rewritten.
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"BANKTIDX"
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<8sIqqI4x")  # magic, version, bytes covered, rows, fingerprint
+_FINGERPRINT_BYTES = 4096
+
+def _index_key(text: str | bytes) -> int:
+    """Ids and account numbers are digit strings; anything else is hashed (rows are checked after decoding)."""
+    if text.isascii() and text.isdigit() and len(text) <= 18:
+        return int(text)
+    return 1 << 62 | zlib.crc32(text if isinstance(text, bytes) else text.encode("utf-8"))
+
+def _sorted_entries(keys: list[int], positions: list[int]) -> list[bytes]:
+    """The keys in order and their positions alongside; stable, so equal keys keep file order."""
+    if np is not None:
+        key_array = np.array(keys, dtype=np.int64)
+        order = np.argsort(key_array, kind="stable")
+        return [key_array[order].tobytes(), np.array(positions, dtype=np.int64)[order].tobytes()]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return [array("q", map(keys.__getitem__, order)).tobytes(), array("q", map(positions.__getitem__, order)).tobytes()]
+
+class TransactionFile:
+    """Random access to the rows of a transactions CSV through mmap and a sidecar offset index."""
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.index_path = file_path + INDEX_SUFFIX
+        self.lock = threading.RLock()
+        self._stat = None
+        self._mapped = self._index_mapped = None
+        self._fields: list[str] = []
+        self._views: list[memoryview] = []  # id keys, id offsets, account keys, account offsets
+
+    @_locked
+    def find(self, transaction_id: str) -> Transaction | None:
+        for transaction in self._rows(0, transaction_id):
+            if transaction.Transaction_id == transaction_id:
+                return transaction
+        return None
+
+    @_locked
+    def history(self, acc_number: str) -> List[Transaction]:
+        """The account's rows in file order."""
+        return [t for t in self._rows(2, acc_number) if t.client_acc_number == acc_number]
+
+    @_locked
+    def close(self) -> None:
+        """Release the mappings, e.g. before the file is replaced; the next lookup maps it again."""
+        self._release_index()
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        self._stat = None
+
+    def _release_index(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._index_mapped is not None:
+            self._index_mapped.close()
+            self._index_mapped = None
+
+    def _rows(self, column: int, text: str) -> Iterator[Transaction]:
+        self._sync()
+        if not self._views:
+            return
+        keys, offsets = self._views[column], self._views[column + 1]
+        key = _index_key(text)
+        low = bisect.bisect_left(keys, key)
+        for offset in offsets[low:bisect.bisect_right(keys, key, low)].tolist():
+            yield self._decode(offset)
+
+    def _decode(self, offset: int) -> Transaction:
+        end = offset
+        while True:
+            end = self._mapped.find(b"\n", end) + 1 or len(self._mapped)
+            if self._mapped[offset:end].count(b'"') % 2 == 0 or end == len(self._mapped):
+                break
+        values = next(csv.reader([self._mapped[offset:end].decode("utf-8")]))
+        return transaction_from_row(dict(zip(self._fields, values)))
+
+    def _sync(self) -> None:
+        """Map the current file and make sure the index covers all of it."""
+        stat = os.stat(self.file_path)
+        if (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._stat:
+            return
+        self.close()
+        if stat.st_size == 0:
+            return
+        with open(self.file_path, mode="rb") as csv_file:
+            self._mapped = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ)
+        data_start = self._mapped.find(b"\n") + 1 or len(self._mapped)
+        self._fields = next(csv.reader([self._mapped[:data_start].decode("utf-8")]), [])
+        covered = self._load_index(data_start)
+        if covered != len(self._mapped):
+            self._write_index(covered, data_start)
+            self._load_index(data_start)
+        self._stat = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _fingerprint(self, covered: int, data_start: int) -> int:
+        return zlib.crc32(self._mapped[max(data_start, covered - _FINGERPRINT_BYTES):covered])
+
+    def _load_index(self, data_start: int) -> int:
+        """Map the sidecar if it matches the file; returns how much of the file it covers."""
+        try:
+            with open(self.index_path, mode="rb") as index_file:
+                index_mapped = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing, or empty
+            return data_start
+        try:
+            magic, version, covered, rows, fingerprint = _INDEX_HEADER.unpack_from(index_mapped)
+        except struct.error:
+            magic = b""
+        if (magic != INDEX_MAGIC or version != INDEX_VERSION
+                or len(index_mapped) != _INDEX_HEADER.size + 4 * 8 * rows
+                or not data_start <= covered <= len(self._mapped)
+                or fingerprint != self._fingerprint(covered, data_start)):
+            index_mapped.close()
+            return data_start
+        with memoryview(index_mapped) as whole:
+            self._views = [whole[start:start + 8 * rows].cast("q")
+                           for start in range(_INDEX_HEADER.size, len(index_mapped), 8 * rows or 1)]
+        self._index_mapped = index_mapped
+        return covered
+
+    def _write_index(self, covered: int, data_start: int) -> None:
+        """Index the rows after covered, merged with the entries already indexed, and replace the sidecar."""
+        id_field, account_field = self._fields.index("Transaction_id"), self._fields.index("client_acc_number")
+        offsets, ids, accounts = [], [], []
+        self._mapped.seek(covered)  # read the mapping, so rows appended meanwhile wait for the next sync
+        start, pending = covered, b""
+        for line in iter(self._mapped.readline, b""):
+            if pending:
+                line = pending + line
+            if b'"' in line:
+                if line.count(b'"') % 2:
+                    pending = line  # a quoted field runs on to the next line
+                    continue
+                values = [value.encode("utf-8") for value in next(csv.reader([line.decode("utf-8")]))]
+            else:
+                values = line.rstrip(b"\r\n").split(b",")
+            pending = b""
+            if len(values) == len(self._fields):  # not a blank line
+                offsets.append(start)
+                ids.append(values[id_field])
+                accounts.append(values[account_field])
+            start += len(line)
+        columns = []
+        for view_number, texts in ((0, ids), (2, accounts)):
+            keys = self._views[view_number].tolist() if self._views else []
+            positions = self._views[view_number + 1].tolist() if self._views else []
+            keys += map(_index_key, texts)
+            positions += offsets
+            columns += _sorted_entries(keys, positions)
+        fingerprint = self._fingerprint(len(self._mapped), data_start)
+        self._release_index()
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, mode="wb") as index_file:
+            index_file.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self._mapped), len(columns[0]) // 8,
+                                                fingerprint))
+            for column in columns:
+                index_file.write(column)
+        os.replace(temp_path, self.index_path)
+
+
+# ====== TRANSACTION ARCHIVE ======
+# Compaction moves settled history older than the last BANK_HOT_MONTHS
+# months out of transactions.csv into read-only monthly partitions under
+# archive/, one CSV per month with its own offset index. archive/manifest.json
+# lists the partitions, so nothing of the archive is read at startup and a
+# lookup only maps the partitions it searches.
+ARCHIVE_DIR = "archive"
+ARCHIVE_MANIFEST = "manifest.json"
+HOT_MONTHS = int(os.environ.get("BANK_HOT_MONTHS", "12"))  # whole months of history compaction keeps
+
+def hot_cutoff(months: int, today: date | None = None) -> date:
+    """The first day of the oldest month compaction keeps."""
+    return month_start(month_key(today or date.today()) - months)
+
+def archivable(transaction: Transaction, cutoff: date) -> bool:
+    """Settled history from before cutoff; open loans are never archived."""
+    return transaction.transaction_date < cutoff and not is_open_loan(transaction)
+
+def _sync_file(file) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+
+class TransactionArchive:
+    """
+    The monthly partitions of archived transactions, as listed by the manifest.
+    Only add() writes them: it rewrites a month's partition whole and replaces
+    the manifest last, so a crash leaves every partition readable.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, ARCHIVE_MANIFEST)
+        self.lock = threading.RLock()
+        self.files: dict[str, TransactionFile] = {}  # opened on first lookup
+        try:
+            with open(self.manifest_path, encoding="utf-8") as manifest_file:
+                self.partitions: dict[str, dict] = json.load(manifest_file)["partitions"]
+        except FileNotFoundError:
+            self.partitions = {}
+
+    def _file(self, month: str) -> TransactionFile:
+        if month not in self.files:
+            self.files[month] = TransactionFile(os.path.join(self.directory, self.partitions[month]["file"]))
+        return self.files[month]
+
+    @_locked
+    def history(self, acc_number: str) -> List[Transaction]:
+        """The account's archived rows, oldest month first."""
+        return [transaction for month in sorted(self.partitions) for transaction in self._file(month).history(acc_number)]
+
+    @_locked
+    def find(self, transaction_id: str) -> Transaction | None:
+        for month in sorted(self.partitions, reverse=True):
+            transaction = self._file(month).find(transaction_id)
+            if transaction is not None:
+                return transaction
+        return None
+
+    def __iter__(self) -> Iterator[Transaction]:
+        """Every archived transaction, oldest month first."""
+        for month in sorted(self.partitions):
+            yield from iter_transactions(os.path.join(self.directory, self.partitions[month]["file"]))
+
+    @_locked
+    def add(self, rows: Iterable[dict]) -> int:
+        """Append transaction rows, as read from a transactions CSV, to their months' partitions; returns how many."""
+        os.makedirs(self.directory, exist_ok=True)
+        fieldnames = list(Transaction.__dataclass_fields__.keys())
+        outputs: dict[str, tuple] = {}
+        entries: dict[str, dict] = {}
+        given = 0
+        try:
+            for row in rows:
+                given += 1
+                day = row["transaction_date"]
+                month = day[:7]
+                if month not in outputs:
+                    file_name = month + ".csv"
+                    output = open(os.path.join(self.directory, file_name + ".tmp"), mode="w", newline='',
+                                  encoding="utf-8")
+                    writer = csv.DictWriter(output, fieldnames=fieldnames)
+                    writer.writeheader()
+                    archived = set()
+                    if month in self.partitions:  # rows archived by an earlier compaction stay first
+                        with open(os.path.join(self.directory, file_name), newline='', encoding="utf-8") as old:
+                            for old_row in csv.DictReader(old):
+                                archived.add(old_row["Transaction_id"])
+                                writer.writerow(old_row)
+                    outputs[month] = (output, writer, archived)
+                    known = self.partitions.get(month, {})
+                    entries[month] = {"file": file_name, "rows": len(archived),
+                                      "first": known.get("first"), "last": known.get("last")}
+                output, writer, archived = outputs[month]
+                if row["Transaction_id"] in archived:
+                    continue  # moved before, by a compaction that stopped before transactions.csv was replaced
+                archived.add(row["Transaction_id"])
+                writer.writerow(row)
+                entry = entries[month]
+                entry["rows"] += 1
+                if entry["first"] is None or day < entry["first"]:
+                    entry["first"] = day
+                if entry["last"] is None or day > entry["last"]:
+                    entry["last"] = day
+            for output, _, _ in outputs.values():
+                _sync_file(output)  # on disk before the rows leave transactions.csv
+        finally:
+            for output, _, _ in outputs.values():
+                output.close()
+        for month, entry in entries.items():
+            if month in self.files:
+                self.files.pop(month).close()
+            path = os.path.join(self.directory, entry["file"])
+            os.replace(path + ".tmp", path)
+            self.partitions[month] = entry
+        if entries:
+            self._write_manifest()
+        return given
+
+    def _write_manifest(self) -> None:
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as manifest_file:
+            json.dump({"version": 1, "partitions": dict(sorted(self.partitions.items()))}, manifest_file, indent=1)
+            _sync_file(manifest_file)
+        os.replace(temp_path, self.manifest_path)
+
+    @_locked
+    def close(self) -> None:
+        for transaction_file in self.files.values():
+            transaction_file.close()
+        self.files.clear()
+
+
+# ====== JOURNAL ======
+JOURNAL_FILE = "journal.log"
+JOURNAL_SNAPSHOT_EVERY = 1000  # operations between automatic CSV snapshots
+
+class Journal:
+    """
+    Append-only write-ahead log for client balances and transaction rows.
+
+    Each operation is written as one JSON line and fsync'd before returning,
+    so persisting an operation costs the same no matter how big the CSVs get.
+    Entries hold the state after the operation (not deltas), which keeps
+    replaying them idempotent if we crash in the middle of a snapshot.
+    """
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.entries = 0
+        if os.path.exists(file_path):
+            with open(file_path, "rb+") as journal_file:
+                data = journal_file.read()
+                if data and not data.endswith(b"\n"):  # torn last line from a crash: cut it off
+                    journal_file.truncate(data.rfind(b"\n") + 1)  # so the next entry starts on its own line
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+                self.entries = data.count(b"\n")
+        self._file = open(file_path, mode="a", encoding="utf-8")
+
+    def append(self, clients: List[Client], transactions: List[Transaction]) -> None:
+        entry = {
+            "clients": [
+                {"acc_number": c.acc_number, "balance": money_text(c.balance), "debt": money_text(c.debt)}
+                for c in clients
+            ],
+            "transactions": [to_row(t) for t in transactions],
+        }
+        line = json.dumps(entry, default=str) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries += 1
+        METRICS.count("rows_written", "journal", len(clients) + len(transactions))
+        METRICS.count("bytes_flushed", "journal", len(line))  # json.dumps escapes to ASCII: one byte a character
+
+    def truncate(self) -> None:
+        self._file.truncate(0)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def replay_journal(file_path: str, clients: List[Client], transactions: List[Transaction]) -> int:
+    """Apply journal entries on top of the data loaded from CSV. Returns how many were applied."""
+    if not os.path.exists(file_path):
+        return 0
+    replayed = 0
+    with open(file_path, encoding="utf-8") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn last line from a crash, the operation was never acknowledged
+            for state in entry["clients"]:
+                idx = search_index(clients, "acc_number", state["acc_number"])
+                if idx != -1:
+                    clients[idx].balance = to_cents(state["balance"])
+                    clients[idx].debt = to_cents(state["debt"])
+            for row in entry["transactions"]:
+                transaction = transaction_from_row(row)
+                idx = search_index(transactions, "Transaction_id", transaction.Transaction_id)
+                if idx == -1:
+                    transactions.append(transaction)
+                else:
+                    for field_name in Transaction.__dataclass_fields__:
+                        setattr(transactions[idx], field_name, getattr(transaction, field_name))
+            replayed += 1
+    return replayed
+
+
+
+# ====== BINARY SNAPSHOT ======
+# A binary image of the whole in-memory bank, so a cold start maps one file
+# instead of parsing text and re-accruing every loan. Each column is stored
+# as a packed array (numbers, cents, day ordinals) or as NUL-separated text,
+# dictionary-encoded when few values repeat a lot; the per-account group
+# index and the month the debts were accrued for are stored too. Every
+# section carries a CRC32. The CSVs stay the interchange format and the
+# source of truth: a snapshot that does not match them is ignored.
+SNAPSHOT_FILE = "bank.snapshot"
+SNAPSHOT_MAGIC = b"BANKSNAP"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<8sII")  # magic, version, number of sections
+_SNAPSHOT_SECTION = struct.Struct("<48sQQI4x")  # name, offset, length, crc32
+_SNAPSHOT_TABLES = (("operators", Operator), ("clients", Client), ("transactions", Transaction))
+_SNAPSHOT_TYPECODES = {date: "i", float: "d", int: "q", Cents: "q"}
+
+class SnapshotError(ValueError):
+    """The snapshot is from another version, does not match the CSVs, or is corrupt."""
+
+
+def _encode_column(values: list, field_type) -> tuple[str, List[bytes]]:
+    """How a column is stored and its sections: an array typecode, "text" or "dict" (text + codes)."""
+    if field_type is date:
+        return "i", [array("i", [value.toordinal() for value in values]).tobytes()]
+    if field_type in _SNAPSHOT_TYPECODES:
+        typecode = _SNAPSHOT_TYPECODES[field_type]
+        return typecode, [array(typecode, values).tobytes()]
+    distinct = dict.fromkeys(values)
+    if len(distinct) * 4 <= len(values):
+        codes = {value: code for code, value in enumerate(distinct)}
+        return "dict", ["\x00".join(distinct).encode("utf-8"), array("I", [codes[value] for value in values]).tobytes()]
+    return "text", ["\x00".join(values).encode("utf-8")]
+
+def _decode_text(view: memoryview, count: int) -> List[str]:
+    values = str(view, "utf-8").split("\x00") if count else []
+    if len(values) != count:
+        raise SnapshotError("Text column does not match its row count")
+    return values
+
+def _decode_numbers(view: memoryview, typecode: str) -> list:
+    with view.cast(typecode) as typed:
+        return typed.tolist()
+
+@contextmanager
+def _gc_paused():
+    """Millions of new objects with no cycles among them only make the collector rescan; hold it off."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+@instrumented("write_snapshot")
+def write_snapshot(file_path: str, operators: List[Operator], clients: List[Client],
+                   transactions: List[Transaction], meta: dict) -> None:
+    """Write the bank to file_path atomically. meta is stored as is and handed back by read_snapshot."""
+    sections: list[tuple[str, bytes]] = []
+    tables = {}
+    for (table, cls), items in zip(_SNAPSHOT_TABLES, (operators, clients, transactions)):
+        columns = {}
+        for field_name, field in cls.__dataclass_fields__.items():
+            encoding, parts = _encode_column(list(map(attrgetter(field_name), items)), field.type)
+            columns[field_name] = encoding
+            sections.extend(zip((f"{table}.{field_name}", f"{table}.{field_name}.codes"), parts))
+        tables[table] = {"count": len(items), "columns": columns}
+    # per-account group index: row positions by account then date, and where each account starts
+    accounts = list(map(attrgetter("client_acc_number"), transactions))
+    days = list(map(attrgetter("transaction_date"), transactions))
+    order = sorted(range(len(transactions)), key=lambda i: (accounts[i], days[i]))
+    starts = [n for n, i in enumerate(order) if n == 0 or accounts[i] != accounts[order[n - 1]]]
+    sections.append(("transactions.by_account", array("I", order).tobytes()))
+    sections.append(("transactions.by_account.starts", array("I", starts).tobytes()))
+    sections.insert(0, ("meta", json.dumps({**meta, "tables": tables}).encode("utf-8")))
+
+    offset = _SNAPSHOT_HEADER.size + _SNAPSHOT_SECTION.size * len(sections)
+    offsets = []
+    for name, data in sections:
+        offset += -offset % 8  # keep every array 8-byte aligned in the mapping
+        offsets.append(offset)
+        offset += len(data)
+    temp_path = file_path + ".tmp"
+    with open(temp_path, mode="wb") as snapshot_file:
+        snapshot_file.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(sections)))
+        for (name, data), offset in zip(sections, offsets):
+            snapshot_file.write(_SNAPSHOT_SECTION.pack(name.encode("ascii"), offset, len(data), zlib.crc32(data)))
+        for (name, data), offset in zip(sections, offsets):
+            snapshot_file.write(b"\x00" * (offset - snapshot_file.tell()))
+            snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+        written = snapshot_file.tell()
+    os.replace(temp_path, file_path)
+    METRICS.count("rows_written", "write_snapshot", len(operators) + len(clients) + len(transactions))
+    METRICS.count("bytes_flushed", "write_snapshot", written)
+
+def _accrued_month(transactions: List[Transaction]) -> int | None:
+    """The month the loans' interest was accrued for, if a DebtEngine is keeping it current."""
+    for listener in getattr(transactions, "listeners", ()):
+        if isinstance(listener, DebtEngine):
+            return listener.month
+    return None
+
+def _snapshot_rows(loaded: tuple[Repository, dict]) -> int:
+    repository = loaded[0]
+    return len(repository.operators) + len(repository.clients) + len(repository.transactions)
+
+@instrumented("read_snapshot", rows_read=_snapshot_rows)
+def read_snapshot(file_path: str, expected: Callable[[dict], bool] | None = None) -> tuple[Repository, dict]:
+    """
+    Map a snapshot and rebuild the Repository from it. expected(meta) can
+    reject it before anything is decoded. Raises SnapshotError if it is unusable.
+    """
+    with open(file_path, mode="rb") as snapshot_file, \
+            mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+            memoryview(mapped) as whole:
+        try:
+            magic, version, count = _SNAPSHOT_HEADER.unpack_from(whole)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"Not a version {SNAPSHOT_VERSION} snapshot")
+            sections = {}
+            for i in range(count):
+                name, offset, length, checksum = _SNAPSHOT_SECTION.unpack_from(
+                    whole, _SNAPSHOT_HEADER.size + i * _SNAPSHOT_SECTION.size
                 )
+                sections[name.rstrip(b"\x00").decode("ascii")] = (offset, length, checksum)
+        except struct.error:
+            raise SnapshotError("Truncated snapshot header")
+
+        def section(name: str) -> memoryview:
+            if name not in sections:
+                raise SnapshotError(f"Snapshot has no {name} section")
+            offset, length, checksum = sections[name]
+            view = whole[offset:offset + length]
+            if len(view) != length or zlib.crc32(view) != checksum:
+                view.release()
+                raise SnapshotError(f"Checksum mismatch in {name}")
+            return view
+
+        with section("meta") as view:
+            meta = json.loads(str(view, "utf-8"))
+        if expected is not None and not expected(meta):
+            raise SnapshotError("Snapshot does not match the data files")
+        with _gc_paused():
+            return _decode_snapshot(section, meta)
+
+def _decode_snapshot(section: Callable[[str], memoryview], meta: dict) -> tuple[Repository, dict]:
+    items = {}
+    for table, cls in _SNAPSHOT_TABLES:
+        rows = meta["tables"][table]["count"]
+        columns = []
+        for field_name, encoding in meta["tables"][table]["columns"].items():
+            with section(f"{table}.{field_name}") as view:
+                if encoding == "text":
+                    column = _decode_text(view, rows)
+                elif encoding == "dict":
+                    distinct = str(view, "utf-8").split("\x00")
+                    with section(f"{table}.{field_name}.codes") as codes:
+                        column = list(map(distinct.__getitem__, _decode_numbers(codes, "I")))
+                else:
+                    column = _decode_numbers(view, encoding)
+            if cls.__dataclass_fields__[field_name].type is date:
+                days = {ordinal: date.fromordinal(ordinal) for ordinal in set(column)}
+                column = list(map(days.__getitem__, column))
+            if len(column) != rows:
+                raise SnapshotError(f"{table}.{field_name} does not match its row count")
+            columns.append(column)
+        items[table] = list(map(cls, *columns)) if rows else []
+
+    transactions = items["transactions"]
+    with section("transactions.by_account") as view:
+        ordered = list(map(transactions.__getitem__, _decode_numbers(view, "I")))
+    with section("transactions.by_account.starts") as view:
+        starts = _decode_numbers(view, "I") + [len(ordered)]
+    groups = {ordered[start].client_acc_number: ordered[start:end] for start, end in zip(starts, starts[1:])}
+    repository = Repository(items["operators"], items["clients"], transactions,
+                            transaction_groups={"client_acc_number": groups}, debt_month=meta.get("debt_month"))
+    return repository, meta
+
+
+# ====== STORAGE BACKENDS ======
+STORAGE_BACKEND = os.environ.get("BANK_STORAGE", "csv")  # "csv" or "sqlite"
+SQLITE_FILE = "bank.db"
+
+class CsvStorage:
+    """
+    The original layout: operators.csv, clients.csv and transactions.csv,
+    with session operations going to the journal between snapshots.
+    Every snapshot also writes bank.snapshot, which later starts load from
+    as long as the CSVs have not changed since. compact() moves settled
+    history on into the archive.
+    """
+    CSV_FILES = ("operators.csv", "clients.csv", "transactions.csv")
+
+    def __init__(self, program_path: str, working_set_days: int | None = WORKING_SET_DAYS):
+        self.program_path = program_path
+        self.working_set_days = working_set_days
+        self.journal = Journal(os.path.join(program_path, JOURNAL_FILE))
+        self.transaction_file = TransactionFile(self._path("transactions.csv"))
+        self.archive = TransactionArchive(self._path(ARCHIVE_DIR))
+
+    @property
+    def partial(self) -> bool:
+        """Whether some history is only on disk, so lookups that miss memory must ask storage."""
+        return self.working_set_days is not None or bool(self.archive.partitions)
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.program_path, file_name)
+
+    def load(self) -> Repository:
+        ensure_csv_exists(self._path("operators.csv"), list(Operator.__dataclass_fields__.keys()))
+        ensure_csv_exists(self._path("clients.csv"), list(Client.__dataclass_fields__.keys()))
+        ensure_csv_exists(self._path("transactions.csv"), list(Transaction.__dataclass_fields__.keys()))
+        repository = self._load_snapshot() or Repository(
+            load_operators(self._path("operators.csv")),
+            load_clients(self._path("clients.csv")),
+            load_transactions(self._path("transactions.csv"), working_set_filter(self.working_set_days))
+        )
+        # Apply operations logged since the last snapshot, then fold them back into the CSVs
+        if replay_journal(self.journal.file_path, repository.clients, repository.transactions):
+            repository.debt_month = None  # replayed rows may carry interest from another month
+            self.snapshot(repository.clients, repository.transactions)
+        return repository
+
+    def _sources(self) -> dict:
+        """Size and modification time of each CSV, to tell whether a snapshot still matches them."""
+        stats = {file_name: os.stat(self._path(file_name)) for file_name in self.CSV_FILES}
+        return {file_name: [stat.st_size, stat.st_mtime_ns] for file_name, stat in stats.items()}
+
+    def _load_snapshot(self) -> Repository | None:
+        file_path = self._path(SNAPSHOT_FILE)
+        if not os.path.exists(file_path):
+            return None
+        sources = self._sources()
+        try:
+            repository, _ = read_snapshot(file_path, lambda meta: (
+                meta.get("sources") == sources and meta.get("working_set_days") == self.working_set_days
+            ))
+        except (SnapshotError, OSError, KeyError):
+            return None  # stale or damaged: the CSVs are the source of truth
+        return repository
+
+    def save_snapshot(self, clients: List[Client], transactions: List[Transaction]) -> None:
+        """Write bank.snapshot for the CSVs as they are on disk now."""
+        write_snapshot(self._path(SNAPSHOT_FILE), load_operators(self._path("operators.csv")), clients, transactions, {
+            "sources": self._sources(),
+            "working_set_days": self.working_set_days,
+            "debt_month": _accrued_month(transactions),
+        })
+
+    def record(self, clients: List[Client], transactions: List[Transaction],
+               changed_clients: List[Client], changed_transactions: List[Transaction]) -> None:
+        self.journal.append(changed_clients, changed_transactions)
+        if self.journal.entries >= JOURNAL_SNAPSHOT_EVERY:
+            self.snapshot(clients, transactions)
+
+    def iter_history(self, acc_number: str) -> Iterator[Transaction]:
+        current = self.transaction_file.history(acc_number)
+        in_file = {transaction.Transaction_id for transaction in current}
+        yield from (t for t in self.archive.history(acc_number) if t.Transaction_id not in in_file)
+        yield from current
+
+    def find_transaction(self, transaction_id: str) -> Transaction | None:
+        """A transaction as last snapshotted to transactions.csv, or from the archive."""
+        return self.transaction_file.find(transaction_id) or self.archive.find(transaction_id)
+
+    def compact(self, clients: List[Client], transactions: List[Transaction], cutoff: date) -> int:
+        """
+        Snapshot, then move the settled transactions from before cutoff out of
+        transactions.csv into the archive; returns how many moved. The caller
+        drops them from memory and snapshots again.
+        """
+        self.snapshot(clients, transactions)
+        file_path = self._path("transactions.csv")
+        temp_path = file_path + ".tmp"
+        cutoff_text = cutoff.isoformat()
+        with open(file_path, newline='', encoding="utf-8") as source, \
+                open(temp_path, mode="w", newline='', encoding="utf-8") as csvfile:
+            reader = csv.DictReader(source)
+            writer = csv.DictWriter(csvfile, fieldnames=reader.fieldnames)
+            writer.writeheader()
+
+            def settled():  # archivable(), on the rows as written, so they are copied without parsing
+                for row in reader:
+                    if row["transaction_date"] < cutoff_text and row["transaction_type"].lower() != "loan":
+                        yield row
+                    else:
+                        writer.writerow(row)
+            moved = self.archive.add(settled())  # partitions and manifest are written first
+        self.transaction_file.close()
+        os.replace(temp_path, file_path)
+        return moved
+
+    def _merge_transactions(self, transactions: List[Transaction]) -> None:
+        """Rewrite transactions.csv from the working set without dropping the rows left on disk."""
+        file_path = self._path("transactions.csv")
+        temp_path = file_path + ".tmp"
+        fieldnames = list(Transaction.__dataclass_fields__.keys())
+        written = set()
+        with open(temp_path, mode="w", newline='', encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for transaction in iter_transactions(file_path):
+                index = search_index(transactions, "Transaction_id", transaction.Transaction_id)
+                if index != -1:
+                    transaction = transactions[index]
+                    written.add(transaction.Transaction_id)
+                writer.writerow(to_row(transaction))
+            for transaction in transactions:
+                if transaction.Transaction_id not in written:
+                    writer.writerow(to_row(transaction))
+        os.replace(temp_path, file_path)
+
+    def save_clients(self, clients: List[Client]) -> None:
+        save_to_csv(self._path("clients.csv"), clients)
+
+    def save_operators(self, operators: List[Operator]) -> None:
+        save_to_csv(self._path("operators.csv"), operators)
+
+    # one-row changes: a CSV file can only be rewritten whole
+    def add_clients(self, clients: List[Client], added: List[Client]) -> None:
+        self.save_clients(clients)
+
+    def remove_clients(self, clients: List[Client], acc_numbers: List[str]) -> None:
+        self.save_clients(clients)
+
+    def save_operator(self, operators: List[Operator], operator: Operator) -> None:
+        self.save_operators(operators)
+
+    def remove_operator(self, operators: List[Operator], operator_id: str) -> None:
+        self.save_operators(operators)
+
+    def snapshot(self, clients: List[Client], transactions: List[Transaction]) -> None:
+        """Fold everything into clients.csv/transactions.csv and start a fresh journal."""
+        save_to_csv(self._path("clients.csv"), clients)
+        self.transaction_file.close()  # let go of the mapping before the file is replaced
+        if self.working_set_days is None:
+            save_to_csv(self._path("transactions.csv"), transactions)
+        else:
+            self._merge_transactions(transactions)
+        self.journal.truncate()
+        self.save_snapshot(clients, transactions)
+
+    def close(self) -> None:
+        self.journal.close()
+        self.transaction_file.close()
+        self.archive.close()
+
+
+def _sql_type(field_type) -> str:
+    return {float: "REAL", int: "INTEGER", Cents: "INTEGER"}.get(field_type, "TEXT")
+
+def _sql_values(item) -> tuple:
+    return tuple(value.isoformat() if isinstance(value, date) else value for value in asdict(item).values())
+
+class SqliteStorage:
+    """
+    One SQLite database in WAL mode with a table per dataclass.
+
+    Every session operation is a single transaction of one-row UPDATEs and
+    INSERTs, so writes stay constant-cost and atomic however big the bank is.
+    Money columns hold INTEGER cents; databases from before that (REAL
+    dollars, user_version 0) are converted when opened, and columns added
+    to the dataclasses since (user_version 1: transactions.loan_id) are
+    added to the tables.
+    """
+    TABLES = (
+        ("operators", Operator, "operator_id"),
+        ("clients", Client, "acc_number"),
+        ("transactions", Transaction, "Transaction_id"),
+    )
+    SCHEMA_VERSION = 2
+
+    def __init__(self, program_path: str, working_set_days: int | None = WORKING_SET_DAYS):
+        self.program_path = program_path
+        self.working_set_days = working_set_days
+        self.file_path = os.path.join(program_path, SQLITE_FILE)
+        self.connection = sqlite3.connect(self.file_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=FULL")  # durable per commit, like the CSV journal
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        with self.connection:
+            if version < self.SCHEMA_VERSION:
+                self._add_missing_columns()
+            if version < 1 and self._table_exists("clients"):
+                self._convert_to_cents()
+            for table, cls, key in self.TABLES:
+                self._create_table(table, cls, key)
+            self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS clients_client_id ON clients (client_id)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS transactions_account "
+                "ON transactions (client_acc_number, transaction_date)"
             )
-    return transactions
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_type ON transactions (transaction_type)")
+
+    def _table_exists(self, table: str) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+
+    def _create_table(self, table: str, cls, key: str) -> None:
+        columns = ", ".join(
+            f"{name} {_sql_type(field.type)}" + (" PRIMARY KEY" if name == key else "")
+            for name, field in cls.__dataclass_fields__.items()
+        )
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+
+    def _add_missing_columns(self) -> None:
+        for table, cls, key in self.TABLES:
+            if not self._table_exists(table):
+                continue
+            present = {row["name"] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            for name, field in cls.__dataclass_fields__.items():
+                if name not in present:
+                    default = "''" if _sql_type(field.type) == "TEXT" else "0"
+                    self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {name} {_sql_type(field.type)} "
+                                            f"DEFAULT {default}")
+
+    def _convert_to_cents(self) -> None:
+        """Rebuild the tables with REAL dollar columns as INTEGER cents."""
+        for table, cls, key in self.TABLES:
+            fields = cls.__dataclass_fields__
+            if not any(field.type is Cents for field in fields.values()) or not self._table_exists(table):
+                continue
+            self.connection.execute(f"ALTER TABLE {table} RENAME TO {table}_dollars")
+            self._create_table(table, cls, key)
+            columns = ", ".join(
+                f"CAST(round({name} * 100) AS INTEGER)" if field.type is Cents else name
+                for name, field in fields.items()
+            )
+            self.connection.execute(f"INSERT INTO {table} SELECT {columns} FROM {table}_dollars")
+            self.connection.execute(f"DROP TABLE {table}_dollars")
+
+    def _replace_rows(self, table: str, items: list) -> None:
+        if items:
+            placeholders = ", ".join("?" * len(items[0].__dataclass_fields__))
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})",
+                [_sql_values(item) for item in items]
+            )
+
+    def load(self) -> Repository:
+        if self.working_set_days is None:
+            rows = self.connection.execute("SELECT * FROM transactions")
+        else:
+            cutoff = date.today() - timedelta(days=self.working_set_days)
+            rows = self.connection.execute(
+                "SELECT * FROM transactions WHERE lower(transaction_type) = 'loan' OR transaction_date >= ?",
+                (cutoff.isoformat(),)
+            )
+        return Repository(
+            [operator_from_row(row) for row in self.connection.execute("SELECT * FROM operators")],
+            [client_from_row(row, int) for row in self.connection.execute("SELECT * FROM clients")],
+            [transaction_from_row(row, int) for row in rows]
+        )
+
+    @property
+    def partial(self) -> bool:
+        return self.working_set_days is not None
+
+    def iter_history(self, acc_number: str) -> Iterator[Transaction]:
+        rows = self.connection.execute(
+            "SELECT * FROM transactions WHERE client_acc_number = ? ORDER BY transaction_date", (acc_number,)
+        )
+        for row in rows:
+            yield transaction_from_row(row, int)
+
+    def find_transaction(self, transaction_id: str) -> Transaction | None:
+        row = self.connection.execute(
+            "SELECT * FROM transactions WHERE Transaction_id = ?", (transaction_id,)
+        ).fetchone()
+        return transaction_from_row(row, int) if row else None
+
+    def record(self, clients: List[Client], transactions: List[Transaction],
+               changed_clients: List[Client], changed_transactions: List[Transaction]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE clients SET balance = ?, debt = ? WHERE acc_number = ?",
+                [(c.balance, c.debt, c.acc_number) for c in changed_clients]
+            )
+            self._replace_rows("transactions", changed_transactions)
+
+    def _save_table(self, table: str, items: list) -> None:
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {table}")
+            self._replace_rows(table, items)
+
+    def save_clients(self, clients: List[Client]) -> None:
+        self._save_table("clients", clients)
+
+    def save_operators(self, operators: List[Operator]) -> None:
+        self._save_table("operators", operators)
+
+    def add_clients(self, clients: List[Client], added: List[Client]) -> None:
+        with self.connection:
+            self._replace_rows("clients", added)
+
+    def remove_clients(self, clients: List[Client], acc_numbers: List[str]) -> None:
+        with self.connection:
+            self.connection.executemany("DELETE FROM clients WHERE acc_number = ?",
+                                        [(acc_number,) for acc_number in acc_numbers])
+
+    def save_operator(self, operators: List[Operator], operator: Operator) -> None:
+        with self.connection:
+            self._replace_rows("operators", [operator])
+
+    def remove_operator(self, operators: List[Operator], operator_id: str) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM operators WHERE operator_id = ?", (operator_id,))
+
+    def compact(self, clients: List[Client], transactions: List[Transaction], cutoff: date) -> int:
+        """Nothing to move: old rows are read through the table's indexes (see BANK_WORKING_SET_DAYS)."""
+        return 0
+
+    def snapshot(self, clients: List[Client], transactions: List[Transaction]) -> None:
+        """Every operation is already in the database; just fold the WAL into it."""
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def migrate_csv_to_sqlite(program_path: str) -> SqliteStorage:
+    """One-shot copy of the CSV files (journal and archive included) into a new database."""
+    csv_storage = CsvStorage(program_path, working_set_days=None)
+    repository = csv_storage.load()
+    csv_storage.close()
+    storage = SqliteStorage(program_path)
+    with storage.connection:
+        storage._replace_rows("operators", repository.operators)
+        storage._replace_rows("clients", repository.clients)
+        storage._replace_rows("transactions", list(csv_storage.archive))
+        storage._replace_rows("transactions", repository.transactions)
+    return storage
+
+
+def get_storage(program_path: str):
+    """A new storage backend for program_path, chosen by STORAGE_BACKEND."""
+    if STORAGE_BACKEND != "sqlite":
+        return CsvStorage(program_path)
+    if os.path.exists(os.path.join(program_path, SQLITE_FILE)):
+        return SqliteStorage(program_path)
+    return migrate_csv_to_sqlite(program_path)
+
+def account_history(storage, transactions: List[Transaction], acc_number: str) -> List[Transaction]:
+    """
+    One account's full history, oldest first. In working-set mode, or once
+    history was archived, the rows that are not in memory are paged in from
+    storage for this account only.
+    """
+    in_memory = client_transactions(transactions, acc_number)
+    if not storage.partial:
+        return in_memory
+    loaded = {transaction.Transaction_id for transaction in in_memory}
+    older = [t for t in storage.iter_history(acc_number) if t.Transaction_id not in loaded]
+    return sorted(older + in_memory, key=lambda t: t.transaction_date)
+
+# ====== ID ALLOCATION ======
+ID_SEQUENCES_FILE = "id_sequences.json"
+ID_BLOCK_SIZE = 100  # ids handed out per write of the sequences file
+ID_DIGITS = {"operator": 5, "account": 8, "transaction": 12}
+
+def luhn_digit(payload: str) -> str:
+    """Luhn check digit for a string of digits."""
+    total = 0
+    for position, digit in enumerate(reversed(payload)):
+        value = int(digit)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+def is_valid_id(value: str) -> bool:
+    return len(value) > 1 and value.isdigit() and luhn_digit(value[:-1]) == value[-1]
+
+class IdAllocator:
+    """
+    Issues operator, account and transaction ids as a sequence number plus a
+    Luhn check digit, so a new id never needs a collision scan or a retry.
+
+    Only the high-water mark of each sequence is persisted, once per block of
+    ID_BLOCK_SIZE ids; after a restart the unused rest of a block is skipped.
+    taken() guards against the random ids issued before the allocator
+    existed, on a best-effort basis: callers only check what is in memory, so
+    an old random id that lives only on disk (outside the working set, or in
+    the archive) is not seen.
+    """
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.reserved: dict[str, int] = {kind: 1 for kind in ID_DIGITS}
+        if os.path.exists(file_path):
+            with open(file_path, encoding="utf-8") as sequences_file:
+                self.reserved.update(json.load(sequences_file))
+        self.next_number = dict(self.reserved)
+        self.lock = threading.RLock()
+
+    def _reserve(self, kind: str, count: int) -> None:
+        if self.reserved[kind] + count > 10 ** (ID_DIGITS[kind] - 1):
+            raise RuntimeError(f"No {kind} ids left")
+        self.reserved[kind] += count
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, mode="w", encoding="utf-8") as sequences_file:
+            json.dump(self.reserved, sequences_file)
+            sequences_file.flush()
+            os.fsync(sequences_file.fileno())
+        os.replace(temp_path, self.file_path)
+
+    @_locked
+    def allocate(self, kind: str, taken: Callable[[str], bool] | None = None) -> str:
+        while True:
+            if self.next_number[kind] >= self.reserved[kind]:
+                self._reserve(kind, ID_BLOCK_SIZE)
+            payload = str(self.next_number[kind]).zfill(ID_DIGITS[kind] - 1)
+            self.next_number[kind] += 1
+            new_id = payload + luhn_digit(payload)
+            if taken is None or not taken(new_id):
+                return new_id
+
+    @_locked
+    def reserve_batch(self, kind: str, count: int, taken: Callable[[str], bool] | None = None) -> List[str]:
+        """Allocate count ids at once for bulk imports, with a single write to disk."""
+        missing = count - (self.reserved[kind] - self.next_number[kind])
+        if missing > 0:
+            self._reserve(kind, missing)
+        return [self.allocate(kind, taken) for _ in range(count)]
+
+
+_id_allocators: dict[str, IdAllocator] = {}
+_id_allocators_lock = threading.Lock()
+
+def get_id_allocator(program_path: str) -> IdAllocator:
+    with _id_allocators_lock:  # two allocators on one file would hand out the same ids
+        if program_path not in _id_allocators:
+            _id_allocators[program_path] = IdAllocator(os.path.join(program_path, ID_SEQUENCES_FILE))
+        return _id_allocators[program_path]
 
 
 # ====== OPERATORS ======
 def check_operator_login(operator_check: Operator, operator_database: List[Operator]) -> bool:
-    for operator in operator_database:
-        if operator.operator_id == operator_check.operator_id and operator.operator_password == operator_check.operator_password:
-            return True
-    return False
+    index = search_index(operator_database, "operator_id", operator_check.operator_id)
+    return index != -1 and operator_database[index].operator_password == operator_check.operator_password
 
-def operator_login(operators: list[Operator]) -> Operator:
+def operator_login(service: "BankService") -> Operator:
     while True:
         temp_operator_id=input("Enter operator ID: ").strip()
         clear_terminal()
         password=getpass.getpass("Enter operator password: ")
         clear_terminal()
-        active_operator = Operator(
-            operator_id=temp_operator_id,
-            operator_password=password,
-            operator_name="",
-            access_level=0
-        )
-
-        if check_operator_login(active_operator, operators):
+        result = service.operator_login(temp_operator_id, password)
+        if result.ok:
             print("Login successful!")
-            break
-        else:
-            print("Invalid login, please try again.")
+            return result.operator
+        print(result.message)
 
-    for operator in operators:
-        if active_operator.operator_id == operator.operator_id:
-            active_operator = operator
-            break
-
-    return active_operator
-
-def change_operator_level(operators:List[Operator]): 
+def change_operator_level(service: "BankService", active_operator: Operator):
     clear_terminal()
     operator_id=input("insert operator ID:").strip()
-    index=search_index(operators,"operator_id",operator_id)
-    if index== -1:
+    if search_index(service.operators, "operator_id", operator_id) == -1:
         print(f"operator not found")
         return
     desired_level=0
@@ -233,9 +1982,11 @@ def change_operator_level(operators:List[Operator]):
         desired_level=get_int("insert the disered access level:(1 to 5)")
         if desired_level not in (1, 2, 3, 4, 5):
             print(f"Invalid option try again:(1 to 5)")
-        else:
-            operators[index].access_level=desired_level
-    print(f"New operator access level:{operators[index].access_level}")
+    result = service.change_operator_level(operator_id, desired_level, active_operator)
+    if result.ok:
+        print(f"New operator access level:{result.operator.access_level}")
+    else:
+        print(result.message)
     
 
 def print_operator_data(operator:Operator):
@@ -245,33 +1996,258 @@ def print_operator_data(operator:Operator):
     print(f"Operator access level:  {operator.access_level}")
     print("=" * 40)
 
-def register_new_operator(operators:List[Operator]):
-    control=0
-    while(control!=-1):
-        new_id=generate_random_number(5)
-        control=search_index(operators,"operator_id",new_id)
-    new_operator=Operator( 
-        operator_id=new_id,
-        operator_password=getpass.getpass("enter new operator password:").strip(),
-        operator_name=input("enter new operator Name:").strip().title(),
-        access_level=get_int("enter new operator access level:")
+def register_new_operator(service: "BankService", active_operator: Operator | None = None):
+    result = service.register_operator(
+        password=getpass.getpass("enter new operator password:").strip(),
+        name=input("enter new operator Name:").strip().title(),
+        access_level=get_int("enter new operator access level:"),
+        operator=active_operator
     )
-    operators.append(new_operator)
     clear_terminal()
-    print(f"New operator registerd")
-    print_operator_data(operators[-1])
+    if result.ok:
+        print(f"New operator registerd")
+        print_operator_data(result.operator)
+    else:
+        print(result.message)
+
+
+# ====== CLIENT NAME SEARCH ======
+# Names are split into words, casefolded and stripped of accents. The distinct
+# words are kept sorted, so a prefix is a bisection, and filed under each of
+# their one-letter deletions: a word one typo from the query shares a deletion
+# with it, so typos are dictionary lookups rather than comparisons against
+# every word. Both hold distinct words rather than clients, so they stay small
+# however many clients share a name.
+SEARCH_PAGE_SIZE = 10
+_WORD = re.compile(r"[^\W_]+")
+
+def name_words(name: str) -> list[str]:
+    if name.isascii():
+        return _WORD.findall(name.lower())
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return _WORD.findall("".join(c for c in decomposed if not unicodedata.combining(c)))
+
+def deletions(word: str) -> set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def typo_limit(word: str) -> int:
+    """How many typos a query word may hold: none below 3 letters, 2 from 6 letters on."""
+    return 0 if len(word) < 3 else 1 if len(word) < 6 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edits from a to b, a swap of two neighbours counting as one; limit + 1 once it gets past limit."""
+    before: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+def _discard(members_of: dict, key, client: Client) -> bool:
+    """Drop client (this very object) from members_of[key]; True when that left key without members."""
+    members = members_of.get(key, [])
+    for i, member in enumerate(members):
+        if member is client:
+            del members[i]
+            break
+    if members:
+        return False
+    members_of.pop(key, None)
+    return True
+
+class NameIndex:
+    """
+    Client search by name, kept up to date as a listener on the clients list
+    (name_index() attaches it). search() returns a page of matches, best
+    first: the exact name, then names holding every query word, then names
+    with words starting with them, then names a typo or two away. Within a
+    tier, matches come by matched word and then in order of registration.
+    """
+    def __init__(self, clients: List[Client]):
+        self.holders: dict[str, list[Client]] = {}  # word -> clients with it in their name
+        self.names: dict[str, list[Client]] = {}  # words joined by spaces -> clients with that name
+        for client in clients:
+            self._add(client, client.client_name)
+        self.words = sorted(self.holders)
+        self.deletions: dict[str, list[str]] = {}  # word with a letter deleted -> words
+        for word in self.words:
+            self._index_deletions(word)
+
+    def _add(self, client: Client, name: str) -> list[str]:
+        """Index client under name; returns the words nobody held before."""
+        words = name_words(name)
+        self.names.setdefault(" ".join(words), []).append(client)
+        new_words = []
+        for word in dict.fromkeys(words):
+            members = self.holders.get(word)
+            if members is None:
+                members = self.holders[word] = []
+                new_words.append(word)
+            members.append(client)
+        return new_words
+
+    def _remove(self, client: Client, name: str) -> None:
+        words = name_words(name)
+        _discard(self.names, " ".join(words), client)
+        for word in dict.fromkeys(words):
+            if _discard(self.holders, word, client):
+                del self.words[bisect.bisect_left(self.words, word)]
+                for deletion in deletions(word):
+                    words = self.deletions[deletion]
+                    words.remove(word)
+                    if not words:
+                        del self.deletions[deletion]
+
+    def _index_deletions(self, word: str) -> None:
+        for deletion in deletions(word):
+            self.deletions.setdefault(deletion, []).append(word)
+
+    def on_append(self, client: Client) -> None:
+        for word in self._add(client, client.client_name):
+            bisect.insort(self.words, word)
+            self._index_deletions(word)
+
+    def on_change(self, client: Client, field_name: str, old_value) -> None:
+        if field_name == "client_name":
+            self._remove(client, old_value)
+            self.on_append(client)
+
+    def on_remove(self, client: Client) -> None:
+        self._remove(client, client.client_name)
+
+    def exact(self, name: str) -> List[Client]:
+        """Clients whose name is name, ignoring case, accents and punctuation."""
+        return list(self.names.get(" ".join(name_words(name)), ()))
+
+    def prefixed(self, prefix: str) -> Iterator[str]:
+        """The indexed words starting with prefix, in order."""
+        words = self.words
+        i = bisect.bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            yield words[i]
+            i += 1
+
+    def near(self, word: str) -> List[str]:
+        """
+        Indexed words within typo_limit(word) edits of word, closest first,
+        leaving out its extensions. Every word one edit away is found; of those
+        two edits away, the ones sharing a deletion with a deletion of word.
+        """
+        limit = typo_limit(word)
+        if not limit:
+            return []
+        variants = {word}
+        for _ in range(limit):
+            variants |= {deletion for variant in variants for deletion in deletions(variant)}
+        candidates = set()
+        for variant in variants:
+            if variant in self.holders:
+                candidates.add(variant)
+            candidates.update(self.deletions.get(variant, ()))
+        found = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) <= limit and not candidate.startswith(word):
+                distance = edit_distance(word, candidate, limit)
+                if distance <= limit:
+                    found.append((distance, candidate))
+        return [candidate for _, candidate in sorted(found)]
+
+    def search(self, query: str, offset: int = 0, limit: int = SEARCH_PAGE_SIZE) -> List[Client]:
+        """Up to limit matches for query, skipping the first offset of the ranking."""
+        return list(islice(self._ranked(name_words(query)), offset, offset + limit))
+
+    def _holding_prefix(self, prefix: str, enough: int) -> int:
+        """How many clients hold a word starting with prefix, counting no further than enough."""
+        count = 0
+        for word in self.prefixed(prefix):
+            count += len(self.holders[word])
+            if count >= enough:
+                break
+        return count
+
+    def _ranked(self, words: list[str]) -> Iterator[Client]:
+        if not words:
+            return
+        lead, fewest = words[0], math.inf  # candidates come from the rarest word and are checked against the rest
+        for word in dict.fromkeys(words) if len(words) > 1 else ():
+            count = self._holding_prefix(word, fewest)
+            if count < fewest:
+                lead, fewest = word, count
+        others = [word for word in dict.fromkeys(words) if word != lead]
+        seen: set[int] = set()
+
+        def every(matches: Iterable[str], accepted: list[set[str]]) -> Iterator[Client]:
+            """
+            Clients not yet yielded holding one of matches and, for each other
+            query word, one of the words it accepts. Each acceptance is checked
+            by gathering the ids of its holders or by reading the candidate's
+            name, whichever touches fewer clients.
+            """
+            by_id: list[set[int]] = []
+            by_name: list[set[str]] = []
+            if accepted:
+                matches = list(matches)
+                candidates = sum(len(self.holders.get(match, ())) for match in matches)
+                for accepted_words in accepted:
+                    if sum(len(self.holders.get(word, ())) for word in accepted_words) <= 5 * candidates:
+                        by_id.append({id(client) for word in accepted_words for client in self.holders.get(word, ())})
+                    else:
+                        by_name.append(accepted_words)
+            for match in matches:
+                for client in self.holders.get(match, ()):
+                    key = id(client)
+                    if key in seen or not all(key in holders for holders in by_id):
+                        continue
+                    if by_name:
+                        held = name_words(client.client_name)
+                        if any(accepted_words.isdisjoint(held) for accepted_words in by_name):
+                            continue
+                    seen.add(key)
+                    yield client
+
+        for client in self.names.get(" ".join(words), ()):
+            seen.add(id(client))
+            yield client
+        yield from every([lead], [{word} for word in others])
+        extended = [set(self.prefixed(word)) for word in others]
+        yield from every(self.prefixed(lead), extended)
+        misspelt = [accepted_words.union(self.near(word)) for word, accepted_words in zip(others, extended)]
+        yield from every(self.prefixed(lead), misspelt)
+        yield from every(self.near(lead), misspelt)
+
+def name_index(clients: List[Client]) -> NameIndex:
+    """The NameIndex following clients, built and attached on first use."""
+    with getattr(clients, "lock", threading.RLock()):
+        for listener in getattr(clients, "listeners", ()):
+            if isinstance(listener, NameIndex):
+                return listener
+        index = NameIndex(clients)
+        if isinstance(clients, IndexedList):
+            clients.listeners.append(index)
+        return index
 
 
 # ====== CLIENTS ======
 def check_acc_number_availability(client_database: List[Client], acc_number: str) -> bool:
-    for client in client_database:
-        if acc_number == client.acc_number:
-            return False
-    return True
+    return search_index(client_database, "acc_number", acc_number) == -1
 
+@instrumented("search_client")
 def search_client(client_search: str, clients: List[Client]) -> Client | None:
+    for field_name in ("acc_number", "client_id"):
+        index = search_index(clients, field_name, client_search)
+        if index != -1:
+            return clients[index]
+    if isinstance(clients, IndexedList):
+        matches = name_index(clients).exact(client_search)
+        return matches[0] if matches else None
     for client in clients:
-        if client.acc_number == client_search or client.client_id == client_search or client_search.title() == client.client_name:
+        if client_search.title() == client.client_name:
             return client
     return None
 
@@ -282,91 +2258,80 @@ def print_client_data(client: Client) -> None:
     print(f"Account Number: {client.acc_number}")
     print(f"Agency Number : {client.agency_number}")
     print(f"Created On    : {client.creation_date}")
-    print(f"Balance       : ${client.balance:,.2f}")
-    print(f"Debt          : ${client.debt:,.2f}")
+    print(f"Balance       : {format_money(client.balance)}")
+    print(f"Debt          : {format_money(client.debt)}")
     print("=" * 40)
 
-def create_new_client(clients: List[Client]):
-    new_client = Client(
+def create_new_client(service: "BankService", active_operator: Operator):
+    result = service.create_client(
         client_id=input("Insert client ID: ").strip(),
-        client_name=input("Insert client's name: ").title().strip(),
-        acc_number="",
+        name=input("Insert client's name: ").title().strip(),
         agency_number=str(get_int("Insert agency number: ")).strip(),
-        creation_date=date.today(),
-        client_password=input("Insert client password: ").strip(),
-        balance=0.0,
-        debt=0.0
+        password=input("Insert client password: ").strip(),
+        operator=active_operator
     )
+    if result.ok:
+        print("New client registered:\n")
+        print_client_data(result.client)
+    else:
+        print(result.message)
+    input("Press Enter to continue...")
+
+def search_clients(service: "BankService"):
+    query = input("Insert the client's name, or part of it: ").strip()
+    page = 0
     while True:
-        temp_number = generate_random_number(8)
-        if check_acc_number_availability(clients, temp_number):
-            new_client.acc_number = temp_number
+        clear_terminal()
+        matches = service.search_clients(query, page)
+        if not matches:
+            print("No more matches." if page else "No client matches that name.")
+        for client in matches:
+            print(f"{client.acc_number}  {client.client_name}  (agency {client.agency_number})")
+        if len(matches) < SEARCH_PAGE_SIZE or input("Enter for more, q to stop: ").strip().lower() == "q":
             break
-    clients.append(new_client)
-    print("New client registered:\n")
-    print_client_data(new_client)
+        page += 1
     input("Press Enter to continue...")
 
-def remove_client(clients: List[Client], acc_number: str):
-    index = search_index(clients, "acc_number", acc_number)
-    if index != -1:
-        if(clients[index].debt==0):
-            clients.pop(index)
-            print(f"Client with account {acc_number} removed.")
-
-        else:
-            print(f"Client in debt, pay the debt before removing this account")
-    else:
-        print(f"No client found with account number {acc_number}.")
+def remove_client(service: "BankService", acc_number: str, active_operator: Operator):
+    print(service.remove_client(acc_number, active_operator).message)
     input("press Enter to continue...")
 
 def check_client_login(client_check: Client, client_database: List[Client]) -> bool:
-    for client in client_database:
-        if client.acc_number == client_check.acc_number and client.client_password == client_check.client_password:
-            return True
-    return False
+    index = search_index(client_database, "acc_number", client_check.acc_number)
+    return index != -1 and client_database[index].client_password == client_check.client_password
 
-def client_login(clients: List[Client]) -> Client:
+def client_login(service: "BankService") -> Client:
     while True:
         acc_number=input("Insert client's account number: ").strip()
         clear_terminal()
         password=getpass.getpass("Enter client password: ")
-        active_client = Client(
-            client_id="",
-            client_name="",
-            acc_number=acc_number,
-            agency_number="",
-            creation_date=date.today(),
-            client_password=password,
-            balance=0,
-            debt=0,
-        )
-        if check_client_login(active_client, clients):
+        result = service.client_login(acc_number, password)
+        if result.ok:
             print("Login successful!")
-            break
-        else:
-            print("Invalid login, please try again.")
-
-    for client in clients:
-        if active_client.acc_number == client.acc_number:
-            active_client = client
-            break
-    return active_client
+            return result.client
+        print(result.message)
 
 
 # ====== TRANSACTIONS ======
-def generate_unique_transaction_id(transactions: List[Transaction]) -> str:
-    while True:
-        temp_id = generate_random_number(12)
-        if all(temp_id != t.Transaction_id for t in transactions):
-            return temp_id
+def generate_unique_transaction_id(transactions: List[Transaction], program_path: str) -> str:
+    """The next transaction id; only transactions in memory are checked for collisions (see IdAllocator)."""
+    return get_id_allocator(program_path).allocate(
+        "transaction", lambda candidate: search_index(transactions, "Transaction_id", candidate) != -1
+    )
 
+@instrumented("search_transaction")
 def search_transaction(transactions: List[Transaction], transaction_id: str) -> Transaction | None:
     """Search for a transaction by its ID."""
-    for transaction in transactions:
-        if transaction.Transaction_id == transaction_id:
-            return transaction
-    return None
+    index = search_index(transactions, "Transaction_id", transaction_id)
+    return transactions[index] if index != -1 else None
+
+@instrumented("client_transactions")
+def client_transactions(transactions: List[Transaction], acc_number: str) -> List[Transaction]:
+    """All transactions of one account, oldest first."""
+    if isinstance(transactions, IndexedList) and "client_acc_number" in transactions.groups:
+        return transactions.group("client_acc_number", acc_number)
+    return sorted((t for t in transactions if t.client_acc_number == acc_number),
+                  key=lambda t: t.transaction_date)
 
 def print_transaction_data(transaction: Transaction) -> None:
     amount=transaction.amount+transaction.interest
@@ -376,211 +2341,1219 @@ def print_transaction_data(transaction: Transaction) -> None:
     if transaction.transaction_name:
         print(f"Name             : {transaction.transaction_name}")
     print(f"Date             : {transaction.transaction_date}")
-    print(f"Total amount     : ${amount:,.2f}")
+    print(f"Total amount     : {format_money(amount)}")
 
     # Only show interest info if it's a Loan
     if transaction.transaction_type.lower() == "loan":
-        print(f"Interest         : ${transaction.interest:,.2f}")
+        print(f"Interest         : {format_money(transaction.interest)}")
         print(f"Interest Rate    : {transaction.interest_rate:.2f}%")
-        print(f"Original Amount  : ${transaction.original_amount:,.2f}")
+        print(f"Original Amount  : {format_money(transaction.original_amount)}")
+    if transaction.loan_id:
+        print(f"Loan ID          : {transaction.loan_id}")
 
     print(f"Operator ID      : {transaction.operator_id}")
     print(f"Client Account   : {transaction.client_acc_number}")
     print("=" * 40)
 
+def month_key(day: date) -> int:
+    return day.year * 12 + day.month
+
+def month_start(key: int) -> date:
+    """The first day of the month month_key() gave key for."""
+    return date((key - 1) // 12, (key - 1) % 12 + 1, 1)
+
+def is_open_loan(transaction: Transaction) -> bool:
+    return transaction.transaction_type.lower() == "loan"
+
+class DebtEngine:
+    """
+    Keeps every client's debt as a running total over their open loans.
+
+    Each loan's accrued value is cached under (loan id, month) and only
+    recomputed when the month rolls over or a payment changes its amount;
+    the client's total is adjusted by the difference instead of being summed
+    again. Attach it to the repository's transactions as a listener.
+
+    Whole-book passes (startup, recalculate(), a new month) go through
+    accrue_loans_parallel, so with workers > 1 big books use every core.
+    When accrued_month is the current month the interest already on the
+    loans is trusted (it was accrued then, e.g. before a snapshot) and the
+    startup pass is skipped.
+    """
+    def __init__(self, clients: List[Client], transactions: List[Transaction], today: date | None = None,
+                 workers: int | None = None, accrued_month: int | None = None):
+        self.clients = clients
+        self.workers = DEBT_WORKERS if workers is None else workers
+        self.open_loans: dict[str, Transaction] = {
+            transaction.Transaction_id: transaction for transaction in transactions if is_open_loan(transaction)
+        }
+        self.accrued: dict[tuple[str, int], Cents] = {}
+        self.totals: dict[str, Cents] = {}
+        if accrued_month is not None and accrued_month == month_key(today or date.today()):
+            self._reuse_accrued(today)
+        else:
+            self.recalculate(today)
+
+    def _reuse_accrued(self, today: date | None = None) -> None:
+        self.today = today or date.today()
+        self.month = month_key(self.today)
+        for loan in self.open_loans.values():
+            debt = loan.amount + loan.interest
+            self.accrued[(loan.Transaction_id, self.month)] = debt
+            self.totals[loan.client_acc_number] = self.totals.get(loan.client_acc_number, 0) + debt
+        for client in self.clients:
+            client.debt = self.totals.get(client.acc_number, 0)
+
+    def recalculate(self, today: date | None = None) -> None:
+        """Accrue every open loan from scratch and reset all client debts (startup, end of day)."""
+        self.today = today or date.today()
+        self.month = month_key(self.today)
+        self.accrued.clear()
+        self.totals.clear()
+        loans = list(self.open_loans.values())
+        for loan, debt in zip(loans, accrue_loans_parallel(loans, self.clients, self.workers, self.today)):
+            self.accrued[(loan.Transaction_id, self.month)] = debt
+            loan.interest = debt - loan.amount
+            self.totals[loan.client_acc_number] = self.totals.get(loan.client_acc_number, 0) + debt
+        for client in self.clients:
+            client.debt = self.totals.get(client.acc_number, 0)
+
+    def _accrue(self, loan: Transaction) -> Cents:
+        key = (loan.Transaction_id, self.month)
+        if key not in self.accrued:
+            self.accrued[key] = calculate_loan_debt(loan, self.today)
+            loan.interest = self.accrued[key] - loan.amount
+        return self.accrued[key]
+
+    def _adjust(self, acc_number: str, difference: Cents) -> None:
+        total = self.totals.get(acc_number, 0) + difference
+        self.totals[acc_number] = total
+        index = search_index(self.clients, "acc_number", acc_number)
+        if index != -1:
+            self.clients[index].debt = total
+
+    def _open(self, loan: Transaction) -> None:
+        self.open_loans[loan.Transaction_id] = loan
+        self._adjust(loan.client_acc_number, self._accrue(loan))
+
+    def _close(self, loan: Transaction) -> None:
+        if self.open_loans.pop(loan.Transaction_id, None) is not None:
+            self._adjust(loan.client_acc_number, -self.accrued.pop((loan.Transaction_id, self.month)))
+
+    def refresh(self, today: date | None = None) -> None:
+        """Re-accrue the open loans if the month changed since the last refresh."""
+        today = today or date.today()
+        if month_key(today) == self.month:
+            return
+        previous = {loan_id: self.accrued[(loan_id, self.month)] for loan_id in self.open_loans}
+        self.today, self.month = today, month_key(today)
+        self.accrued.clear()
+        loans = list(self.open_loans.values())
+        for loan, debt in zip(loans, accrue_loans_parallel(loans, self.clients, self.workers, today)):
+            self.accrued[(loan.Transaction_id, self.month)] = debt
+            loan.interest = debt - loan.amount  # payments are checked against amount + interest
+            self._adjust(loan.client_acc_number, debt - previous[loan.Transaction_id])
+
+    def debt_of(self, acc_number: str) -> Cents:
+        return self.totals.get(acc_number, 0)
+
+    def on_append(self, transaction: Transaction) -> None:
+        self.refresh()
+        if is_open_loan(transaction):
+            self._open(transaction)
+
+    def on_change(self, transaction: Transaction, field_name: str, old_value) -> None:
+        if transaction.Transaction_id in self.open_loans:
+            self._close(transaction)
+        if is_open_loan(transaction):
+            self._open(transaction)
+
+    def on_remove(self, transaction: Transaction) -> None:
+        self._close(transaction)
+
+def debt_engine(clients: List[Client], transactions: List[Transaction]) -> DebtEngine:
+    """The DebtEngine following transactions, created and attached on first use."""
+    for listener in getattr(transactions, "listeners", ()):
+        if isinstance(listener, DebtEngine):
+            return listener
+    engine = DebtEngine(clients, transactions)
+    if isinstance(transactions, IndexedList):
+        transactions.listeners.append(engine)
+    return engine
+
+@instrumented("update_debt")
 def update_debt(clients: List[Client], transactions: List[Transaction], control: int):
-    for client in clients:
-        total_debt = 0.0  # reset for each client
-        for transaction in transactions:
-            if (client.acc_number == transaction.client_acc_number and transaction.transaction_type == "Loan"):
-                total_debt += calculate_loan_debt(transaction)
-            if(transaction.transaction_type == "Loan" or transaction.transaction_type=="loan"):
-                transaction.interest=calculate_loan_debt(transaction)-transaction.amount
-        client.debt = round(total_debt, 2)  # update client's debt
-        
+    debt_engine(clients, transactions).refresh()
+
     if control == 0:
         return clients
     elif control == 1:
         return transactions
 
 
-# ─────────────────────────────
-# Client session actions
-# ─────────────────────────────
-def do_deposit(clients, transactions, active_client, active_operator, program_path):
-    clear_terminal()
-    deposit = get_float("What amount to deposit? ")
-    idx = search_index(clients, "acc_number", active_client.acc_number)
+# ====== PARALLEL DEBT RECALCULATION ======
+DEBT_WORKERS = int(os.environ.get("BANK_DEBT_WORKERS", "1"))  # processes for whole-book debt passes
+DEBT_SHARD_BY = os.environ.get("BANK_DEBT_SHARD_BY", "agency")  # "agency" or "hash"
+PARALLEL_MIN_LOANS = 50_000  # below this, starting the processes costs more than it saves
 
-    clients[idx].balance += deposit
-    transaction_id = generate_unique_transaction_id(transactions)
+def shard_loans(loans: List[Transaction], clients: List[Client], by: str = DEBT_SHARD_BY,
+                hash_shards: int = 256) -> dict[Any, List[int]]:
+    """Positions of the loans grouped by their client's agency_number, or by a stable hash of the account."""
+    if by == "agency":
+        agency_of = {client.acc_number: client.agency_number for client in clients}
+        keys = [agency_of.get(loan.client_acc_number, "") for loan in loans]
+    else:
+        keys = [zlib.crc32(loan.client_acc_number.encode()) % hash_shards for loan in loans]
+    shards: dict[Any, List[int]] = {}
+    for i, key in enumerate(keys):
+        shards.setdefault(key, []).append(i)
+    return shards
+
+def _accrue_shard(shard: tuple) -> array:
+    current_month, principal, rate, start_month = shard
+    return array("q", accrue_columns(principal, rate, start_month, current_month))  # whole cents
+
+def _take(column: array, positions: List[int]) -> array:
+    if np is not None:
+        return array(column.typecode, np.asarray(column)[positions].tobytes())
+    return array(column.typecode, [column[i] for i in positions])
+
+def accrue_loans_parallel(loans: List[Transaction], clients: List[Client], workers: int = DEBT_WORKERS,
+                          today: date | None = None, by: str = DEBT_SHARD_BY) -> List[Cents]:
+    """
+    accrue_loans_batch spread over a process pool, with identical results.
+
+    Loans are sharded by agency (or account hash) so one client's loans stay
+    together, the shards are packed into one evenly sized task per worker
+    and shipped as compact arrays, and the debts and interest are merged
+    back in the original loan order. Small books are done in-process.
+    """
+    today = today or date.today()
+    if workers <= 1 or len(loans) < PARALLEL_MIN_LOANS:
+        return accrue_loans_batch(loans, today)
+    principal = array("q", [loan.amount for loan in loans])
+    rate = array("d", [loan.interest_rate for loan in loans])
+    start_month = array("q", [loan.transaction_date.year * 12 + loan.transaction_date.month for loan in loans])
+    # biggest shards first, each to the lightest task
+    tasks: list[List[int]] = [[] for _ in range(workers)]
+    for positions in sorted(shard_loans(loans, clients, by).values(), key=len, reverse=True):
+        min(tasks, key=len).extend(positions)
+    tasks = [task for task in tasks if task]
+    payloads = [
+        (month_key(today), _take(principal, task), _take(rate, task), _take(start_month, task)) for task in tasks
+    ]
+    debts = [0] * len(loans)
+    with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+        for task, task_debts in zip(tasks, pool.map(_accrue_shard, payloads)):
+            for i, debt in zip(task, task_debts):
+                debts[i] = debt
+    for loan, debt in zip(loans, debts):
+        loan.interest = debt - loan.amount
+    return debts
+
+
+# ====== LOAN QUOTES ======
+# A loan owes amount * (1 + rate / 12) ** months, in cents, in every day of
+# the months-th month after it was granted (calculate_loan_debt), so quotes for
+# any date are computed straight from it.
+def loan_debt_by_month(loan: Transaction, first: date, months: int) -> Iterator[dict]:
+    """
+    months rows from the month of first: the loan's debt during each month and
+    the interest it added, if nothing is paid. Not an amortization schedule:
+    there are no instalments, the debt only grows until the loan is paid.
+    """
+    previous = calculate_loan_debt(loan, month_start(month_key(first) - 1))
+    for key in range(month_key(first), month_key(first) + months):
+        debt = calculate_loan_debt(loan, month_start(key))
+        yield {"month": month_start(key).isoformat()[:7], "debt": money_text(debt),
+               "interest": money_text(debt - previous)}
+        previous = debt
+
+
+# ====== REPORTS ======
+# Statements and summaries read running totals that ReportBook keeps as
+# transactions are appended or changed, so a report costs the size of its
+# output rather than a pass over every transaction. Reports are generators
+# of row dicts with money as dollar text; write_report() streams one to CSV.
+# In working-set mode the totals cover the transactions held in memory.
+RATE_BUCKET = 0.01  # width of the loan portfolio's interest rate buckets
+REPORT_KINDS = {"deposit": "deposits", "withdraw": "withdrawals", "loan": "loans", "paid loan": "loans",
+                "loan payment": "loan_payments"}
+
+def balance_effect(transaction: Transaction) -> Cents:
+    """What the transaction did to the client's balance; a loan counts what was lent, however much is repaid."""
+    kind = transaction.transaction_type.lower()
+    if kind in ("loan", "paid loan"):
+        return transaction.original_amount
+    if kind in ("withdraw", "loan payment"):
+        return -transaction.amount
+    return transaction.amount
+
+def net_by_month(history: Iterable[Transaction]) -> dict[int, Cents]:
+    """Net movement of the balance per month_key(), for history that ReportBook does not cover."""
+    monthly: dict[int, Cents] = {}
+    for transaction in history:
+        month = month_key(transaction.transaction_date)
+        monthly[month] = monthly.get(month, 0) + balance_effect(transaction)
+    return monthly
+
+def rate_bucket(interest_rate: float) -> int:
+    return math.floor(round(interest_rate / RATE_BUCKET, 9))
+
+class ReportBook:
+    """
+    Running totals behind the reports: count and sum of each kind of
+    transaction per agency and per operator, every account's net movement
+    per month, and the open loans by interest rate bucket. Attach it to the
+    repository's transactions as a listener (report_book() does).
+    """
+    def __init__(self, clients: List[Client], transactions: List[Transaction]):
+        self.clients = clients
+        self.by_agency: dict[tuple[str, str], list[int]] = {}  # (agency, kind) -> [count, total]
+        self.by_operator: dict[tuple[str, str], list[int]] = {}  # (operator_id, kind) -> [count, total]
+        self.monthly: dict[str, dict[int, Cents]] = {}  # account -> month_key -> net movement
+        self.loans: dict[int, list[int]] = {}  # rate bucket -> [open loans, outstanding principal]
+        self.open_loans: dict[int, dict[str, Transaction]] = {}
+        agency_of = {client.acc_number: client.agency_number for client in clients}
+        for transaction in transactions:
+            self._count(transaction, 1, agency_of.get(transaction.client_acc_number, ""))
+
+    def _agency(self, acc_number: str) -> str:
+        index = search_index(self.clients, "acc_number", acc_number)
+        return self.clients[index].agency_number if index != -1 else ""
+
+    def _count(self, transaction: Transaction, sign: int, agency: str) -> None:
+        effect = balance_effect(transaction)
+        kind = REPORT_KINDS.get(transaction.transaction_type.lower(), "other")
+        for totals, key in ((self.by_agency, agency), (self.by_operator, transaction.operator_id)):
+            entry = totals.setdefault((key, kind), [0, 0])
+            entry[0] += sign
+            entry[1] += sign * abs(effect)
+        months = self.monthly.setdefault(transaction.client_acc_number, {})
+        month = month_key(transaction.transaction_date)
+        months[month] = months.get(month, 0) + sign * effect
+        if is_open_loan(transaction):
+            bucket = rate_bucket(transaction.interest_rate)
+            entry = self.loans.setdefault(bucket, [0, 0])
+            entry[0] += sign
+            entry[1] += sign * transaction.amount
+            loans = self.open_loans.setdefault(bucket, {})
+            if sign > 0:
+                loans[transaction.Transaction_id] = transaction
+            else:
+                loans.pop(transaction.Transaction_id, None)
+
+    def on_append(self, transaction: Transaction) -> None:
+        self._count(transaction, 1, self._agency(transaction.client_acc_number))
+
+    def on_change(self, transaction: Transaction, field_name: str, old_value) -> None:
+        agency = self._agency(transaction.client_acc_number)
+        self._count(replace(transaction, **{field_name: old_value}), -1, agency)
+        self._count(transaction, 1, agency)
+
+    def on_remove(self, transaction: Transaction) -> None:
+        self._count(transaction, -1, self._agency(transaction.client_acc_number))
+
+def report_book(clients: List[Client], transactions: List[Transaction]) -> ReportBook:
+    """The ReportBook following transactions, built and attached on first use."""
+    with getattr(transactions, "lock", threading.RLock()):
+        for listener in getattr(transactions, "listeners", ()):
+            if isinstance(listener, ReportBook):
+                return listener
+        book = ReportBook(clients, transactions)
+        if isinstance(transactions, IndexedList):
+            transactions.listeners.append(book)
+        return book
+
+def _kind_columns(totals: dict[tuple[str, str], list[int]], key: str) -> dict:
+    row = {}
+    for kind in dict.fromkeys(REPORT_KINDS.values()):
+        count, total = totals.get((key, kind), (0, 0))
+        row[kind] = count
+        row[f"{kind}_total"] = money_text(total)
+    return row
+
+def monthly_statement(client: Client, history: List[Transaction], monthly: dict[int, Cents],
+                      year: int, month: int) -> Iterator[dict]:
+    """
+    One account's statement for a month: opening balance, each transaction
+    with the running balance, closing balance. history is the account's
+    transactions oldest first; monthly its net movement per month, from
+    which the opening balance is worked back from the current one.
+    """
+    target = year * 12 + month
+    first_day, next_month = month_start(target), month_start(target + 1)
+    balance = client.balance - sum(net for key, net in monthly.items() if key >= target)
+    start = bisect.bisect_left(history, first_day, key=attrgetter("transaction_date"))
+    end = bisect.bisect_left(history, next_month, lo=start, key=attrgetter("transaction_date"))
+    yield {"date": first_day.isoformat(), "transaction_id": "", "type": "Opening balance",
+           "name": "", "amount": "", "balance": money_text(balance)}
+    for transaction in history[start:end]:
+        balance += balance_effect(transaction)
+        yield {"date": transaction.transaction_date.isoformat(), "transaction_id": transaction.Transaction_id,
+               "type": transaction.transaction_type, "name": transaction.transaction_name,
+               "amount": money_text(balance_effect(transaction)), "balance": money_text(balance)}
+    yield {"date": (next_month - timedelta(days=1)).isoformat(), "transaction_id": "", "type": "Closing balance", "name": "", "amount": "", "balance": money_text(balance)}
+
+def agency_report(book: ReportBook, clients: List[Client]) -> Iterator[dict]:
+    """Per agency: clients, their balances and debts, and the transactions booked to them by kind."""
+    holdings: dict[str, list[int]] = {}
+    for client in clients:
+        entry = holdings.setdefault(client.agency_number, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += client.balance
+        entry[2] += client.debt
+    by_agency = dict(book.by_agency)
+    for agency in sorted(holdings.keys() | {agency for agency, _ in by_agency}):
+        count, balance, debt = holdings.get(agency, (0, 0, 0))
+        yield {"agency": agency, "clients": count, "balance": money_text(balance), "debt": money_text(debt),
+               **_kind_columns(by_agency, agency)}
+
+def operator_report(book: ReportBook, operators: List[Operator]) -> Iterator[dict]:
+    """Per operator: the transactions they booked by kind."""
+    names = {operator.operator_id: operator.operator_name for operator in operators}
+    by_operator = dict(book.by_operator)
+    for operator_id in sorted(names.keys() | {operator_id for operator_id, _ in by_operator}):
+        yield {"operator_id": operator_id, "operator_name": names.get(operator_id, ""),
+               **_kind_columns(by_operator, operator_id)}
+
+def loan_portfolio(book: ReportBook, engine: DebtEngine) -> Iterator[dict]:
+    """Open loans by interest rate bucket: count, outstanding principal and the interest accrued on it."""
+    totals = [0, 0, 0]
+    for bucket in sorted(book.loans):
+        count, principal = book.loans[bucket]
+        if not count:
+            continue
+        due = 0
+        for loan_id, loan in list(book.open_loans[bucket].items()):
+            accrued = engine.accrued.get((loan_id, engine.month))
+            due += calculate_loan_debt(loan, engine.today) if accrued is None else accrued
+        for i, value in enumerate((count, principal, due)):
+            totals[i] += value
+        yield {"rate": f"{bucket * RATE_BUCKET:.0%}-{(bucket + 1) * RATE_BUCKET:.0%}", "loans": count,
+               "principal": money_text(principal), "interest": money_text(due - principal), "due": money_text(due)}
+    count, principal, due = totals
+    yield {"rate": "total", "loans": count, "principal": money_text(principal),
+           "interest": money_text(due - principal), "due": money_text(due)}
+
+def write_report(rows: Iterable[dict], file_path: str) -> int:
+    """Stream report rows to a CSV file as they are produced; returns how many were written."""
+    written = 0
+    with open(file_path, mode="w", newline='', encoding="utf-8") as csvfile:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(csvfile, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            written += 1
+    return written
+
+def print_report(rows: Iterable[dict]) -> None:
+    for row in rows:
+        print(" | ".join(f"{name}: {value}" for name, value in row.items() if value != ""))
+
+
+# ====== BALANCE CHECKPOINTS ======
+# An account's balance and open loans at the end of every month it was
+# active, derived once by replaying its Deposit/Withdraw/Loan/Loan Payment
+# records. A point-in-time query starts from the checkpoint before the
+# date and replays at most a month of records. Records are only ever
+# added with today's date, so the checkpoints of closed months never
+# change; new ones are added as months close.
+# Loan payment records name the loan they paid in loan_id; older records
+# without it go to the account's oldest open loan with the same name, rate
+# and original amount.
+@dataclass(slots=True)
+class Checkpoint:
+    day: date  # the last day of the month, whose end the state describes
+    balance: Cents
+    loans: tuple  # open loans then, as (loan Transaction, outstanding principal) pairs
+
+def _loan_debt(loan: Transaction, principal: Cents, day: date) -> Cents:
+    return calculate_loan_debt(replace(loan, transaction_type="Loan", amount=principal), day)
+
+def replay_records(balance: Cents, loans: list[list], records: Iterable[Transaction]) -> Cents:
+    """Apply records, oldest first, to a balance and a list of [loan, principal]; returns the new balance."""
+    for record in records:
+        balance += balance_effect(record)
+        kind = record.transaction_type.lower()
+        if kind in ("loan", "paid loan"):
+            loans.append([record, record.original_amount])
+        elif kind == "loan payment":
+            paid = (record.transaction_name, record.interest_rate, record.original_amount)
+            for loan in loans:
+                if (loan[0].Transaction_id == record.loan_id if record.loan_id else
+                        (loan[0].transaction_name, loan[0].interest_rate, loan[0].original_amount) == paid):
+                    if record.amount < _loan_debt(loan[0], loan[1], record.transaction_date):
+                        loan[1] -= record.amount
+                    else:
+                        loans.remove(loan)
+                    break
+    return balance
 
+class BalanceCheckpoints:
+    """
+    Monthly checkpoints per account, built from the account's history the
+    first time it is asked about and extended as months close. The history
+    given must be the account's full record, oldest first.
+    """
+    def __init__(self):
+        self.accounts: dict[str, list[Checkpoint]] = {}
+        self.openings: dict[str, Cents] = {}  # balance the records start from (0 unless they are incomplete)
+
+    def checkpoints(self, client: Client, history: List[Transaction], today: date | None = None) -> List[Checkpoint]:
+        acc_number = client.acc_number
+        if acc_number not in self.accounts:
+            self.accounts[acc_number] = []
+            self.openings[acc_number] = client.balance - sum(map(balance_effect, history))
+        checkpoints = self.accounts[acc_number]
+        closed = month_start(month_key(today or date.today()))
+        done = checkpoints[-1].day + timedelta(days=1) if checkpoints else date.min
+        start = bisect.bisect_left(history, done, key=attrgetter("transaction_date"))
+        end = bisect.bisect_left(history, closed, lo=start, key=attrgetter("transaction_date"))
+        if start == end:
+            return checkpoints
+        balance = checkpoints[-1].balance if checkpoints else self.openings[acc_number]
+        loans = [list(loan) for loan in checkpoints[-1].loans] if checkpoints else []
+        while start < end:
+            next_month = month_start(month_key(history[start].transaction_date) + 1)
+            stop = bisect.bisect_left(history, next_month, lo=start, hi=end, key=attrgetter("transaction_date"))
+            balance = replay_records(balance, loans, history[start:stop])
+            checkpoints.append(Checkpoint(next_month - timedelta(days=1), balance, tuple(map(tuple, loans))))
+            start = stop
+        return checkpoints
+
+    def balance_as_of(self, client: Client, history: List[Transaction], day: date) -> tuple[Cents, Cents]:
+        """Balance and debt at the end of day."""
+        checkpoints = self.checkpoints(client, history)
+        position = bisect.bisect_right(checkpoints, day, key=attrgetter("day"))
+        if position:
+            checkpoint = checkpoints[position - 1]
+            balance, loans = checkpoint.balance, [list(loan) for loan in checkpoint.loans]
+            start = bisect.bisect_right(history, checkpoint.day, key=attrgetter("transaction_date"))
+        else:
+            balance, loans, start = self.openings[client.acc_number], [], 0
+        end = bisect.bisect_right(history, day, lo=start, key=attrgetter("transaction_date"))
+        balance = replay_records(balance, loans, history[start:end])
+        return balance, sum(_loan_debt(loan, principal, day) for loan, principal in loans)
+
+    def forget(self, acc_number: str) -> None:
+        self.accounts.pop(acc_number, None)
+        self.openings.pop(acc_number, None)
+
+
+# ====== LEDGER OPERATIONS ======
+# The business rules behind the session screens, without any terminal I/O,
+# so batch jobs can apply them too. Persisting the result is up to the caller.
+# Each operation checks everything before changing anything and appends its
+# transaction record before touching balances, so a refused or failed call
+# leaves no partial update behind. From several threads, hold the account's
+# lock around the call (see AccountLocks; BankService does this).
+class OperationError(Exception):
+    """An operation was refused by a business rule (unknown account, insufficient funds...)."""
+
+
+def _client_account(clients: List[Client], acc_number: str) -> Client:
+    idx = search_index(clients, "acc_number", acc_number)
+    if idx == -1:
+        raise OperationError(f"No client found with account number {acc_number}.")
+    return clients[idx]
+
+def _check_amount(amount: Cents) -> None:
+    if not isinstance(amount, int):
+        raise OperationError("Amounts must be whole cents.")
+    if amount <= 0:
+        raise OperationError("Amount must be greater than zero.")
+
+def _check_rate(interest_rate: float) -> None:
+    if not (isinstance(interest_rate, (int, float)) and math.isfinite(interest_rate) and interest_rate >= 0):
+        raise OperationError("Interest rate must be a number of zero or more.")
+
+def _append_transaction(transactions: List[Transaction], program_path: str, transaction_type: str,
+                        transaction_name: str, amount: Cents, operator_id: str, acc_number: str,
+                        interest_rate: float = 0.0, original_amount: Cents | None = None,
+                        loan_id: str = "") -> Transaction:
     transaction = Transaction(
-        transaction_type="Deposit",
-        transaction_name=input("Insert a tag (optional): ").strip().title() or "Deposit",
+        transaction_type=transaction_type,
+        transaction_name=transaction_name,
         transaction_date=date.today(),
-        interest_rate=0.00,
-        interest=0.0,
-        amount=deposit,
-        operator_id=active_operator.operator_id,
-        client_acc_number=active_client.acc_number,
-        Transaction_id=transaction_id,
-        original_amount=deposit
+        interest_rate=interest_rate,
+        interest=0,
+        amount=amount,
+        operator_id=operator_id,
+        client_acc_number=acc_number,
+        Transaction_id=generate_unique_transaction_id(transactions, program_path),
+        original_amount=amount if original_amount is None else original_amount,
+        loan_id=loan_id
     )
-
     transactions.append(transaction)
-    clear_terminal()
-    print_transaction_data(transaction)
-    print(f"New balance is: ${clients[idx].balance:,.2f}")
-
-    save_to_csv(f"{program_path}/clients.csv", clients)
-    save_to_csv(f"{program_path}/transactions.csv", transactions)
-    input("Press Enter to continue...")
-
-
-def do_withdraw(clients, transactions, active_client, active_operator, program_path):
-    clear_terminal()
-    withdraw = get_float("What amount to withdraw? ")
-    idx = search_index(clients, "acc_number", active_client.acc_number)
-
-    if withdraw > clients[idx].balance:
-        print("Insufficient funds.")
+    return transaction
+
+def find_open_loan(transactions: List[Transaction], acc_number: str, transaction_id: str) -> Transaction:
+    loan = search_transaction(transactions, transaction_id)
+    if loan is None or loan.client_acc_number != acc_number or not is_open_loan(loan):
+        raise OperationError("Transaction not found.")
+    return loan
+
+def apply_deposit(clients: List[Client], transactions: List[Transaction], acc_number: str,
+                  amount: Cents, operator_id: str, tag: str, program_path: str) -> Transaction:
+    client = _client_account(clients, acc_number)
+    _check_amount(amount)
+    transaction = _append_transaction(transactions, program_path, "Deposit", tag.strip().title() or "Deposit",
+                                      amount, operator_id, acc_number)
+    client.balance += amount
+    return transaction
+
+def apply_withdraw(clients: List[Client], transactions: List[Transaction], acc_number: str,
+                   amount: Cents, operator_id: str, tag: str, program_path: str) -> Transaction:
+    client = _client_account(clients, acc_number)
+    _check_amount(amount)
+    if amount > client.balance:
+        raise OperationError("Insufficient funds.")
+    transaction = _append_transaction(transactions, program_path, "Withdraw", tag.strip().title() or "Withdraw",
+                                      amount, operator_id, acc_number)
+    client.balance -= amount
+    return transaction
+
+def apply_loan(clients: List[Client], transactions: List[Transaction], acc_number: str, amount: Cents,
+               interest_rate: float, operator_id: str, tag: str, program_path: str) -> Transaction:
+    client = _client_account(clients, acc_number)
+    _check_amount(amount)
+    _check_rate(interest_rate)
+    transaction = _append_transaction(transactions, program_path, "Loan", tag.strip().title() or "Loan",
+                                      amount, operator_id, acc_number, interest_rate=interest_rate)
+    client.balance += amount  # debt follows from the new loan through the DebtEngine
+    return transaction
+
+def apply_loan_payment(clients: List[Client], transactions: List[Transaction], acc_number: str,
+                       transaction_id: str, amount: Cents, operator_id: str, program_path: str) -> Transaction:
+    """Pay part or all of a loan from the client's balance. Returns the "Loan Payment" record."""
+    client = _client_account(clients, acc_number)
+    loan = find_open_loan(transactions, acc_number, transaction_id)
+    loan_debt = loan.amount + loan.interest
+    _check_amount(amount)
+    if amount > client.balance:
+        raise OperationError(f"Insufficient funds. Your balance is {format_money(client.balance)}")
+    if amount > loan_debt:
+        raise OperationError("Value higher than debt, try again.")
+
+    payment = _append_transaction(transactions, program_path, "Loan Payment", loan.transaction_name, amount,
+                                  operator_id, acc_number, interest_rate=loan.interest_rate,
+                                  original_amount=loan.original_amount, loan_id=loan.Transaction_id)
+    idx_loan = search_index(transactions, "Transaction_id", loan.Transaction_id)
+    if amount < loan_debt:
+        transactions.set_field(idx_loan, "amount", loan.amount - amount)
     else:
-        clients[idx].balance -= withdraw
-        transaction_id = generate_unique_transaction_id(transactions)
-
-        transaction = Transaction(
-            transaction_type="Withdraw",
-            transaction_name=input("Insert a tag (optional): ").title().strip() or "Withdraw",
-            transaction_date=date.today(),
-            interest_rate=0.00,
-            interest=0.0,
-            amount=withdraw,
-            operator_id=active_operator.operator_id,
-            client_acc_number=active_client.acc_number,
-            Transaction_id=transaction_id,
-            original_amount= withdraw
-        )
-        clear_terminal()
-        transactions.append(transaction)
-        print_transaction_data(transaction)
-        print(f"New balance is: ${clients[idx].balance:,.2f}")
+        transactions.set_field(idx_loan, "transaction_type", "Paid Loan")
+    client.balance -= amount
+    return payment
+
+
+# ====== BANK SERVICE ======
+# minimum operator access level for each action
+ACCESS_LEVELS = {
+    "client_data": 1,
+    "deposit": 1,
+    "withdraw": 1,
+    "pay_loan": 1,
+    "loan": 2,
+    "operator_data": 2,
+    "remove_client": 3,
+    "register_operator": 3,
+    "remove_operator": 4,
+    "change_operator_level": 4,
+    "reports": 2,
+}
+COMMIT_WINDOW = float(os.environ.get("BANK_COMMIT_WINDOW", "0"))  # extra seconds a write waits for company
+COMMIT_RETRY = 1.0  # seconds between attempts while writes fail
+
+
+class GroupCommitWriter:
+    """
+    Background thread writing a BankService's changes in groups.
 
-        save_to_csv(f"{program_path}/clients.csv", clients)
-        save_to_csv(f"{program_path}/transactions.csv", transactions)
-    input("Press Enter to continue...")
+    Operations mark what they changed, submit() and wait() for their ticket:
+    they return only once a write holding their change is on disk, or raise
+    that write's error. Operations arriving while a write is under way are
+    written together by the next one, so concurrent tellers share a journal
+    fsync instead of queueing for one each; window adds a deliberate wait
+    for more of them.
 
+    flush() waits for everything submitted so far; close() writes what is
+    left and stops the thread, and also runs at exit.
+    """
+    def __init__(self, write: Callable[[], None], window: float = COMMIT_WINDOW):
+        self.write = write
+        self.window = window
+        self.condition = threading.Condition()
+        self.submitted = 0
+        self.written = 0  # submissions known to be on disk
+        self.attempts = 0  # writes started
+        self.failure: tuple[int, int, Exception] | None = None  # attempt, submissions it covered, error
+        self.hurry = False
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self) -> int:
+        """Hand over one change; returns the ticket to wait() for."""
+        with self.condition:
+            self.submitted += 1
+            self.condition.notify_all()
+            return self.submitted
+
+    def wait(self, ticket: int, hurry: bool = False) -> None:
+        """Block until the change of ticket is on disk; raises the error of a write that should have held it."""
+        with self.condition:
+            since = self.attempts
+            if hurry:
+                self.hurry = True
+                self.condition.notify_all()
+            while self.written < ticket:
+                if self.failure is not None and self.failure[0] > since and self.failure[1] >= ticket:
+                    raise self.failure[2]
+                if not self.thread.is_alive():
+                    raise RuntimeError("the group-commit writer is closed")
+                self.condition.wait()
+
+    def flush(self) -> None:
+        """Wait until every submission so far is written, without waiting out the window."""
+        with self.condition:
+            ticket = self.submitted
+        self.wait(ticket, hurry=True)
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                while self.written == self.submitted and not self.closed:
+                    self.condition.wait()
+                if self.written == self.submitted:
+                    return
+                deadline = time.monotonic() + self.window
+                while not (self.hurry or self.closed) and (left := deadline - time.monotonic()) > 0:
+                    self.condition.wait(left)
+                self.hurry = False
+                self.attempts += 1
+                attempt, target = self.attempts, self.submitted
+            try:
+                self.write()
+            except Exception as error:  # the changes stay pending for the next attempt
+                with self.condition:
+                    self.failure = (attempt, target, error)
+                    self.condition.notify_all()
+                    if self.closed:
+                        return
+                    self.condition.wait(COMMIT_RETRY)
+                continue
+            with self.condition:
+                self.written = target
+                self.condition.notify_all()
 
-def do_loan(clients, transactions, active_client, active_operator, program_path):
-    clear_terminal()
-    loan = get_float("What amount to loan? ")
-    interest_rate = get_float("please input the autorized interest rate: ")
-    interest = 0.00
-    idx = search_index(clients, "acc_number", active_client.acc_number)
+@dataclass
+class OperationResult:
+    """What a BankService call did. message explains a refusal, or describes the outcome."""
+    ok: bool
+    message: str = ""
+    client: Client | None = None
+    operator: Operator | None = None
+    transaction: Transaction | None = None
 
-    clients[idx].balance += loan
-    clients[idx].debt += loan + interest
-    transaction_id = generate_unique_transaction_id(transactions)
 
-    transaction = Transaction(
-        transaction_type="Loan",
-        transaction_name=input("Insert a tag (optional): ").strip().title() or "Loan",
-        transaction_date=date.today(),
-        interest_rate=interest_rate,
-        interest=interest,
-        amount=loan,
-        operator_id=active_operator.operator_id,
-        client_acc_number=active_client.acc_number,
-        Transaction_id=transaction_id,
-        original_amount=loan
-    )
+class BankService:
+    """
+    The bank's operations as plain method calls with no terminal I/O.
+
+    Owns the repository loaded from the storage backend, checks operator
+    access levels, and persists what each successful operation changed:
+    only the changed clients and transactions, plus the accounts opened or
+    closed. An operation returns only once its changes are on disk; a
+    GroupCommitWriter writes the changes of concurrent operations together
+    (commit_window adds a wait for more of them), and shutdown() must be
+    called before leaving. With autoflush=False changes are only collected
+    until flush(), so batch jobs can persist many operations in one write.
+
+    Safe to call from several threads: money operations hold their account's
+    striped lock for the whole check-update-record sequence, so different
+    accounts proceed in parallel, and storage writes go through write_lock.
+    """
+    def __init__(self, program_path: str, storage=None, autoflush: bool = True,
+                 commit_window: float = COMMIT_WINDOW):
+        self.program_path = program_path
+        self.storage = storage or get_storage(program_path)
+        self.repository = self.storage.load()
+        self.autoflush = autoflush
+        self.dirty_clients: dict[str, Client] = {}
+        self.dirty_transactions: dict[str, Transaction] = {}
+        self.opened_clients: dict[str, Client] = {}
+        self.closed_clients: set[str] = set()
+        self.pending_lock = threading.Lock()  # guards the four above
+        self.write_lock = threading.RLock()
+        self.checkpoints = BalanceCheckpoints()
+        self.transactions.listeners.append(
+            DebtEngine(self.clients, self.transactions, accrued_month=self.repository.debt_month)
+        )
+        self.writer = GroupCommitWriter(self._write_changes, commit_window) if autoflush else None
+
+    @property
+    def operators(self) -> List[Operator]:
+        return self.repository.operators
+
+    @property
+    def clients(self) -> List[Client]:
+        return self.repository.clients
+
+    @property
+    def transactions(self) -> List[Transaction]:
+        return self.repository.transactions
+
+    # ------ persistence ------
+    def _changed(self, clients: List[Client], transactions: List[Transaction]) -> None:
+        """
+        Queue copies of what an operation changed. Call it while still holding
+        the account lock: the copies are then a consistent state of the account
+        even if another thread changes it again before the flush.
+        """
+        with self.pending_lock:
+            for client in clients:
+                self.dirty_clients[client.acc_number] = replace(client)
+            for transaction in transactions:
+                self.dirty_transactions[transaction.Transaction_id] = replace(transaction)
+
+    def _persist(self) -> None:
+        """With autoflush, return once the operation's changes are on disk (written in a group with others)."""
+        if self.writer is not None:
+            self.writer.wait(self.writer.submit())
+
+    @instrumented("commit")
+    def _write_changes(self) -> None:
+        """Persist everything changed since the last write as one storage write."""
+        with self.write_lock:
+            with self.pending_lock:
+                clients, transactions = self.dirty_clients, self.dirty_transactions
+                opened, closed = self.opened_clients, self.closed_clients
+                self.dirty_clients, self.dirty_transactions = {}, {}
+                self.opened_clients, self.closed_clients = {}, set()
+            try:
+                # accounts first: replaying the journal only updates accounts clients.csv has
+                if closed:
+                    self.storage.remove_clients(self.clients, list(closed))
+                if opened:
+                    self.storage.add_clients(self.clients, list(opened.values()))
+                if clients or transactions:
+                    self.storage.record(self.clients, self.transactions,
+                                        list(clients.values()), list(transactions.values()))
+            except BaseException:
+                with self.pending_lock:  # keep them for the next write, under anything newer
+                    self.dirty_clients = clients | self.dirty_clients
+                    self.dirty_transactions = transactions | self.dirty_transactions
+                    opened = {acc: c for acc, c in opened.items() if acc not in self.closed_clients}
+                    self.opened_clients, self.closed_clients = (
+                        opened | self.opened_clients, (closed - self.opened_clients.keys()) | self.closed_clients
+                    )
+                raise
+
+    @instrumented("flush")
+    def flush(self) -> None:
+        """Persist everything changed so far; returns once it is on disk."""
+        if self.writer is not None:
+            self.writer.flush()
+        else:
+            self._write_changes()
+
+    def snapshot(self) -> None:
+        """Flush, then fold everything into the storage's snapshot right away."""
+        self.flush()
+        with self.write_lock:
+            self._write_changes()
+            self.storage.snapshot(self.clients, self.transactions)
+
+    def compact_archive(self, months: int = HOT_MONTHS) -> int:
+        """
+        Move settled history from before the last months months out of the
+        hot set into the storage's archive; returns how many rows moved.
+        Reports only count the transactions still in the hot set.
+        """
+        cutoff = hot_cutoff(months)
+        self.flush()
+        with self.transactions.lock, self.write_lock:
+            self._write_changes()
+            moved = self.storage.compact(self.clients, self.transactions, cutoff)
+            if moved:
+                self.transactions.remove_many([t for t in self.transactions if archivable(t, cutoff)])
+                self.storage.snapshot(self.clients, self.transactions)
+        return moved
+
+    def shutdown(self) -> None:
+        """Write every pending change, snapshot and close the storage."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        with self.write_lock:
+            self._write_changes()
+            self.storage.snapshot(self.clients, self.transactions)
+            self.storage.close()
+
+    # ------ access ------
+    def can(self, operator: Operator, action: str) -> bool:
+        return operator.access_level >= ACCESS_LEVELS[action]
+
+    def _denied(self, operator: Operator, action: str) -> OperationResult | None:
+        if not self.can(operator, action):
+            return OperationResult(False, "Access denied: low access level")
+        return None
+
+    def operator_login(self, operator_id: str, password: str) -> OperationResult:
+        candidate = Operator(operator_id=operator_id, operator_password=password, operator_name="", access_level=0)
+        if not check_operator_login(candidate, self.operators):
+            return OperationResult(False, "Invalid login, please try again.")
+        return OperationResult(True, operator=self.operators[search_index(self.operators, "operator_id", operator_id)])
+
+    def client_login(self, acc_number: str, password: str) -> OperationResult:
+        candidate = Client(client_id="", client_name="", acc_number=acc_number, agency_number="",
+                           creation_date=date.today(), client_password=password, balance=0, debt=0)
+        if not check_client_login(candidate, self.clients):
+            return OperationResult(False, "Invalid login, please try again.")
+        return OperationResult(True, client=self.clients[search_index(self.clients, "acc_number", acc_number)])
+
+    # ------ lookups ------
+    def find_client(self, query: str) -> Client | None:
+        return search_client(query, self.clients)
+
+    @instrumented("search_clients")
+    def search_clients(self, query: str, page: int = 0, page_size: int = SEARCH_PAGE_SIZE) -> List[Client]:
+        """Page number page (from 0) of the clients whose name matches query, best matches first."""
+        with self.clients.lock:
+            return name_index(self.clients).search(query, page * page_size, page_size)
+
+    def client_history(self, acc_number: str) -> List[Transaction]:
+        return account_history(self.storage, self.transactions, acc_number)
+
+    def find_transaction(self, transaction_id: str) -> Transaction | None:
+        """A transaction by id, read from storage when it is outside the working set."""
+        transaction = search_transaction(self.transactions, transaction_id)
+        if transaction is None and self.storage.partial:
+            transaction = self.storage.find_transaction(transaction_id)
+        return transaction
+
+    def refresh_debts(self) -> None:
+        with self.transactions.lock:  # a new month re-accrues every open loan
+            update_debt(self.clients, self.transactions, 0)
+
+    @instrumented("recalculate_debts")
+    def recalculate_debts(self) -> None:
+        """End-of-day pass: accrue every open loan again, over BANK_DEBT_WORKERS processes."""
+        with self.transactions.lock:
+            debt_engine(self.clients, self.transactions).recalculate()
+
+    # ------ reports ------
+    def statement(self, acc_number: str, year: int, month: int) -> List[dict]:
+        """The account's statement for a month (see monthly_statement); empty for an unknown account."""
+        book = report_book(self.clients, self.transactions)
+        with self.repository.account_locks.hold(acc_number):
+            index = search_index(self.clients, "acc_number", acc_number)
+            if index == -1:
+                return []
+            history = self.client_history(acc_number)
+            if not self.storage.partial:
+                monthly = dict(book.monthly.get(acc_number, {}))
+            else:
+                monthly = net_by_month(history)  # the older months are only on disk
+            return list(monthly_statement(self.clients[index], history, monthly, year, month))
+
+    def balance_as_of(self, acc_number: str, day: date) -> tuple[Cents, Cents] | None:
+        """The account's balance and debt at the end of day, or None for an unknown account."""
+        with self.repository.account_locks.hold(acc_number):
+            index = search_index(self.clients, "acc_number", acc_number)
+            if index == -1:
+                return None
+            return self.checkpoints.balance_as_of(self.clients[index], self.client_history(acc_number), day)
+
+    def agency_report(self) -> List[dict]:
+        book = report_book(self.clients, self.transactions)
+        with self.transactions.lock:
+            return list(agency_report(book, self.clients))
+
+    def operator_report(self) -> List[dict]:
+        book = report_book(self.clients, self.transactions)
+        with self.transactions.lock:
+            return list(operator_report(book, self.operators))
+
+    def loan_portfolio(self) -> List[dict]:
+        book = report_book(self.clients, self.transactions)
+        with self.transactions.lock:
+            update_debt(self.clients, self.transactions, 0)
+            return list(loan_portfolio(book, debt_engine(self.clients, self.transactions)))
+
+    def loan_quote(self, acc_number: str, transaction_id: str) -> OperationResult:
+        """The open loan transaction_id of acc_number; its debt is amount + interest."""
+        self.refresh_debts()
+        try:
+            loan = find_open_loan(self.transactions, acc_number, transaction_id)
+        except OperationError as error:
+            return OperationResult(False, str(error))
+        return OperationResult(True, f"Your debt in this loan is {format_money(loan.amount + loan.interest)}",
+                               transaction=loan)
+
+    def _loan_answer(self, acc_number: str, transaction_id: str, answer) -> OperationResult:
+        """answer(loan) about the open loan transaction_id of acc_number, as the message."""
+        with self.repository.account_locks.hold(acc_number):
+            try:
+                loan = find_open_loan(self.transactions, acc_number, transaction_id)
+            except OperationError as error:
+                return OperationResult(False, str(error))
+            message = answer(loan)
+            client = self.clients[search_index(self.clients, "acc_number", acc_number)]
+            return OperationResult(True, message, client=client, transaction=loan)
+
+    def payoff_quote(self, acc_number: str, transaction_id: str, day: date | None = None) -> OperationResult:
+        """What paying off the loan on day (today by default) takes, if nothing is paid before."""
+        day = day or date.today()
+        return self._loan_answer(acc_number, transaction_id, lambda loan: (
+            f"Paying off on {day} takes {format_money(calculate_loan_debt(loan, day))}"))
+
+    def interest_quote(self, acc_number: str, transaction_id: str, start: date, end: date) -> OperationResult:
+        """The interest the loan accrues from start to end, if nothing is paid meanwhile."""
+        return self._loan_answer(acc_number, transaction_id, lambda loan: (
+            f"Interest from {start} to {end}: "
+            f"{format_money(calculate_loan_debt(loan, end) - calculate_loan_debt(loan, start))}"))
+
+    def loan_debt_by_month(self, acc_number: str, transaction_id: str, months: int = 12,
+                           first: date | None = None) -> List[dict]:
+        """The loan's debt and interest for months months from first (this month by default); empty if no such loan."""
+        rows: List[dict] = []
+        self._loan_answer(acc_number, transaction_id,
+                          lambda loan: rows.extend(loan_debt_by_month(loan, first or date.today(), months)))
+        return rows
+
+    # ------ money ------
+    def _money_operation(self, operator: Operator, action: str, acc_number: str, apply) -> OperationResult:
+        denied = self._denied(operator, action)
+        if denied:
+            return denied
+        with self.repository.account_locks.hold(acc_number):
+            try:
+                touched = apply()
+            except OperationError as error:
+                return OperationResult(False, str(error))
+            client = self.clients[search_index(self.clients, "acc_number", acc_number)]
+            self._changed([client], touched)
+        self._persist()
+        return OperationResult(True, client=client, transaction=touched[-1])
+
+    @instrumented("deposit")
+    def deposit(self, acc_number: str, amount: Cents, operator: Operator, tag: str = "") -> OperationResult:
+        return self._money_operation(operator, "deposit", acc_number, lambda: [apply_deposit(
+            self.clients, self.transactions, acc_number, amount, operator.operator_id, tag, self.program_path
+        )])
+
+    @instrumented("withdraw")
+    def withdraw(self, acc_number: str, amount: Cents, operator: Operator, tag: str = "") -> OperationResult:
+        return self._money_operation(operator, "withdraw", acc_number, lambda: [apply_withdraw(
+            self.clients, self.transactions, acc_number, amount, operator.operator_id, tag, self.program_path
+        )])
+
+    @instrumented("loan")
+    def loan(self, acc_number: str, amount: Cents, interest_rate: float, operator: Operator,
+             tag: str = "") -> OperationResult:
+        return self._money_operation(operator, "loan", acc_number, lambda: [apply_loan(
+            self.clients, self.transactions, acc_number, amount, interest_rate, operator.operator_id, tag,
+            self.program_path
+        )])
+
+    @instrumented("pay_loan")
+    def pay_loan(self, acc_number: str, transaction_id: str, amount: Cents | None,
+                 operator: Operator) -> OperationResult:
+        """Pay amount off a loan; amount=None pays the whole debt."""
+        def apply():
+            self.refresh_debts()  # the payment is weighed against this month's interest
+            loan = find_open_loan(self.transactions, acc_number, transaction_id)
+            payment = apply_loan_payment(
+                self.clients, self.transactions, acc_number, transaction_id,
+                loan.amount + loan.interest if amount is None else amount, operator.operator_id, self.program_path
+            )
+            return [loan, payment]
+        return self._money_operation(operator, "pay_loan", acc_number, apply)
+
+    # ------ clients ------
+    def create_client(self, client_id: str, name: str, agency_number: str, password: str,
+                      operator: Operator) -> OperationResult:
+        denied = self._denied(operator, "client_data")
+        if denied:
+            return denied
+        new_client = Client(
+            client_id=client_id,
+            client_name=name,
+            acc_number=get_id_allocator(self.program_path).allocate(
+                "account", lambda candidate: not check_acc_number_availability(self.clients, candidate)
+            ),
+            agency_number=agency_number,
+            creation_date=date.today(),
+            client_password=password,
+            balance=0,
+            debt=0
+        )
+        self.clients.append(new_client)
+        with self.pending_lock:
+            self.opened_clients[new_client.acc_number] = replace(new_client)
+            self.closed_clients.discard(new_client.acc_number)
+        self._persist()
+        return OperationResult(True, client=new_client)
+
+    def remove_client(self, acc_number: str, operator: Operator) -> OperationResult:
+        denied = self._denied(operator, "remove_client")
+        if denied:
+            return denied
+        with self.repository.account_locks.hold(acc_number), self.clients.lock:
+            index = search_index(self.clients, "acc_number", acc_number)
+            if index == -1:
+                return OperationResult(False, f"No client found with account number {acc_number}.")
+            if self.clients[index].debt != 0:
+                return OperationResult(False, f"Client in debt, pay the debt before removing this account")
+            removed = self.clients.pop(index)
+            self.checkpoints.forget(acc_number)
+            with self.pending_lock:
+                self.dirty_clients.pop(acc_number, None)
+                self.opened_clients.pop(acc_number, None)
+                self.closed_clients.add(acc_number)
+        self._persist()
+        return OperationResult(True, f"Client with account {acc_number} removed.", client=removed)
+
+    # ------ operators ------
+    def register_operator(self, password: str, name: str, access_level: int,
+                          operator: Operator | None = None) -> OperationResult:
+        """Register an operator. operator may only be None for the very first one."""
+        if operator is None:
+            if self.operators:
+                return OperationResult(False, "Access denied: low access level")
+        else:
+            denied = self._denied(operator, "register_operator")
+            if denied:
+                return denied
+        new_operator = Operator(
+            operator_id=get_id_allocator(self.program_path).allocate(
+                "operator", lambda candidate: search_index(self.operators, "operator_id", candidate) != -1
+            ),
+            operator_password=password,
+            operator_name=name,
+            access_level=access_level
+        )
+        self.operators.append(new_operator)
+        with self.write_lock:
+            self.storage.save_operator(self.operators, new_operator)
+        return OperationResult(True, operator=new_operator)
+
+    def remove_operator(self, operator_id: str, operator: Operator) -> OperationResult:
+        denied = self._denied(operator, "remove_operator")
+        if denied:
+            return denied
+        index = search_index(self.operators, "operator_id", operator_id)
+        if index == -1:
+            return OperationResult(False, f"Operator not found")
+        removed = self.operators.pop(index)
+        with self.write_lock:
+            self.storage.remove_operator(self.operators, operator_id)
+        return OperationResult(True, operator=removed)
+
+    def change_operator_level(self, operator_id: str, access_level: int, operator: Operator) -> OperationResult:
+        denied = self._denied(operator, "change_operator_level")
+        if denied:
+            return denied
+        if access_level not in (1, 2, 3, 4, 5):
+            return OperationResult(False, f"Invalid option try again:(1 to 5)")
+        index = search_index(self.operators, "operator_id", operator_id)
+        if index == -1:
+            return OperationResult(False, f"operator not found")
+        self.operators.set_field(index, "access_level", access_level)
+        with self.write_lock:
+            self.storage.save_operator(self.operators, self.operators[index])
+        return OperationResult(True, operator=self.operators[index])
 
-    transactions.append(transaction)
-    print(f"Loan granted: ${loan:,.2f} with interest ${interest:,.2f}")
-    print(f"New balance is: ${clients[idx].balance:,.2f}")
-    print(f"Total debt is: ${clients[idx].debt:,.2f}")
-    print_transaction_data(transaction)
 
-    save_to_csv(f"{program_path}/clients.csv", clients)
-    save_to_csv(f"{program_path}/transactions.csv", transactions)
+# ─────────────────────────────
+# Client session actions
+# ─────────────────────────────
+def do_deposit(service, active_client, active_operator):
+    clear_terminal()
+    deposit = get_money("What amount to deposit? ")
+    tag = input("Insert a tag (optional): ")
+    result = service.deposit(active_client.acc_number, deposit, active_operator, tag)
+    if result.ok:
+        clear_terminal()
+        print_transaction_data(result.transaction)
+        print(f"New balance is: {format_money(result.client.balance)}")
+    else:
+        print(result.message)
     input("Press Enter to continue...")
 
 
-def pay_loan(clients, transactions, active_client, active_operator, program_path):
+def do_withdraw(service, active_client, active_operator):
     clear_terminal()
-    temp_transaction = input("Please enter transaction ID: ").strip()
-    active_transaction = search_transaction(transactions, temp_transaction)
-
-    if not active_transaction:
-        print("Transaction not found.")
+    withdraw = get_money("What amount to withdraw? ")
+    if withdraw > active_client.balance:
+        print("Insufficient funds.")
         input("Press Enter to continue...")
         return
+    tag = input("Insert a tag (optional): ")
+    result = service.withdraw(active_client.acc_number, withdraw, active_operator, tag)
+    if result.ok:
+        clear_terminal()
+        print_transaction_data(result.transaction)
+        print(f"New balance is: {format_money(result.client.balance)}")
+    else:
+        print(result.message)
+    input("Press Enter to continue...")
 
-    loan_debt = active_transaction.amount + active_transaction.interest
-    print(f"Your debt in this loan is ${loan_debt:,.2f}")
-
-    redemption = get_float("What amount do you want to pay? ")
-    if redemption > active_client.balance:
-        print(f"Insufficient funds. Your balance is ${active_client.balance:,.2f}")
-        input("Press Enter to continue...")
-        return
 
-    idx_client = search_index(clients, "acc_number", active_client.acc_number)
-    idx_transaction = search_index(transactions, "Transaction_id", active_transaction.Transaction_id)
-
-    if redemption < loan_debt:
-        clients[idx_client].balance -= redemption
-        clients[idx_client].debt -= redemption
-        transactions[idx_transaction].amount-= redemption
-
-        transaction_id = generate_unique_transaction_id(transactions)
-        new_transaction = Transaction(
-            transaction_type="Loan Payment",
-            transaction_name=active_transaction.transaction_name,
-            transaction_date=date.today(),
-            interest_rate=transactions[idx_transaction].interest_rate,
-            interest=0.0,
-            amount=redemption,
-            operator_id=active_operator.operator_id,
-            client_acc_number=active_client.acc_number,
-            Transaction_id=transaction_id,
-            original_amount=active_transaction.original_amount
-        )
-        transactions.append(new_transaction)
-
-    elif redemption == loan_debt:
-        clients[idx_client].balance -= redemption
-        clients[idx_client].debt -= redemption
-        transactions[idx_transaction].transaction_type = "Paid Loan"
-        new_transaction = Transaction(
-            transaction_type="Loan Payment",
-            transaction_name=active_transaction.transaction_name,
-            transaction_date=date.today(),
-            interest_rate=transactions[idx_transaction].interest_rate,
-            interest=0.0,
-            amount=redemption,
-            operator_id=active_operator.operator_id,
-            client_acc_number=active_client.acc_number,
-            Transaction_id=transaction_id,
-            original_amount=active_transaction.original_amount
-        )
-        transactions.append(new_transaction)
-        print("Payment recived:")
-        print_transaction_data(new_transaction)
+def do_loan(service, active_client, active_operator):
+    clear_terminal()
+    loan = get_money("What amount to loan? ")
+    interest_rate = get_float("please input the autorized interest rate: ")
+    tag = input("Insert a tag (optional): ")
+    result = service.loan(active_client.acc_number, loan, interest_rate, active_operator, tag)
+    if result.ok:
+        print(f"Loan granted: {format_money(loan)} with interest {format_money(result.transaction.interest)}")
+        print(f"New balance is: {format_money(result.client.balance)}")
+        print(f"Total debt is: {format_money(result.client.debt)}")
+        print_transaction_data(result.transaction)
     else:
-        print("Value higher than debt, try again.")
-        input("Press Enter to continue...")
-        return
+        print(result.message)
+    input("Press Enter to continue...")
 
-    save_to_csv(f"{program_path}/clients.csv", clients)
-    save_to_csv(f"{program_path}/transactions.csv", transactions)
+
+def pay_loan(service, active_client, active_operator):
+    clear_terminal()
+    temp_transaction = input("Please enter transaction ID: ").strip()
+    quote = service.loan_quote(active_client.acc_number, temp_transaction)
+    print(quote.message)
+    if quote.ok:
+        redemption = get_money("What amount do you want to pay? ")
+        result = service.pay_loan(active_client.acc_number, temp_transaction, redemption, active_operator)
+        if result.ok:
+            print("Payment recived:")
+            print_transaction_data(result.transaction)
+        else:
+            print(result.message)
     input("Press Enter to continue...")
 
 
 # ─────────────────────────────
 # Submenus
 # ─────────────────────────────
-def client_session(clients, transactions, active_client, active_operator, program_path):
+def exit_program(service):
+    """Leave the application once every operation is written and the storage closed."""
+    service.shutdown()
+    sys.exit()
+
+
+def client_session(service, active_client, active_operator):
     while True:
         clear_terminal()
         control = input(
@@ -594,33 +3567,33 @@ def client_session(clients, transactions, active_client, active_operator, progra
         )
         match control:
             case "1": 
-                if(active_operator.access_level>0):
-                    do_deposit(clients, transactions, active_client, active_operator, program_path)
+                if service.can(active_operator, "deposit"):
+                    do_deposit(service, active_client, active_operator)
                 else:
                     print("Access denied: low access level")
                     input("Press Enter to continue...")
             case "2": 
-                if(active_operator.access_level>0):
-                    do_withdraw(clients, transactions, active_client, active_operator, program_path)
+                if service.can(active_operator, "withdraw"):
+                    do_withdraw(service, active_client, active_operator)
                 else:
                     print("Access denied: low access level")
                     input("Press Enter to continue...")
             case "3": 
-                if(active_operator.access_level>1):
-                    do_loan(clients, transactions, active_client, active_operator, program_path)
+                if service.can(active_operator, "loan"):
+                    do_loan(service, active_client, active_operator)
                 else:
                     print("Access denied: low access level")
                     input("Press Enter to continue...")
             case "4":
                 clear_terminal()
+                service.refresh_debts()
                 print_client_data(active_client)
-                for transaction in transactions:
-                    if active_client.acc_number == transaction.client_acc_number:
-                        print_transaction_data(transaction)
+                for transaction in service.client_history(active_client.acc_number):
+                    print_transaction_data(transaction)
                 input("Press Enter to continue...")
             case "5": 
-                if(active_operator.access_level>0):
-                    pay_loan(clients, transactions, active_client, active_operator, program_path)
+                if service.can(active_operator, "pay_loan"):
+                    pay_loan(service, active_client, active_operator)
                 else:
                     print("Access denied: low access level")
                     input("Press Enter to continue...")
@@ -630,7 +3603,7 @@ def client_session(clients, transactions, active_client, active_operator, progra
                 input("Press Enter to continue...")
 
 
-def client_operations(clients, transactions, active_operator, program_path):
+def client_operations(service, active_operator):
     while True:
         clear_terminal()
         control = input(
@@ -638,35 +3611,36 @@ def client_operations(clients, transactions, active_operator, program_path):
             "1-Register new client\n"
             "2-Remove client\n"
             "3-Log-in client\n"
-            "4-Return to main menu\n"
-            "5-Exit Application\n"
+            "4-Search client by name\n"
+            "5-Return to main menu\n"
+            "6-Exit Application\n"
         )
         match control:
             case "1":
-                create_new_client(clients)
-                save_to_csv(f"{program_path}/clients.csv", clients)
+                create_new_client(service, active_operator)
             case "2":
-                if active_operator.access_level < 3:
+                if not service.can(active_operator, "remove_client"):
                     print("Access denied: low access level")
                     input("Press Enter to continue...")
                 else:
                     ex_client_acc = input("Insert account number to delete: ").strip()
-                    remove_client(clients, ex_client_acc)
-                    save_to_csv(f"{program_path}/clients.csv", clients)
+                    remove_client(service, ex_client_acc, active_operator)
             case "3":
-                active_client = client_login(clients)
-                client_session(clients, transactions, active_client, active_operator, program_path)
-            case "4": break
-            case "5":
+                active_client = client_login(service)
+                client_session(service, active_client, active_operator)
+            case "4":
+                search_clients(service)
+            case "5": break
+            case "6":
                 print("Exiting application...")
-                exit()
+                exit_program(service)
             case _:
                 print("Invalid option, try again.")
                 input("Press Enter to continue...")
 
 
-def operator_operations(operators, active_operator,program_path):
-    if active_operator.access_level >= 2:
+def operator_operations(service, active_operator):
+    if service.can(active_operator, "operator_data"):
         while True:
             clear_terminal()
             control = input(
@@ -680,28 +3654,23 @@ def operator_operations(operators, active_operator,program_path):
             clear_terminal()
             match control:
                 case "1":
-                    if active_operator.access_level >= 3:
-                        register_new_operator(operators)
-                        save_to_csv(f"{program_path}/operators.csv",operators)
+                    if service.can(active_operator, "register_operator"):
+                        register_new_operator(service, active_operator)
                     else:    
                         print("Access denied: low access level")
                     input("press Enter to continue...")
                 case "2":
-                    if active_operator.access_level >= 4:
+                    if service.can(active_operator, "remove_operator"):
                         operator_delete_id=input("Insert operator ID to delete:").strip()
-                        operator_index=search_index(operators,"operator_id",operator_delete_id)
-                        if operator_index != -1:
-                            operators.pop(operator_index)
-                            save_to_csv(f"{program_path}/operators.csv",operators)
-                        else:
-                            print(f"Operator not found")
+                        result = service.remove_operator(operator_delete_id, active_operator)
+                        if not result.ok:
+                            print(result.message)
                     else:
                         print("Access denied: low access level")
                     input("press Enter to continue...")
                 case "3":
-                    if active_operator.access_level >= 4:
-                        change_operator_level(operators)
-                        save_to_csv(f"{program_path}/operators.csv",operators)
+                    if service.can(active_operator, "change_operator_level"):
+                        change_operator_level(service, active_operator)
                     else:
                         print("Access denied: low access level")
                     input("press Enter to continue...")
@@ -709,7 +3678,7 @@ def operator_operations(operators, active_operator,program_path):
                     break
                 case "5":
                     print("You will now exit")
-                    exit()
+                    exit_program(service)
                 
                 case _:
                     print("Invalid option, try again.")
@@ -719,10 +3688,97 @@ def operator_operations(operators, active_operator,program_path):
         input("Press Enter to continue...")
 
 
+def show_report(service, rows: List[dict]) -> None:
+    if not rows:
+        print("Nothing to report yet.")
+        input("Press Enter to continue...")
+        return
+    print_report(rows)
+    file_name = input("Save as CSV (file name, empty to skip): ").strip()
+    if file_name:
+        file_path = os.path.join(service.program_path, file_name)
+        print(f"{write_report(rows, file_path)} rows saved to {file_path}")
+    input("Press Enter to continue...")
+
+
+def reports_menu(service, active_operator):
+    if not service.can(active_operator, "reports"):
+        print("Access denied, insufficient access level.")
+        input("Press Enter to continue...")
+        return
+    while True:
+        clear_terminal()
+        control = input(
+            "Which report?:\n"
+            "1-Monthly statement\n"
+            "2-Agency totals\n"
+            "3-Loan portfolio\n"
+            "4-Operator activity\n"
+            "5-Balance on a date\n"
+            "6-Loan debt by month\n"
+            "7-Loan payoff on a date\n"
+            "8-Return to main menu\n"
+        )
+        clear_terminal()
+        match control:
+            case "1":
+                acc_number = input("Insert account number: ").strip()
+                year = get_int("Year: ")
+                month = get_int("Month (1 to 12): ")
+                if not (1 <= month <= 12 and 1 <= year < 9999):
+                    print("Invalid month, try again.")
+                    input("Press Enter to continue...")
+                    continue
+                rows = service.statement(acc_number, year, month)
+                if not rows:
+                    print("Client not found.")
+                    input("Press Enter to continue...")
+                    continue
+                show_report(service, rows)
+            case "2":
+                show_report(service, service.agency_report())
+            case "3":
+                show_report(service, service.loan_portfolio())
+            case "4":
+                show_report(service, service.operator_report())
+            case "5":
+                acc_number = input("Insert account number: ").strip()
+                day = get_date("Date (YYYY-MM-DD): ")
+                as_of = service.balance_as_of(acc_number, day)
+                if as_of is None:
+                    print("Client not found.")
+                else:
+                    print(f"At the end of {day}: balance {format_money(as_of[0])}, debt {format_money(as_of[1])}")
+                input("Press Enter to continue...")
+            case "6":
+                acc_number = input("Insert account number: ").strip()
+                transaction_id = input("Insert the loan's transaction ID: ").strip()
+                rows = service.loan_debt_by_month(acc_number, transaction_id)
+                if not rows:
+                    print("Transaction not found.")
+                    input("Press Enter to continue...")
+                    continue
+                show_report(service, rows)
+            case "7":
+                acc_number = input("Insert account number: ").strip()
+                transaction_id = input("Insert the loan's transaction ID: ").strip()
+                day = get_date("Payoff date (YYYY-MM-DD): ")
+                quote = service.payoff_quote(acc_number, transaction_id, day)
+                print(quote.message)
+                if quote.ok and day > date.today():
+                    print(service.interest_quote(acc_number, transaction_id, date.today(), day).message)
+                input("Press Enter to continue...")
+            case "8":
+                break
+            case _:
+                print("Invalid option, try again.")
+                input("Press Enter to continue...")
+
+
 # ─────────────────────────────
 # Main menu
 # ─────────────────────────────
-def main_menu(clients, operators, transactions, program_path, active_operator):
+def main_menu(service, active_operator):
    
     while True:
         clear_terminal()
@@ -730,27 +3786,30 @@ def main_menu(clients, operators, transactions, program_path, active_operator):
             "What operation do you want to execute?:\n"
             "1-Access client data\n"
             "2-Access operator data\n"
-            "3-Log-off\n"
-            "4-Exit\n"
+            "3-Reports\n"
+            "4-Log-off\n"
+            "5-Exit\n"
         )
         clear_terminal()
         match control:
             case "1":
-                if active_operator.access_level >= 1:
-                    client_operations(clients, transactions, active_operator, program_path)
+                if service.can(active_operator, "client_data"):
+                    client_operations(service, active_operator)
                 else:
                     print("Access denied, call a superior")
                     input("Press Enter to continue...")
             case "2": 
-                if active_operator.access_level >= 1:
-                    operator_operations(operators, active_operator,program_path)
+                if service.can(active_operator, "client_data"):
+                    operator_operations(service, active_operator)
             case "3":
+                reports_menu(service, active_operator)
+            case "4":
                 print("Logging off...")
                 clear_terminal()
-                active_operator = operator_login(operators)
-            case "4":
+                active_operator = operator_login(service)
+            case "5":
                 print("You will now exit")
-                exit()
+                exit_program(service)
             case _:
                 print("Invalid command, try again")
                 input("Press Enter to continue...")
@@ -758,43 +3817,32 @@ def main_menu(clients, operators, transactions, program_path, active_operator):
 
 
 # ====== MAIN PROGRAM ======
-if getattr(sys, 'frozen', False):
-    program_path = os.path.dirname(sys.executable)
-else:
-    program_path = os.path.dirname(os.path.abspath(__file__))
-
-# Ensure CSVs exist
-if not os.path.exists(os.path.join(program_path, "operators.csv")):
-    csv_found=False
-    print("No operetors found, Please proced to register")
-    input("Press Enter to continue...")
-    emergency_op:list[Operator]=[]
+def main():
+    if getattr(sys, 'frozen', False):
+        program_path = os.path.dirname(sys.executable)
+    else:
+        program_path = os.path.dirname(os.path.abspath(__file__))
+    if os.name == "nt":
+        os.system("")  # once, so the Windows console honours the ANSI codes used by clear_terminal
+
+    start_metrics()
+    # Load data and update debts
+    service = BankService(program_path)
+
+    if not service.operators:
+        print("No operetors found, Please proced to register")
+        input("Press Enter to continue...")
+        clear_terminal()
+        register_new_operator(service)
+        input("Press Enter to continue ...")
+        active_operator = service.operators[0]
+    else:
+        # Operator login
+        active_operator = operator_login(service)
+        input("Press Enter to continue...")
     clear_terminal()
-    register_new_operator(emergency_op)
-    input("Press Enter to continue ...")
-    active_operator=emergency_op[0]
-else:
-    csv_found=True
-ensure_csv_exists(os.path.join(program_path, "operators.csv"), list(Operator.__dataclass_fields__.keys()))
-ensure_csv_exists(os.path.join(program_path, "clients.csv"), list(Client.__dataclass_fields__.keys()))
-ensure_csv_exists(os.path.join(program_path, "transactions.csv"), list(Transaction.__dataclass_fields__.keys()))
-
-
-
-# Load data
-operators: List[Operator] = load_operators(os.path.join(program_path, "operators.csv"))
-clients: List[Client] = load_clients(os.path.join(program_path, "clients.csv"))
-transactions: List[Transaction] = load_transactions(os.path.join(program_path, "transactions.csv"))
-if (csv_found == False ):
-    operators.append(active_operator)
-    save_to_csv(f"{program_path}/operators.csv",operators)
-# Update debts
-update_debt(clients, transactions, 0)
-
-# Operator login
-if csv_found == True:
-    active_operator = operator_login(operators)
-    input("Press Enter to continue...")
-clear_terminal()
-main_menu(clients, operators, transactions, program_path, active_operator)
+    main_menu(service, active_operator)
+
 
+if __name__ == "__main__":
+    main()
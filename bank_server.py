@@ -0,0 +1,173 @@
+"""
+Asyncio network front-end sharing one in-memory bank between many tellers.
+
+Clients talk newline-delimited JSON over TCP or a Unix socket. Each request
+is an object with an "op" and its arguments, plus an optional "id" that is
+echoed back:
+
+    {"id": 1, "op": "login", "operator_id": "00018", "password": "..."}
+    {"id": 2, "op": "deposit", "acc_number": "00000018", "amount": "100.50", "tag": "Payroll"}
+
+Operations: login, client_login, lookup, deposit, withdraw, loan, pay_loan,
+and payoff (what paying off loan transaction_id takes on date, YYYY-MM-DD,
+today when it is left out).
+Everything except login needs a logged-in operator on the connection.
+Replies carry ok, message and, when relevant, client and transaction.
+Money goes both ways as dollars; replies write it as text ("100.50") so
+no amount ever passes through a binary float.
+
+Service calls run on a pool of worker threads. BankService holds each
+account's lock for the whole operation, so requests on different accounts
+proceed in parallel and concurrent tellers never lose each other's updates.
+
+BANK_METRICS_PORT and the other BANK_METRICS settings of the application
+export latency and throughput metrics of the operations (see METRICS there).
+
+Usage: python bank_server.py [--host 127.0.0.1] [--port 8765] [--unix PATH] [--workers 4] [--data-dir PATH]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+
+import PythonApplication1 as bank
+
+
+def _to_json(result: bank.OperationResult, request_id) -> bytes:
+    reply = {"id": request_id, "ok": result.ok, "message": result.message}
+    if result.client is not None:
+        client = bank.to_row(result.client)
+        del client["client_password"]
+        reply["client"] = client
+    if result.transaction is not None:
+        reply["transaction"] = bank.to_row(result.transaction)
+    if result.operator is not None:
+        reply["operator"] = {"operator_id": result.operator.operator_id,
+                             "operator_name": result.operator.operator_name,
+                             "access_level": result.operator.access_level}
+    return (json.dumps(reply, default=str) + "\n").encode()
+
+
+class BankServer:
+    def __init__(self, service: bank.BankService, workers: int = 4):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ledger")
+        self.address = None  # bound (host, port) or socket path once serving
+
+    async def _run(self, function, *args) -> bank.OperationResult:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def dispatch(self, request: dict, session: dict) -> bank.OperationResult:
+        op = request.get("op")
+        if op == "login":
+            result = await self._run(self.service.operator_login,
+                                     str(request.get("operator_id", "")), str(request.get("password", "")))
+            if result.ok:
+                session["operator"] = result.operator
+            return result
+        operator = session.get("operator")
+        if operator is None:
+            return bank.OperationResult(False, "Log in first.")
+
+        acc_number = str(request.get("acc_number", ""))
+        match op:
+            case "client_login":
+                return await self._run(self.service.client_login, acc_number, str(request.get("password", "")))
+            case "lookup":
+                client = await self._run(self.service.find_client, str(request.get("query", acc_number)))
+                return bank.OperationResult(client is not None, "" if client else "Client not found.", client=client)
+            case "payoff":
+                try:
+                    day = date.fromisoformat(request["date"]) if request.get("date") else None
+                except (TypeError, ValueError):
+                    return bank.OperationResult(False, "Invalid date.")
+                return await self._run(self.service.payoff_quote, acc_number,
+                                       str(request.get("transaction_id", "")), day)
+        try:
+            amount = None if request.get("amount") is None else bank.to_cents(request["amount"])
+        except ValueError:
+            return bank.OperationResult(False, "Invalid amount.")
+        tag = str(request.get("tag", ""))
+        match op:
+            case "deposit":
+                return await self._run(self.service.deposit, acc_number, amount or 0, operator, tag)
+            case "withdraw":
+                return await self._run(self.service.withdraw, acc_number, amount or 0, operator, tag)
+            case "loan":
+                try:
+                    rate = float(request.get("interest_rate", 0.0))
+                except (TypeError, ValueError):
+                    return bank.OperationResult(False, "Invalid interest rate.")
+                return await self._run(self.service.loan, acc_number, amount or 0, rate, operator, tag)
+            case "pay_loan":
+                return await self._run(self.service.pay_loan, acc_number,
+                                       str(request.get("transaction_id", "")), amount, operator)
+        return bank.OperationResult(False, f"Unknown operation {op!r}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session: dict = {}
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    request = None
+                if not isinstance(request, dict):  # valid JSON can still be a list, a number...
+                    writer.write(_to_json(bank.OperationResult(False, "Malformed request."), None))
+                    continue
+                try:
+                    result = await self.dispatch(request, session)
+                except Exception as error:  # e.g. a failed journal or database write: fail this request only
+                    print(f"{request.get('op')!r} failed: {error!r}", file=sys.stderr)
+                    result = bank.OperationResult(False, f"Operation failed: {error}")
+                writer.write(_to_json(result, request.get("id")))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str | None = None,
+                    ready: asyncio.Event | None = None, stop: asyncio.Event | None = None) -> None:
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        stop = stop or asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows, or not on the main thread
+        self.address = server.sockets[0].getsockname()
+        async with server:
+            if ready:
+                ready.set()
+            await stop.wait()
+        await self._run(self.service.shutdown)
+        self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one shared bank to many tellers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=4, help="threads running bank operations")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(bank.__file__)),
+                        help="folder holding the bank data (defaults to the application folder)")
+    args = parser.parse_args()
+
+    bank.start_metrics()
+    server = BankServer(bank.BankService(args.data_dir), args.workers)
+    print(f"Serving on {args.unix or f'{args.host}:{args.port}'}")
+    asyncio.run(server.serve(args.host, args.port, args.unix))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Headless batch processing of deposits, withdrawals, loans and loan payments.
+
+Reads a CSV or JSONL file where every row/line has the fields:
+
+    operation       deposit | withdraw | loan | pay_loan | quote
+    acc_number      client account number
+    amount          amount of money in dollars (for pay_loan, empty pays the whole loan)
+    interest_rate   loan only
+    transaction_id  pay_loan and quote only, id of the loan
+    date            quote only, YYYY-MM-DD the payoff is quoted for (empty for today)
+    tag             optional transaction name
+    operator_id     optional, overrides --operator for that row
+
+quote changes nothing: its message says what paying the loan off on date
+takes, computed with calculate_loan_debt.
+
+Rows go through the same BankService calls and access rules as the teller
+screens, and the whole batch is persisted with a single flush at the end.
+
+Usage: python batch_processor.py operations.csv --operator 00001 [--report results.csv]
+"""
+from dataclasses import dataclass, astuple
+from datetime import date
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import PythonApplication1 as bank
+
+
+@dataclass
+class RowResult:
+    row: int  # line number in JSONL, data row number in CSV
+    operation: str
+    acc_number: str
+    status: str  # "ok" or "error"
+    message: str
+    transaction_id: str
+    balance: str  # dollars after the operation, empty when it was refused
+
+
+def read_operations(file_path: str):
+    """
+    Yield (number, row) from a .jsonl or .csv file: the line number in JSONL,
+    the data row number in CSV. A JSONL line that does not decode is yielded
+    as an OperationError to report, and one that is not an object as is.
+    """
+    with open(file_path, newline='', encoding="utf-8") as operations_file:
+        if file_path.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(operations_file, start=1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield number, bank.OperationError(f"Malformed JSON: {error.msg}")
+        else:
+            yield from enumerate(csv.DictReader(operations_file), start=1)
+
+
+def _text(row: dict, field_name: str) -> str:
+    value = row.get(field_name)
+    return "" if value is None else str(value).strip()
+
+
+def _amount(row: dict, field_name: str) -> bank.Cents:
+    try:
+        return bank.to_cents(_text(row, field_name))
+    except ValueError:
+        raise bank.OperationError(f"Invalid {field_name}: {row.get(field_name)!r}")
+
+
+def _rate(row: dict, field_name: str) -> float:
+    try:
+        return float(_text(row, field_name).replace(",", "."))
+    except ValueError:
+        raise bank.OperationError(f"Invalid {field_name}: {row.get(field_name)!r}")
+
+
+def _date(row: dict, field_name: str) -> date | None:
+    if not _text(row, field_name):
+        return None
+    try:
+        return date.fromisoformat(_text(row, field_name))
+    except ValueError:
+        raise bank.OperationError(f"Invalid {field_name}: {row.get(field_name)!r}")
+
+
+def apply_row(service: bank.BankService, row, default_operator: str) -> bank.OperationResult:
+    if isinstance(row, bank.OperationError):
+        return bank.OperationResult(False, str(row))
+    if not isinstance(row, dict):
+        return bank.OperationResult(False, f"Not an object of fields: {row!r}")
+    operation = _text(row, "operation").lower()
+    acc_number = _text(row, "acc_number")
+    operator_id = _text(row, "operator_id") or default_operator
+    operator_index = bank.search_index(service.operators, "operator_id", operator_id)
+    if operator_index == -1:
+        return bank.OperationResult(False, f"Unknown operator {operator_id!r}")
+    operator = service.operators[operator_index]
+    try:
+        match operation:
+            case "deposit":
+                return service.deposit(acc_number, _amount(row, "amount"), operator, _text(row, "tag"))
+            case "withdraw":
+                return service.withdraw(acc_number, _amount(row, "amount"), operator, _text(row, "tag"))
+            case "loan":
+                return service.loan(acc_number, _amount(row, "amount"), _rate(row, "interest_rate"),
+                                    operator, _text(row, "tag"))
+            case "pay_loan":
+                amount = _amount(row, "amount") if _text(row, "amount") else None
+                return service.pay_loan(acc_number, _text(row, "transaction_id"), amount, operator)
+            case "quote":
+                return service.payoff_quote(acc_number, _text(row, "transaction_id"), _date(row, "date"))
+            case _:
+                return bank.OperationResult(False, f"Unknown operation {operation!r}")
+    except bank.OperationError as error:
+        return bank.OperationResult(False, str(error))
+
+
+def process_batch(file_path: str, program_path: str, default_operator: str) -> list[RowResult]:
+    service = bank.BankService(program_path, autoflush=False)
+    results = []
+    for number, row in read_operations(file_path):
+        result = apply_row(service, row, default_operator)
+        fields = row if isinstance(row, dict) else {}
+        results.append(RowResult(
+            number,
+            _text(fields, "operation").lower(),
+            _text(fields, "acc_number"),
+            "ok" if result.ok else "error",
+            result.message,
+            result.transaction.Transaction_id if result.ok else "",
+            bank.money_text(result.client.balance) if result.ok else ""
+        ))
+    service.flush()  # one durable write for the whole batch
+    service.storage.close()
+    return results
+
+
+def write_report(results: list[RowResult], report_path: str | None) -> None:
+    report_file = open(report_path, mode="w", newline='', encoding="utf-8") if report_path else sys.stdout
+    try:
+        writer = csv.writer(report_file)
+        writer.writerow(RowResult.__dataclass_fields__.keys())
+        for result in results:
+            writer.writerow(astuple(result))
+    finally:
+        if report_path:
+            report_file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a file of bank operations without the terminal menus.")
+    parser.add_argument("operations", help="CSV or JSONL file of operations")
+    parser.add_argument("--operator", required=True, help="operator id the rows are applied as")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(bank.__file__)),
+                        help="folder holding the bank data (defaults to the application folder)")
+    parser.add_argument("--report", help="write per-row results to this CSV instead of stdout")
+    args = parser.parse_args()
+
+    bank.start_metrics()
+    start = time.perf_counter()
+    results = process_batch(args.operations, args.data_dir, args.operator)
+    elapsed = time.perf_counter() - start
+    write_report(results, args.report)
+
+    succeeded = sum(1 for result in results if result.status == "ok")
+    print(f"{len(results)} rows, {succeeded} applied, {len(results) - succeeded} rejected "
+          f"in {elapsed:.3f}s ({len(results) / elapsed if elapsed else 0:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the bank application. Run from the repository root, e.g. python -m benchmarks.bench_interest
+
+python -m benchmarks.suite times the main code paths on generated banks of several sizes and writes the results as
+JSON; python -m benchmarks.datagen generates such a bank on its own.
+"""
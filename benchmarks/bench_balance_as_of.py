@@ -0,0 +1,69 @@
+"""
+Point-in-time balances from monthly checkpoints against replaying the whole
+history of the account.
+
+Usage: python -m benchmarks.bench_balance_as_of [number_of_transactions] [accounts] [queries]
+"""
+from datetime import date, timedelta
+import argparse
+import random
+import time
+
+import PythonApplication1 as bank
+from benchmarks.bench_memory import make_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark balance_as_of over checkpoints.")
+    parser.add_argument("transactions", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("accounts", nargs="?", type=int, default=100, help="few accounts means long histories")
+    parser.add_argument("queries", nargs="?", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(8)
+    acc_numbers = [str(n).zfill(8) for n in range(args.accounts)]
+    transactions = make_transactions(args.transactions)
+    for transaction in transactions:
+        transaction.client_acc_number = rng.choice(acc_numbers)
+    transactions = bank.IndexedList(transactions, group_fields=("client_acc_number",), order_by="transaction_date")
+    clients = {
+        acc_number: bank.Client(acc_number, "Client", acc_number, "0001", date(2010, 1, 1), "",
+                                sum(map(bank.balance_effect, transactions.group("client_acc_number", acc_number))), 0)
+        for acc_number in acc_numbers
+    }
+    today = date.today()
+    queries = [(rng.choice(acc_numbers), today - timedelta(days=rng.randint(0, 3650))) for _ in range(args.queries)]
+    checkpoints = bank.BalanceCheckpoints()
+
+    start = time.perf_counter()
+    for acc_number in acc_numbers:
+        checkpoints.checkpoints(clients[acc_number], transactions.group("client_acc_number", acc_number))
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    answers = [checkpoints.balance_as_of(clients[acc_number], transactions.group("client_acc_number", acc_number), day)
+               for acc_number, day in queries]
+    checkpoint_time = (time.perf_counter() - start) / len(queries)
+
+    start = time.perf_counter()
+    replayed = []
+    for acc_number, day in queries:
+        loans: list[list] = []
+        history = [t for t in transactions.group("client_acc_number", acc_number) if t.transaction_date <= day]
+        balance = bank.replay_records(0, loans, history)
+        replayed.append((balance, sum(bank.calculate_loan_debt(bank.replace(loan, transaction_type="Loan",
+                                                                             amount=principal), day)
+                                      for loan, principal in loans)))
+    replay_time = (time.perf_counter() - start) / len(queries)
+
+    print(f"transactions: {len(transactions):,}, accounts: {args.accounts}, "
+          f"about {len(transactions) // args.accounts:,} records per account")
+    print(f"checkpoints for every account (once): {build_time * 1000:10.1f} ms")
+    print(f"balance_as_of from a checkpoint:      {checkpoint_time * 1e6:10.1f} us")
+    print(f"replaying the history instead:        {replay_time * 1e6:10.1f} us")
+    if answers != replayed:
+        print(f"MISMATCH in {sum(a != b for a, b in zip(answers, replayed))} answers")
+
+
+if __name__ == "__main__":
+    main()
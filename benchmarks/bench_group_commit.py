@@ -0,0 +1,72 @@
+"""
+Teller latency with every operation writing and fsyncing on its own against
+the GroupCommitWriter grouping the operations that arrive together into one
+write. Either way a deposit returns only once it is on disk.
+
+Several threads deposit into their own accounts; each deposit is timed from
+call to return.
+
+Usage: python -m benchmarks.bench_group_commit [threads] [operations_per_thread] [window]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import PythonApplication1 as bank
+from benchmarks.datagen import generate_bank
+
+
+def run(directory: str, window: float | None, threads: int, operations: int) -> tuple[list[float], float, int]:
+    """Per-deposit latencies, the total time, and how many writes it took; window None writes alone."""
+    service = bank.BankService(directory, storage=bank.CsvStorage(directory), autoflush=window is not None,
+                               commit_window=window or 0)
+    operator = next(operator for operator in service.operators if operator.access_level == 5)
+    accounts = [client.acc_number for client in list(service.clients)[:threads]]
+    journal_entries = service.storage.journal.entries
+    latencies: list[float] = []
+
+    def teller(acc_number):
+        mine = []
+        for _ in range(operations):
+            start = time.perf_counter()
+            service.deposit(acc_number, 100, operator)
+            if window is None:
+                service.flush()
+            mine.append(time.perf_counter() - start)
+        latencies.extend(mine)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=teller, args=(acc_number,)) for acc_number in accounts]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    total = time.perf_counter() - start
+    writes = service.storage.journal.entries - journal_entries
+    service.shutdown()
+    return latencies, total, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark group commit.")
+    parser.add_argument("threads", nargs="?", type=int, default=8)
+    parser.add_argument("operations", nargs="?", type=int, default=100)
+    parser.add_argument("window", nargs="?", type=float, default=bank.COMMIT_WINDOW)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = os.path.join(scratch, "bank")
+        generate_bank(directory, 10_000)
+        for label, window in (("one write per operation", None), (f"group commit (+{args.window * 1000:g} ms)", args.window)):
+            latencies, total, writes = run(directory, window, args.threads, args.operations)
+            latencies.sort()
+            print(f"{label:<26} median {statistics.median(latencies) * 1e6:8.1f} us, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:8.1f} us, "
+                  f"{len(latencies) / total:8.0f} ops/s, {writes} journal writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Single-transaction and per-account lookups on transactions.csv: the indexed
+mmap reader against scanning the whole file.
+
+Usage: python -m benchmarks.bench_history [number_of_transactions] [lookups]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import PythonApplication1 as bank
+from benchmarks.bench_memory import make_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed lookups in transactions.csv.")
+    parser.add_argument("transactions", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("lookups", nargs="?", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    transactions = make_transactions(args.transactions)
+    sample = rng.sample(transactions, min(args.lookups, len(transactions)))
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "transactions.csv")
+        bank.save_to_csv(file_path, transactions)
+        del transactions
+
+        start = time.perf_counter()
+        scanned = [t for t in bank.iter_transactions(file_path) if t.Transaction_id == sample[0].Transaction_id]
+        scan_time = time.perf_counter() - start
+
+        transaction_file = bank.TransactionFile(file_path)
+        start = time.perf_counter()
+        found = transaction_file.find(sample[0].Transaction_id)
+        build_time = time.perf_counter() - start
+        transaction_file.close()
+
+        transaction_file = bank.TransactionFile(file_path)
+        start = time.perf_counter()
+        transaction_file.find(sample[0].Transaction_id)
+        open_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        misses = sum(transaction_file.find(t.Transaction_id) != t for t in sample)
+        find_time = (time.perf_counter() - start) / len(sample)
+
+        start = time.perf_counter()
+        rows = sum(len(transaction_file.history(t.client_acc_number)) for t in sample)
+        history_time = (time.perf_counter() - start) / len(sample)
+        transaction_file.close()
+        index_mb = os.path.getsize(file_path + bank.INDEX_SUFFIX) / 2**20
+
+    print(f"transactions: {args.transactions:,}, lookups: {len(sample):,}")
+    print(f"full scan for one id:   {scan_time * 1000:10.1f} ms")
+    print(f"index build:            {build_time * 1000:10.1f} ms ({index_mb:.1f}MB sidecar)")
+    print(f"open existing index:    {open_time * 1000:10.3f} ms")
+    print(f"find by id:             {find_time * 1e6:10.1f} us")
+    print(f"account history:        {history_time * 1e6:10.1f} us ({rows / len(sample):.0f} rows)")
+    if misses or scanned != [found]:
+        print(f"MISMATCH: {misses} lookups returned the wrong row")
+
+
+if __name__ == "__main__":
+    main()
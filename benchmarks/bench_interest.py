@@ -0,0 +1,89 @@
+"""
+Compare the scalar calculate_loan_debt loop with accrue_loans_batch.
+
+Besides the random loans, every principal, rate and age (in months) a
+generated bank starts its loans with is included: round principals at short
+terms are where a debt lands exactly on a half cent. Both paths must give the
+exact compound_cents result for every loan; any difference fails the run.
+
+Usage: python -m benchmarks.bench_interest [number_of_loans]
+"""
+from datetime import date, timedelta
+import random
+import sys
+import time
+
+import PythonApplication1 as bank
+from benchmarks.datagen import HISTORY_DAYS, LOAN_AMOUNTS, LOAN_RATES
+
+
+def _loan(i: int, principal: int, rate: float, day: date, acc_number: str = "00000001") -> bank.Transaction:
+    return bank.Transaction(
+        transaction_type="Loan",
+        transaction_name="Loan",
+        transaction_date=day,
+        interest_rate=rate,
+        interest=0,
+        amount=principal,
+        operator_id="00001",
+        client_acc_number=acc_number,
+        Transaction_id=str(i).zfill(12),
+        original_amount=principal
+    )
+
+
+def make_loans(count: int, seed: int = 42) -> list[bank.Transaction]:
+    rng = random.Random(seed)
+    today = date.today()
+    return [_loan(i, rng.randint(10_000, 5_000_000), rng.choice((0.02, 0.05, 0.08, 0.12, 0.18)),
+                  today - timedelta(days=rng.randint(0, 3650)), str(rng.randint(0, 10**8 - 1)).zfill(8))
+            for i in range(count)]
+
+
+def datagen_loans(first_id: int) -> list[bank.Transaction]:
+    """One loan for every principal, rate and age in months that datagen gives a new loan."""
+    today = bank.month_key(date.today())
+    combinations = [(principal, rate, months) for principal in LOAN_AMOUNTS for rate in LOAN_RATES
+                    for months in range(HISTORY_DAYS // 28 + 1)]
+    return [_loan(first_id + i, principal, rate, bank.month_start(today - months))
+            for i, (principal, rate, months) in enumerate(combinations)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    loans = make_loans(count)
+    loans += datagen_loans(len(loans))
+    count = len(loans)
+    today = date.today()
+
+    start = time.perf_counter()
+    scalar = []
+    for loan in loans:
+        debt = bank.calculate_loan_debt(loan)
+        loan.interest = debt - loan.amount
+        scalar.append(debt)
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = bank.accrue_loans_batch(loans, today)
+    batch_time = time.perf_counter() - start
+
+    current_month = bank.month_key(today)
+    exact = [bank.compound_cents(loan.amount, loan.interest_rate, current_month - bank.month_key(loan.transaction_date))
+             for loan in loans]
+    mismatches = [(loan, a, b, c) for loan, a, b, c in zip(loans, scalar, batch, exact) if not a == b == c]
+    print(f"loans:          {count:,}")
+    print(f"numpy:          {'yes' if bank.np is not None else 'no (pure Python fallback)'}")
+    print(f"scalar loop:    {scalar_time:.3f}s ({count / scalar_time:,.0f} loans/s)")
+    print(f"batch accrual:  {batch_time:.3f}s ({count / batch_time:,.0f} loans/s)")
+    print(f"speedup:        {scalar_time / batch_time:.1f}x")
+    print(f"mismatches:     {len(mismatches)}")
+    if mismatches:
+        for loan, a, b, exact in mismatches[:10]:
+            print(f"  {loan.amount} cents at {loan.interest_rate} from {loan.transaction_date}: "
+                  f"scalar {a}, batch {b}, exact {exact}", file=sys.stderr)
+        sys.exit(f"{len(mismatches)} loans accrued to different cents")
+
+
+if __name__ == "__main__":
+    main()
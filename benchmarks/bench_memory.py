@@ -0,0 +1,82 @@
+"""
+Bytes per transaction for the different record representations.
+
+Compares a plain @dataclass (the original layout, with a __dict__ per
+instance), the slotted Transaction and the columnar TransactionTable.
+
+Usage: python -m benchmarks.bench_memory [number_of_transactions]
+"""
+from dataclasses import make_dataclass, fields, astuple
+from datetime import date, timedelta
+import gc
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+import PythonApplication1 as bank
+
+DictTransaction = make_dataclass(
+    "DictTransaction", [(field.name, field.type) for field in fields(bank.Transaction)]
+)
+
+
+def make_transactions(count: int, seed: int = 42) -> list[bank.Transaction]:
+    """A realistic mix: accounts, operators and tags shared between many rows."""
+    rng = random.Random(seed)
+    today = date.today()
+    accounts = [str(rng.randint(0, 10**8 - 1)).zfill(8) for _ in range(max(count // 50, 1))]
+    operators = [str(rng.randint(0, 10**5 - 1)).zfill(5) for _ in range(20)]
+    transactions = []
+    for _ in range(count):
+        kind = rng.choices(("Deposit", "Withdraw", "Loan", "Loan Payment"), (50, 35, 5, 10))[0]
+        amount = rng.randint(100, 500_000)  # cents
+        transactions.append(bank.Transaction(
+            kind,
+            kind,
+            today - timedelta(days=rng.randint(0, 3650)),
+            0.05 if kind.startswith("Loan") else 0.0,
+            0,
+            amount,
+            rng.choice(operators),
+            rng.choice(accounts),
+            str(rng.randint(0, 10**12 - 1)).zfill(12),
+            amount,
+        ))
+    return transactions
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    container = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del container
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as directory:
+        # every representation is built by parsing the same CSV, as at startup,
+        # so the field values it holds are counted too
+        file_path = os.path.join(directory, "transactions.csv")
+        bank.save_to_csv(file_path, make_transactions(count))
+        results = {
+            "dataclass with __dict__": measure(
+                lambda: [DictTransaction(*astuple(t)) for t in bank.iter_transactions(file_path)]
+            ),
+            "slotted dataclass": measure(lambda: bank.load_transactions(file_path)),
+            "TransactionTable": measure(lambda: bank.TransactionTable(bank.iter_transactions(file_path))),
+        }
+    print(f"transactions: {count:,}")
+    for name, size in results.items():
+        print(f"{name:<26} {size / count:8.1f} bytes/transaction")
+
+
+if __name__ == "__main__":
+    main()
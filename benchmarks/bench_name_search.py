@@ -0,0 +1,106 @@
+"""
+Client search by name: the NameIndex against scanning every client.
+
+Names are drawn from a few hundred first names and a large set of generated
+surnames, so some words are shared by thousands of clients and most by few.
+
+Usage: python -m benchmarks.bench_name_search [number_of_clients] [queries]
+"""
+from datetime import date
+import argparse
+import random
+import time
+
+import PythonApplication1 as bank
+
+SYLLABLES = ["ba", "ri", "son", "ma", "lo", "ne", "ka", "th", "an", "ez", "ov", "sk", "ja", "mi", "ton", "el",
+             "ar", "do", "ves", "li", "ch", "ur", "go", "pe", "ra", "til", "en", "us"]
+
+
+def make_clients(count: int, seed: int = 7) -> list[bank.Client]:
+    rng = random.Random(seed)
+    first_names = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+                          for _ in range(400)})
+    surnames = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+                for _ in range(max(count // 10, 1))]
+    return [bank.Client(str(i).zfill(12), f"{rng.choice(first_names)} {rng.choice(surnames)}", str(i).zfill(8),
+                        "0001", date(2015, 1, 1), "", 0, 0)
+            for i in range(count)]
+
+
+def with_typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]  # swap two letters
+
+
+def scan(clients: list[bank.Client], query: str, limit: int) -> list[bank.Client]:
+    words = bank.name_words(query)
+    found = []
+    for client in clients:
+        held = bank.name_words(client.client_name)
+        if all(any(w.startswith(word) for w in held) for word in words):
+            found.append(client)
+            if len(found) == limit:
+                break
+    return found
+
+
+def timed_queries(search, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark client search by name.")
+    parser.add_argument("clients", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("queries", nargs="?", type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    clients = bank.IndexedList(make_clients(args.clients), ("acc_number", "client_id"))
+    start = time.perf_counter()
+    index = bank.name_index(clients)
+    build_time = time.perf_counter() - start
+
+    names = [rng.choice(clients).client_name for _ in range(args.queries)]
+    surnames = [name.split()[1] for name in names]
+    kinds = {
+        "full name": names,
+        "surname": surnames,
+        "surname prefix": [surname[:4] for surname in surnames],
+        "first name (common)": [name.split()[0] for name in names],
+        "surname with a typo": [with_typo(surname, rng) for surname in surnames],
+    }
+    print(f"clients: {len(clients):,}, distinct words: {len(index.words):,}")
+    print(f"build the index (once):      {build_time * 1000:10.1f} ms")
+    for kind, queries in kinds.items():
+        page_time = timed_queries(lambda query: index.search(query), queries)
+        print(f"{kind + ':':<29}{page_time * 1e6:10.1f} us per page")
+    page_five = timed_queries(lambda query: index.search(query, 4 * bank.SEARCH_PAGE_SIZE), kinds["first name (common)"])
+    print(f"{'fifth page of a first name:':<29}{page_five * 1e6:10.1f} us")
+    scan_time = timed_queries(lambda query: scan(clients, query, bank.SEARCH_PAGE_SIZE), surnames[:20])
+    print(f"{'scan for a surname:':<29}{scan_time * 1e6:10.1f} us")
+
+    misses = sum(not any(client.client_name == name for client in index.search(name)) for name in names)
+    typo_misses = sum(not any(surname in client.client_name for client in index.search(query, 0, 50))
+                      for surname, query in zip(surnames, kinds["surname with a typo"]))
+    if misses:
+        print(f"MISMATCH: {misses} full names not found")
+    print(f"typos resolved: {1 - typo_misses / len(names):.1%}")
+
+    start = time.perf_counter()
+    for i in range(1_000):
+        clients.append(bank.Client("", f"New Client{i}", f"9{i:07}", "0001", date.today(), "", 0, 0))
+    append_time = (time.perf_counter() - start) / 1_000
+    start = time.perf_counter()
+    for client in clients[-100:]:
+        index.on_remove(client)  # the index's share of removing a client; the list rebuilds its own indexes
+    remove_time = (time.perf_counter() - start) / 100
+    print(f"register a client:           {append_time * 1e6:10.1f} us")
+    print(f"unindex a removed client:    {remove_time * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
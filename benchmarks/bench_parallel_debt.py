@@ -0,0 +1,64 @@
+"""
+Whole-book debt recalculation with 1, 2, 4 and 8 worker processes.
+
+Builds a synthetic book of clients spread over agencies with one or more
+loans each, then times accrue_loans_parallel (process start-up included)
+and checks every worker count gives exactly the single-process results.
+
+Usage: python -m benchmarks.bench_parallel_debt [number_of_loans] [number_of_agencies] [--shard-by agency|hash]
+"""
+from datetime import date
+import argparse
+import os
+import random
+import time
+
+import PythonApplication1 as bank
+from benchmarks.bench_interest import make_loans
+
+
+def make_book(loan_count: int, agencies: int, seed: int = 7) -> tuple[list[bank.Client], list[bank.Transaction]]:
+    rng = random.Random(seed)
+    loans = make_loans(loan_count, seed)
+    clients = {}
+    for loan in loans:
+        loan.client_acc_number = str(rng.randrange(max(loan_count // 3, 1))).zfill(8)
+        if loan.client_acc_number not in clients:
+            clients[loan.client_acc_number] = bank.Client(
+                client_id=loan.client_acc_number, client_name="Client", acc_number=loan.client_acc_number,
+                agency_number=str(rng.randrange(agencies)).zfill(4), creation_date=date(2020, 1, 1),
+                client_password="", balance=0, debt=0
+            )
+    return list(clients.values()), loans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded multi-process debt recalculation.")
+    parser.add_argument("loans", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("agencies", nargs="?", type=int, default=200)
+    parser.add_argument("--shard-by", choices=("agency", "hash"), default="agency")
+    args = parser.parse_args()
+
+    clients, loans = make_book(args.loans, args.agencies)
+    today = date.today()
+    print(f"loans: {len(loans):,}, clients: {len(clients):,}, agencies: {args.agencies}, "
+          f"shard by: {args.shard_by}, cores: {os.cpu_count()}, "
+          f"numpy: {'yes' if bank.np is not None else 'no'}")
+
+    baseline = None
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        debts = bank.accrue_loans_parallel(loans, clients, workers, today, args.shard_by)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = (debts, elapsed)
+        mismatches = sum(1 for a, b in zip(baseline[0], debts) if a != b)
+        not_cents = sum(1 for debt in debts if type(debt) is not int)  # 12345.0 == 12345, so == alone misses floats
+        not_cents += sum(1 for loan in loans if type(loan.interest) is not int)
+        print(f"workers {workers}: {elapsed:.3f}s ({len(loans) / elapsed:,.0f} loans/s), "
+              f"speedup {baseline[1] / elapsed:.2f}x, mismatches {mismatches}"
+              f"{f', NOT WHOLE CENTS {not_cents}' if not_cents else ''}")
+
+
+if __name__ == "__main__":
+    main()
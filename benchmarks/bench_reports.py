@@ -0,0 +1,91 @@
+"""
+Reports from ReportBook's running totals against rescanning every transaction.
+
+Usage: python -m benchmarks.bench_reports [number_of_transactions]
+"""
+from datetime import date
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import PythonApplication1 as bank
+from benchmarks.bench_memory import make_transactions
+
+
+def scan_agency_totals(clients: list[bank.Client], transactions: list[bank.Transaction]) -> dict:
+    """What agency_report() reads from the book, computed the slow way."""
+    agency_of = {client.acc_number: client.agency_number for client in clients}
+    totals: dict[tuple[str, str], list[int]] = {}
+    for transaction in transactions:
+        kind = bank.REPORT_KINDS.get(transaction.transaction_type.lower(), "other")
+        entry = totals.setdefault((agency_of.get(transaction.client_acc_number, ""), kind), [0, 0])
+        entry[0] += 1
+        entry[1] += abs(bank.balance_effect(transaction))
+    return totals
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the reporting engine.")
+    parser.add_argument("transactions", nargs="?", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    transactions = bank.IndexedList(make_transactions(args.transactions),
+                                    group_fields=("client_acc_number",), order_by="transaction_date")
+    clients = bank.IndexedList([
+        bank.Client(acc_number, "Client", acc_number, str(rng.randrange(50)).zfill(4), date(2015, 1, 1), "", 0, 0)
+        for acc_number in sorted({transaction.client_acc_number for transaction in transactions})
+    ], index_fields=("acc_number",))
+    operators = [bank.Operator(operator_id, "", "Operator", 1)
+                 for operator_id in sorted({transaction.operator_id for transaction in transactions})]
+    engine = bank.DebtEngine(clients, transactions)
+
+    build_time, book = timed(bank.ReportBook, clients, transactions)
+    transactions.listeners.append(book)
+    scan_time, scanned = timed(scan_agency_totals, clients, transactions)
+    agency_time, agency_rows = timed(lambda: list(bank.agency_report(book, clients)))
+    operator_time, _ = timed(lambda: list(bank.operator_report(book, operators)))
+    portfolio_time, _ = timed(lambda: list(bank.loan_portfolio(book, engine)))
+    client = clients[0]
+    history = bank.client_transactions(transactions, client.acc_number)
+    day = history[-1].transaction_date
+    statement_time, _ = timed(lambda: list(bank.monthly_statement(
+        client, history, book.monthly[client.acc_number], day.year, day.month)))
+    with tempfile.TemporaryDirectory() as directory:
+        export_time, _ = timed(bank.write_report, bank.agency_report(book, clients), os.path.join(directory, "a.csv"))
+
+    before_appends = {key: list(value) for key, value in book.by_agency.items()}
+    append_start = time.perf_counter()
+    for transaction in make_transactions(10_000, seed=11):
+        transaction.client_acc_number = rng.choice(clients).acc_number
+        transactions.append(transaction)
+    append_time = (time.perf_counter() - append_start) / 10_000
+
+    def nonzero(totals):
+        return {key: value for key, value in totals.items() if value != [0, 0]}
+
+    print(f"transactions: {len(transactions):,}, clients: {len(clients):,}, agencies: {len(agency_rows)}")
+    print(f"build ReportBook (once): {build_time * 1000:10.1f} ms")
+    print(f"rescan for agency totals:{scan_time * 1000:10.1f} ms")
+    print(f"agency report:          {agency_time * 1000:10.3f} ms")
+    print(f"operator report:        {operator_time * 1000:10.3f} ms")
+    print(f"loan portfolio:         {portfolio_time * 1000:10.3f} ms")
+    print(f"monthly statement:      {statement_time * 1000:10.3f} ms")
+    print(f"agency report to CSV:   {export_time * 1000:10.3f} ms")
+    print(f"append with listeners:  {append_time * 1e6:10.1f} us")
+    if nonzero(scanned) != nonzero(before_appends):
+        print("MISMATCH between the book and the rescan")
+    if nonzero(scan_agency_totals(clients, transactions)) != nonzero(book.by_agency):
+        print("MISMATCH after appends")
+
+
+if __name__ == "__main__":
+    main()
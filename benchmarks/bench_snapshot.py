@@ -0,0 +1,68 @@
+"""
+Startup time from the CSVs against startup from bank.snapshot.
+
+For every size a bank is generated into a temporary folder, then started
+twice: once parsing the CSVs, after which a snapshot is taken, and once from
+the snapshot, reusing the debts cached in it. 10M transactions needs several GB
+of memory.
+
+Usage: python -m benchmarks.bench_snapshot [sizes ...]
+"""
+from datetime import date
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+
+import PythonApplication1 as bank
+from benchmarks.bench_memory import make_transactions
+
+
+def make_bank(directory: str, count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    transactions = make_transactions(count, seed)
+    clients = [
+        bank.Client(client_id=acc_number.zfill(12), client_name=f"Client {acc_number}", acc_number=acc_number,
+                    agency_number=str(rng.randrange(200)).zfill(4), creation_date=date(2015, 1, 1),
+                    client_password="pw", balance=rng.randint(0, 10**7), debt=0)
+        for acc_number in sorted({transaction.client_acc_number for transaction in transactions})
+    ]
+    bank.save_to_csv(os.path.join(directory, "operators.csv"), [bank.Operator("00001", "pw", "Bench", 5)])
+    bank.save_to_csv(os.path.join(directory, "clients.csv"), clients)
+    bank.save_to_csv(os.path.join(directory, "transactions.csv"), transactions)
+
+
+def startup(directory: str) -> tuple[float, bank.BankService]:
+    gc.collect()
+    start = time.perf_counter()
+    service = bank.BankService(directory, storage=bank.CsvStorage(directory, working_set_days=None))
+    return time.perf_counter() - start, service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV against snapshot startup.")
+    parser.add_argument("sizes", nargs="*", type=int, default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'transactions':>12} {'csv':>9} {'snapshot':>9} {'speedup':>8} {'file':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            make_bank(directory, size)
+            csv_time, service = startup(directory)
+            rows = len(service.transactions)
+            service.snapshot()  # taken once the debts are accrued, so the next start reuses them
+            service.storage.close()
+            del service
+            snapshot_time, service = startup(directory)
+            assert len(service.transactions) == rows, (len(service.transactions), rows)
+            service.storage.close()
+            del service
+            size_mb = os.path.getsize(os.path.join(directory, bank.SNAPSHOT_FILE)) / 2**20
+        print(f"{rows:>12,} {csv_time:>8.2f}s {snapshot_time:>8.2f}s {csv_time / snapshot_time:>7.1f}x "
+              f"{size_mb:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
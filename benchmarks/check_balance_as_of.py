@@ -0,0 +1,86 @@
+"""
+Checks that point-in-time balances replay loan payments onto the loan they
+actually paid. First a hand-built account with two loans that share name,
+rate and original amount but not their date, the newer one paid off, with
+the payment recorded by apply_loan_payment and once more as a legacy record
+without loan_id. Then every account of a generated bank, whose balance and
+debt as of today must equal the live client. Exits with status 1 on any
+difference.
+
+Usage: python -m benchmarks.check_balance_as_of [--transactions 20k]
+"""
+from datetime import date
+import argparse
+import os
+import sys
+import tempfile
+
+import PythonApplication1 as bank
+from benchmarks.datagen import generate_bank, parse_count
+
+
+def _loan(transaction_id: str, day: date) -> bank.Transaction:
+    return bank.Transaction("Loan", "Car", day, 0.12, 0, 100_000, "00001", "00000001", transaction_id, 100_000)
+
+
+def check_same_key_loans() -> list[str]:
+    today = date.today()
+    older = _loan("000000000017", bank.month_start(bank.month_key(today) - 14))
+    newer = _loan("000000000025", bank.month_start(bank.month_key(today) - 2))
+    for loan in (older, newer):  # this month's interest, as the DebtEngine keeps it
+        loan.interest = bank.calculate_loan_debt(loan, today) - loan.amount
+    deposit = bank.Transaction("Deposit", "Deposit", older.transaction_date, 0.0, 0, 500_000, "00001", "00000001",
+                               "000000000033", 500_000)
+    transactions = bank.IndexedList([deposit, older, newer], ("Transaction_id",))
+    client = bank.Client("00000000001", "Client", "00000001", "0001", deposit.transaction_date, "", 700_000, 0)
+    with tempfile.TemporaryDirectory() as scratch:
+        payment = bank.apply_loan_payment([client], transactions, client.acc_number, newer.Transaction_id,
+                                          bank.calculate_loan_debt(newer, today), "00001", scratch)
+    problems = []
+    if payment.loan_id != newer.Transaction_id:
+        problems.append(f"payment names loan {payment.loan_id!r}, not {newer.Transaction_id}")
+    history = sorted(transactions, key=lambda t: t.transaction_date)
+    live = (client.balance, bank.calculate_loan_debt(older, today))
+    replayed = bank.BalanceCheckpoints().balance_as_of(client, history, today)
+    if replayed != live:
+        problems.append(f"two same-key loans: balance_as_of gives {replayed}, live {live}")
+
+    # a record from before loan_id still goes to the oldest matching loan
+    legacy = [bank.replace(t, loan_id="") if t is payment else t for t in history]
+    legacy_loans: list[list] = []
+    bank.replay_records(0, legacy_loans, legacy)
+    expected = [(older.Transaction_id, older.original_amount - payment.amount),
+                (newer.Transaction_id, newer.original_amount)]
+    if [(loan.Transaction_id, principal) for loan, principal in legacy_loans] != expected:
+        problems.append("legacy payment without loan_id did not go to the oldest matching loan")
+    return problems
+
+
+def check_generated_bank(transactions: int) -> list[str]:
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = os.path.join(scratch, "bank")
+        generate_bank(directory, transactions)
+        service = bank.BankService(directory, storage=bank.CsvStorage(directory, working_set_days=None))
+        today = date.today()
+        problems = [f"account {client.acc_number}: balance_as_of gives {answer}, "
+                    f"live {(client.balance, client.debt)}"
+                    for client in list(service.clients)
+                    if (answer := service.balance_as_of(client.acc_number, today)) != (client.balance, client.debt)]
+        service.shutdown()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check balance_as_of against live balances and debts.")
+    parser.add_argument("--transactions", type=parse_count, default=20_000)
+    args = parser.parse_args()
+
+    problems = check_same_key_loans() + check_generated_bank(args.transactions)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    print("consistent" if not problems else f"{len(problems)} inconsistencies")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
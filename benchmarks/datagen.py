@@ -0,0 +1,191 @@
+"""
+Synthetic bank data: operators.csv, clients.csv and transactions.csv in the
+application's own file format.
+
+Each account gets a chronological history over the last ten years with a
+realistic mix: deposits, withdrawals that never overdraw, loans at different
+rates, and loan payments, some partial and some settling the loan, which then
+becomes a "Paid Loan". Balances, loan principals and debts are consistent
+with the records, so the application loads the data as if it had written it.
+Rows are written one account at a time, so 10M transactions do not have to
+fit in memory.
+
+Usage: python -m benchmarks.datagen DIRECTORY [--transactions 100k] [--seed 42]
+"""
+from dataclasses import fields
+from datetime import date, timedelta
+from operator import attrgetter
+import argparse
+import csv
+import os
+import random
+
+import PythonApplication1 as bank
+
+FIRST_NAMES = ["Ana", "João", "Maria", "José", "Pedro", "Paula", "Lucas", "Julia", "Marcos", "Fernanda", "Rafael",
+               "Beatriz", "Carlos", "Camila", "Daniel", "Larissa", "Eduardo", "Mariana", "Felipe", "Gabriela",
+               "Gustavo", "Helena", "Igor", "Isabela", "Leonardo", "Letícia", "Mateus", "Natália", "Otávio",
+               "Renata", "Samuel", "Tatiana", "Vinícius", "Yasmin", "John", "Emma", "Liam", "Olivia", "Noah", "Ava"]
+SURNAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+            "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira",
+            "Barbosa", "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado",
+            "Mendes", "Freitas", "Cardoso", "Ramos", "Gonçalves", "Santana", "Teixeira", "Smith", "Johnson",
+            "Brown", "Müller", "O'Connor"]
+KINDS = ("Deposit", "Withdraw", "Loan", "Loan Payment")
+KIND_WEIGHTS = (45, 35, 6, 14)
+LOAN_RATES = (0.03, 0.05, 0.08, 0.12, 0.18, 0.24)  # annual
+LOAN_AMOUNTS = (50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000)  # cents
+HISTORY_DAYS = 3650
+AGENCIES = 200
+OPERATORS = 20
+TRANSACTIONS_PER_ACCOUNT = 50
+_FIELD_NAMES = [field.name for field in fields(bank.Transaction)]
+_CENTS_FIELDS = [field.type is bank.Cents for field in fields(bank.Transaction)]
+_field_values = attrgetter(*_FIELD_NAMES)
+
+
+def parse_count(text: str) -> int:
+    """A count such as 1000, 1k, 100k or 10M."""
+    text = text.strip().lower().replace("_", "")
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def _unique_number(i: int, digits: int) -> str:
+    """The i-th of a scrambled sequence of distinct numbers of the given width."""
+    modulus = 10 ** digits
+    return str((i * 7_919_393 + 104_729) % modulus).zfill(digits)  # 7919393 is coprime with 10
+
+
+def _row(transaction: bank.Transaction) -> list:
+    """The row save_to_csv() would write for transaction."""
+    return [bank.money_text(value) if cents else value
+            for value, cents in zip(_field_values(transaction), _CENTS_FIELDS)]
+
+
+def _account_counts(rng: random.Random, transactions: int, accounts: int) -> list[int]:
+    """Split transactions over accounts unevenly: a few busy accounts and many quiet ones."""
+    weights = [rng.paretovariate(1.5) for _ in range(accounts)]
+    scale = transactions / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for i in rng.sample(range(accounts), transactions - sum(counts)):
+        counts[i] += 1
+    return counts
+
+
+def account_history(rng: random.Random, acc_number: str, operator_ids: list[str], count: int,
+                    first_id: int, today: date) -> tuple[list[bank.Transaction], bank.Cents, bank.Cents]:
+    """count transactions of one account, oldest first, with the balance and debt they leave."""
+    start = today - timedelta(days=HISTORY_DAYS)
+    days = sorted(start + timedelta(days=rng.randrange(HISTORY_DAYS + 1)) for _ in range(count))
+    history: list[bank.Transaction] = []
+    open_loans: list[bank.Transaction] = []
+    balance = 0
+    for number, day in enumerate(days):
+        kind = rng.choices(KINDS, KIND_WEIGHTS)[0]
+        rate, original, name, loan_id = 0.0, None, None, ""
+        if kind == "Loan Payment":
+            loan = rng.choice(open_loans) if open_loans and balance > 0 else None
+            if loan is None:
+                kind = "Deposit"
+            else:
+                debt = bank.calculate_loan_debt(loan, day)
+                if debt <= balance and rng.random() < 0.4:
+                    amount = debt
+                    loan.transaction_type = "Paid Loan"
+                    open_loans.remove(loan)
+                elif loan.amount > 1:
+                    amount = rng.randint(1, min(balance, loan.amount - 1))
+                    loan.amount -= amount
+                else:
+                    kind = "Deposit"
+                if kind == "Loan Payment":
+                    rate, original, name = loan.interest_rate, loan.original_amount, loan.transaction_name
+                    loan_id = loan.Transaction_id
+        if kind == "Withdraw" and balance < 100:
+            kind = "Deposit"
+        if kind == "Deposit":
+            amount = rng.randint(1_000, 500_000)
+        elif kind == "Withdraw":
+            amount = rng.randint(1, min(balance, 300_000))
+        elif kind == "Loan":
+            amount = rng.choice(LOAN_AMOUNTS)
+            rate = rng.choice(LOAN_RATES)
+        transaction = bank.Transaction(
+            transaction_type=kind,
+            transaction_name=name or rng.choice((kind, kind, "Salary", "Rent", "Car", "House", "Groceries")),
+            transaction_date=day,
+            interest_rate=rate,
+            interest=0,
+            amount=amount,
+            operator_id=rng.choice(operator_ids),
+            client_acc_number=acc_number,
+            Transaction_id=_unique_number(first_id + number, 12),
+            original_amount=amount if original is None else original,
+            loan_id=loan_id,
+        )
+        history.append(transaction)
+        if kind == "Loan":
+            open_loans.append(transaction)
+        balance += bank.balance_effect(transaction)
+    debt = 0
+    for loan in open_loans:
+        loan_debt = bank.calculate_loan_debt(loan, today)
+        loan.interest = loan_debt - loan.amount
+        debt += loan_debt
+    return history, balance, debt
+
+
+def generate_bank(directory: str, transactions: int, seed: int = 42,
+                  accounts: int | None = None) -> dict[str, int]:
+    """Write a bank with about transactions transactions into directory; returns how many rows of each."""
+    rng = random.Random(seed)
+    today = date.today()
+    accounts = accounts or max(transactions // TRANSACTIONS_PER_ACCOUNT, 1)
+    os.makedirs(directory, exist_ok=True)
+
+    operators = [bank.Operator(_unique_number(i, 5), "pw", f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}",
+                               5 if i == 0 else rng.choice((1, 1, 2, 2, 3, 4)))
+                 for i in range(OPERATORS)]
+    bank.save_to_csv(os.path.join(directory, "operators.csv"), operators)
+    operator_ids = [operator.operator_id for operator in operators]
+
+    clients = []
+    first_id = 0
+    with open(os.path.join(directory, "transactions.csv"), "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(_FIELD_NAMES)
+        for i, count in enumerate(_account_counts(rng, transactions, accounts)):
+            acc_number = _unique_number(i, 8)
+            history, balance, debt = account_history(rng, acc_number, operator_ids, count, first_id, today)
+            first_id += count
+            writer.writerows(map(_row, history))
+            opened = history[0].transaction_date if history else today
+            clients.append(bank.Client(
+                client_id=_unique_number(i, 11),
+                client_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}",
+                acc_number=acc_number,
+                agency_number=str(rng.randrange(AGENCIES)).zfill(4),
+                creation_date=opened - timedelta(days=rng.randrange(30)),
+                client_password="pw",
+                balance=balance,
+                debt=debt,
+            ))
+    bank.save_to_csv(os.path.join(directory, "clients.csv"), clients)
+    return {"operators": len(operators), "clients": len(clients), "transactions": first_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic bank.")
+    parser.add_argument("directory")
+    parser.add_argument("--transactions", type=parse_count, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    counts = generate_bank(args.directory, args.transactions, args.seed)
+    print(", ".join(f"{count:,} {name}" for name, count in counts.items()), "written to", args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Load test for bank_server.py: many concurrent tellers, throughput and latency.
+
+By default it starts a server on a throwaway bank with generated clients.
+Pass --host/--port (or --unix) together with --operator, --password and
+--accounts to drive a server that is already running instead.
+
+Usage: python -m benchmarks.load_test [--tellers 32] [--requests 200] [--accounts-count 100]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+
+import PythonApplication1 as bank
+from bank_server import BankServer
+
+
+async def teller(open_connection, operator_id: str, password: str, accounts: list[str], requests: int,
+                 latencies: list[float], failures: list[str], seed: int) -> None:
+    rng = random.Random(seed)
+    reader, writer = await open_connection()
+
+    async def call(request: dict) -> dict:
+        start = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        return reply
+
+    login = await call({"op": "login", "operator_id": operator_id, "password": password})
+    if not login["ok"]:
+        raise RuntimeError(login["message"])
+    for number in range(requests):
+        acc_number = rng.choice(accounts)
+        op = rng.choices(("deposit", "withdraw", "lookup"), (50, 30, 20))[0]
+        request = {"id": number, "op": op, "acc_number": acc_number, "amount": round(rng.uniform(1, 100), 2)}
+        reply = await call(request)
+        if not reply["ok"] and reply["message"] != "Insufficient funds.":
+            failures.append(reply["message"])
+    writer.close()
+
+
+def make_bank(directory: str, accounts: int) -> tuple[bank.BankService, str, str, list[str]]:
+    service = bank.BankService(directory)
+    operator = service.register_operator("load", "Load Test", 5).operator
+    acc_numbers = [
+        service.create_client(str(i), f"Client {i}", "0001", "pw", operator).client.acc_number
+        for i in range(accounts)
+    ]
+    return service, operator.operator_id, "load", acc_numbers
+
+
+async def run(args) -> None:
+    stop = asyncio.Event()
+    server_task = None
+    with tempfile.TemporaryDirectory() as directory:
+        if args.operator:
+            accounts = args.accounts.split(",")
+            operator_id, password = args.operator, args.password
+            host, port = args.host, args.port
+        else:
+            service, operator_id, password, accounts = make_bank(directory, args.accounts_count)
+            server = BankServer(service)
+            ready = asyncio.Event()
+            server_task = asyncio.create_task(server.serve(args.host, 0, args.unix, ready=ready, stop=stop))
+            await ready.wait()
+            if not args.unix:
+                host, port = server.address[:2]
+        if args.unix:
+            open_connection = lambda: asyncio.open_unix_connection(args.unix)
+        else:
+            open_connection = lambda: asyncio.open_connection(host, port)
+
+        latencies: list[float] = []
+        failures: list[str] = []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            teller(open_connection, operator_id, password, accounts, args.requests, latencies, failures, seed)
+            for seed in range(args.tellers)
+        ))
+        elapsed = time.perf_counter() - start
+        if server_task:
+            stop.set()
+            await server_task
+
+    latencies.sort()
+    print(f"tellers: {args.tellers}, requests: {len(latencies):,} in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} ops/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+    print(f"unexpected failures: {len(failures)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the bank server.")
+    parser.add_argument("--tellers", type=int, default=32, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=200, help="requests per teller")
+    parser.add_argument("--accounts-count", type=int, default=100, help="clients in the generated bank")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix")
+    parser.add_argument("--operator", help="operator id on an already running server")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--accounts", default="", help="comma separated account numbers to use")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Stress test for the thread-safe ledger: worker threads hammer a small set of
+accounts with deposits, withdrawals, loans and loan payments, then every
+balance is checked against the account's transaction records, in memory and
+after reloading from storage. A second phase has every thread drain the same
+account at once, which overdraws it if a withdrawal's check and debit are
+not atomic. Exits with status 1 on any inconsistency.
+
+Usage: python -m benchmarks.stress_ledger [--threads 8] [--operations 20000] [--accounts 16]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+import PythonApplication1 as bank
+
+# money moved by each transaction type, seen from the client's balance
+BALANCE_EFFECT = {"deposit": 1, "loan": 1, "paid loan": 1, "withdraw": -1, "loan payment": -1}
+
+
+def worker(service: bank.BankService, operator: bank.Operator, accounts: list[str], operations: int,
+           seed: int) -> int:
+    rng = random.Random(seed)
+    succeeded = 0
+    for _ in range(operations):
+        acc_number = rng.choice(accounts)
+        amount = rng.randint(100, 50_000)  # cents
+        match rng.choices(("deposit", "withdraw", "loan", "pay_loan"), (40, 35, 5, 20))[0]:
+            case "deposit":
+                result = service.deposit(acc_number, amount, operator)
+            case "withdraw":
+                result = service.withdraw(acc_number, amount, operator)
+            case "loan":
+                result = service.loan(acc_number, amount, 0.05, operator)
+            case "pay_loan":
+                loans = [t for t in bank.client_transactions(service.transactions, acc_number) if bank.is_open_loan(t)]
+                if not loans:
+                    continue
+                result = service.pay_loan(acc_number, rng.choice(loans).Transaction_id,
+                                          None if rng.random() < 0.5 else amount // 10, operator)
+        succeeded += result.ok
+    return succeeded
+
+
+def drain(service: bank.BankService, operator: bank.Operator, acc_number: str, amount: bank.Cents) -> int:
+    withdrawn = 0
+    while service.withdraw(acc_number, amount, operator).ok:
+        withdrawn += 1
+    return withdrawn
+
+
+def check(service: bank.BankService, expected_transactions: int) -> list[str]:
+    problems = []
+    ids = [transaction.Transaction_id for transaction in service.transactions]
+    if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} duplicated transaction ids")
+    if len(ids) != expected_transactions:
+        problems.append(f"{len(ids)} transactions recorded, {expected_transactions} expected")
+    for client in service.clients:
+        history = bank.client_transactions(service.transactions, client.acc_number)
+        # a paid loan still counts its original amount; the payments are separate records
+        expected = sum(BALANCE_EFFECT[t.transaction_type.lower()] *
+                       (t.original_amount if t.transaction_type.lower() in ("loan", "paid loan") else t.amount)
+                       for t in history)
+        if client.balance != expected:
+            problems.append(f"{client.acc_number}: balance {bank.format_money(client.balance)}, "
+                            f"transactions add up to {bank.format_money(expected)}")
+        if client.balance < 0:
+            problems.append(f"{client.acc_number}: negative balance {bank.format_money(client.balance)}")
+        debt = sum(bank.calculate_loan_debt(t) for t in history if bank.is_open_loan(t))
+        if client.debt != debt:
+            problems.append(f"{client.acc_number}: debt {bank.format_money(client.debt)}, "
+                            f"open loans add up to {bank.format_money(debt)}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency stress test of the ledger.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=20_000, help="operations per thread")
+    parser.add_argument("--accounts", type=int, default=16, help="few accounts means heavy contention")
+    parser.add_argument("--autoflush", action="store_true", help="persist every operation instead of once")
+    args = parser.parse_args()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible to surface races
+
+    with tempfile.TemporaryDirectory() as directory:
+        service = bank.BankService(directory, storage=bank.CsvStorage(directory), autoflush=args.autoflush)
+        operator = service.register_operator("stress", "Stress", 5).operator
+        accounts = [service.create_client(str(i), f"Client {i}", "0001", "pw", operator).client.acc_number
+                    for i in range(args.accounts)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            succeeded = sum(pool.map(
+                lambda seed: worker(service, operator, accounts, args.operations, seed), range(args.threads)
+            ))
+        elapsed = time.perf_counter() - start
+        applied = succeeded
+
+        target = accounts[0]
+        service.deposit(target, 100_000, operator)
+        funds = service.clients[bank.search_index(service.clients, "acc_number", target)].balance
+        with ThreadPoolExecutor(args.threads) as pool:
+            withdrawn = sum(pool.map(lambda _: drain(service, operator, target, 100), range(args.threads)))
+        succeeded += 1 + withdrawn
+        service.flush()
+        # partial payments leave one record, full payments too, so every success is one transaction
+        problems = check(service, succeeded)
+        if withdrawn != funds // 100:
+            problems.append(f"drained {withdrawn} withdrawals of $1.00 from a balance of {bank.format_money(funds)}")
+
+        balances = {client.acc_number: client.balance for client in service.clients}
+        service.storage.close()
+        reloaded = bank.BankService(directory, storage=bank.CsvStorage(directory))
+        for client in reloaded.clients:
+            if balances[client.acc_number] != client.balance:
+                problems.append(f"{client.acc_number}: reloaded balance {bank.format_money(client.balance)}, "
+                                f"in memory {bank.format_money(balances[client.acc_number])}")
+        reloaded.storage.close()
+
+    print(f"{args.threads} threads, {applied:,} operations applied in {elapsed:.2f}s "
+          f"({applied / elapsed:,.0f} ops/s)")
+    for problem in problems[:20]:
+        print("INCONSISTENT", problem)
+    print("consistent" if not problems else f"{len(problems)} problems")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
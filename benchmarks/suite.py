@@ -0,0 +1,236 @@
+"""
+Benchmark suite: times the application's real code paths on generated banks
+of several sizes and writes the results as JSON, so runs of different
+versions can be compared.
+
+For every scale a bank is generated with benchmarks.datagen (kept in --data
+when given, so later runs reuse it), then timed:
+- load_operators, load_clients, load_transactions
+- the Repository indexes and update_debt, cold and warm
+- search_client by account number, client ID and name
+- generate_unique_transaction_id and save_to_csv
+- BankService startup and the do_deposit, do_withdraw, do_loan and pay_loan
+  screens, driven with scripted answers instead of a terminal, on a copy
+  of the bank
+
+Each measurement is repeated and the best run kept. 10M transactions needs
+several GB of memory and a good while.
+
+--compare prints every measurement against an earlier results file and exits
+with status 1 when any got slower by more than --threshold.
+
+Usage: python -m benchmarks.suite [--scales 1k 100k 10M] [--output results.json] [--compare baseline.json]
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import PythonApplication1 as bank
+from benchmarks.datagen import generate_bank, parse_count
+
+DEFAULT_SCALES = ["1k", "100k", "10M"]
+LOOKUPS = 1_000
+SCREEN_OPERATIONS = 100
+REGRESSION = 0.10  # default for --threshold
+
+
+def measure(function, repeat: int, operations: int = 1, setup=None) -> dict:
+    """Best and median of repeat timed runs of function(setup()) (or function()), per run and per operation."""
+    runs = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        function(argument) if setup else function()
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    return {"seconds": best, "median": statistics.median(runs), "runs": len(runs), "operations": operations,
+            "per_operation": best / operations}
+
+
+@contextmanager
+def scripted_terminal(answers):
+    """Answer the application's input() prompts from answers and discard what it prints."""
+    answers = iter(answers)
+    bank.input = lambda prompt="": next(answers)
+    bank.print = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        del bank.input, bank.print
+
+
+def bench_files(directory: str, repeat: int) -> dict:
+    return {
+        "load_operators": measure(lambda: bank.load_operators(os.path.join(directory, "operators.csv")), repeat),
+        "load_clients": measure(lambda: bank.load_clients(os.path.join(directory, "clients.csv")), repeat),
+        "load_transactions": measure(
+            lambda: bank.load_transactions(os.path.join(directory, "transactions.csv")), repeat),
+    }
+
+
+def bench_ledger(directory: str, scratch: str, repeat: int, rng: random.Random) -> dict:
+    operators = bank.load_operators(os.path.join(directory, "operators.csv"))
+    clients = bank.load_clients(os.path.join(directory, "clients.csv"))
+    transactions = bank.load_transactions(os.path.join(directory, "transactions.csv"))
+    results = {"repository": measure(lambda: bank.Repository(operators, clients, transactions), repeat)}
+    results["update_debt_cold"] = measure(
+        lambda repository: bank.update_debt(repository.clients, repository.transactions, 0), repeat,
+        setup=lambda: bank.Repository(operators, clients, transactions))
+    repository = bank.Repository(operators, clients, transactions)
+    bank.update_debt(repository.clients, repository.transactions, 0)
+    results["update_debt_warm"] = measure(
+        lambda: bank.update_debt(repository.clients, repository.transactions, 0), repeat)
+
+    sample = rng.sample(list(repository.clients), min(LOOKUPS, len(repository.clients)))
+    for name, field_name in (("search_client_acc_number", "acc_number"), ("search_client_id", "client_id")):
+        queries = [getattr(client, field_name) for client in sample]
+        results[name] = measure(lambda: [bank.search_client(query, repository.clients) for query in queries],
+                                repeat, len(queries))
+    results["search_client_name_first"] = measure(
+        lambda: bank.search_client(sample[0].client_name, repository.clients), 1)  # builds the name index
+    names = [client.client_name for client in sample]
+    results["search_client_name"] = measure(
+        lambda: [bank.search_client(name, repository.clients) for name in names], repeat, len(names))
+
+    results["generate_unique_transaction_id"] = measure(
+        lambda: [bank.generate_unique_transaction_id(repository.transactions, scratch) for _ in range(LOOKUPS)],
+        repeat, LOOKUPS)
+    results["save_to_csv_clients"] = measure(
+        lambda: bank.save_to_csv(os.path.join(scratch, "clients.csv"), repository.clients), repeat,
+        len(repository.clients))
+    results["save_to_csv_transactions"] = measure(
+        lambda: bank.save_to_csv(os.path.join(scratch, "transactions.csv"), repository.transactions), repeat,
+        len(repository.transactions))
+    return results
+
+
+def bench_screens(directory: str, scratch: str, repeat: int, rng: random.Random) -> dict:
+    service_path = os.path.join(scratch, "bank")
+    shutil.copytree(directory, service_path)
+    started = []
+    results = {"service_startup": measure(lambda: started.append(
+        bank.BankService(service_path, storage=bank.CsvStorage(service_path, working_set_days=None))), 1)}
+    started.pop().shutdown()  # outside the timing: releases the journal and the writer thread
+    service = bank.BankService(service_path, storage=bank.CsvStorage(service_path, working_set_days=None))
+    operator = next(operator for operator in service.operators if operator.access_level == 5)
+    accounts = rng.sample(list(service.clients), min(SCREEN_OPERATIONS, len(service.clients)))
+
+    def screen(do, answers_for):
+        answers = [answer for client in accounts for answer in answers_for(client)]
+
+        def run():
+            with scripted_terminal(answers):
+                for client in accounts:
+                    do(service, client, operator)
+        return measure(run, repeat, len(accounts))
+
+    results["do_deposit"] = screen(bank.do_deposit, lambda client: ["250.00", "Benchmark", ""])
+    results["do_withdraw"] = screen(bank.do_withdraw, lambda client: ["10.00", "Benchmark", ""])
+    results["do_loan"] = screen(bank.do_loan, lambda client: ["1000.00", "0.05", "Benchmark", ""])
+
+    def pay_answers(client):
+        loan = next(t for t in reversed(service.client_history(client.acc_number)) if bank.is_open_loan(t))
+        return [loan.Transaction_id, "1.00", ""]
+    results["pay_loan"] = screen(bank.pay_loan, pay_answers)
+    service.shutdown()
+    return results
+
+
+def run_scale(label: str, count: int, data: str | None, repeat: int | None, seed: int) -> dict:
+    repeat = repeat or (5 if count <= 100_000 else 3 if count <= 1_000_000 else 1)
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = os.path.join(data or scratch, f"bank-{label}-{seed}")
+        rows = None
+        if not os.path.exists(os.path.join(directory, "clients.csv")):
+            start = time.perf_counter()
+            rows = generate_bank(directory, count, seed)
+            print(f"[{label}] generated {rows['transactions']:,} transactions in {time.perf_counter() - start:.1f}s")
+        results = bench_files(directory, repeat)
+        results.update(bench_ledger(directory, scratch, repeat, rng))
+        gc.collect()
+        results.update(bench_screens(directory, scratch, repeat, rng))
+    return {"transactions": count, "repeat": repeat, "generated": rows is not None, "results": results}
+
+
+def environment() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, timeout=30,
+                                  cwd=os.path.dirname(os.path.abspath(bank.__file__))).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": bank.np.__version__ if bank.np is not None else None,
+        "debt_workers": bank.DEBT_WORKERS,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = REGRESSION) -> int:
+    """Print every measurement against the baseline; returns how many got slower by more than threshold."""
+    regressions = 0
+    print(f"\n{'scale':>6} {'benchmark':<32} {'baseline':>11} {'current':>11} {'ratio':>7}")
+    for label, scale in current["scales"].items():
+        old_results = baseline.get("scales", {}).get(label, {}).get("results", {})
+        for name, result in scale["results"].items():
+            if name not in old_results:
+                continue
+            old, new = old_results[name]["per_operation"], result["per_operation"]
+            ratio = new / old if old else float("inf")
+            flag = "  SLOWER" if ratio > 1 + threshold else "  faster" if ratio < 1 - threshold else ""
+            regressions += ratio > 1 + threshold
+            print(f"{label:>6} {name:<32} {old * 1e6:>9.1f}us {new * 1e6:>9.1f}us {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES, help="transaction counts, e.g. 1k 100k 10M")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--data", help="folder to keep the generated banks in and reuse them from")
+    parser.add_argument("--repeat", type=int, help="runs per measurement (default 5, fewer above 100k transactions)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare", metavar="BASELINE", help="a results file of an earlier version")
+    parser.add_argument("--threshold", type=float, default=REGRESSION, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "scales": {}}
+    for label in args.scales:
+        report["scales"][label] = run_scale(label, parse_count(label), args.data, args.repeat, args.seed)
+        print(f"[{label}]")
+        for name, result in report["scales"][label]["results"].items():
+            per_operation = f" ({result['per_operation'] * 1e6:.1f}us each)" if result["operations"] > 1 else ""
+            print(f"    {name:<32} {result['seconds']:>10.4f}s{per_operation}")
+        with open(args.output, "w", encoding="utf-8") as file:  # after every scale, so a long run keeps its results
+            json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        if regressions:
+            print(f"{regressions} measurements more than {args.threshold:.0%} slower than the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
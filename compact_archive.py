@@ -0,0 +1,38 @@
+"""
+Compaction job: moves settled transactions (deposits, withdrawals, loan
+payments and paid loans) older than the last --months months out of
+transactions.csv into the monthly partitions under archive/. Open loans and
+recent activity stay in the hot set the application loads; archived months
+are still read, from the partitions listed in archive/manifest.json, when a
+history or transaction lookup needs them.
+
+Run it while the teller application and bank_server are stopped.
+
+Usage: python compact_archive.py [--months 12] [--data-dir DIR]
+"""
+import argparse
+import os
+import sys
+import time
+
+import PythonApplication1 as bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive settled transaction history by month.")
+    parser.add_argument("--months", type=int, default=bank.HOT_MONTHS,
+                        help="whole months of history to keep in transactions.csv (default BANK_HOT_MONTHS, 12)")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(bank.__file__)),
+                        help="folder holding the bank data (defaults to the application folder)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = bank.BankService(args.data_dir, autoflush=False)
+    moved = service.compact_archive(args.months)
+    print(f"{moved:,} transactions from before {bank.hot_cutoff(args.months)} archived, "
+          f"{len(service.transactions):,} kept, in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    main()